@@ -18,6 +18,10 @@ def create_app(config_name: str | None = None) -> Flask:
     config_class = get_config(config_name)
     app.config.from_object(config_class)
 
+    from app.utils import json_provider
+
+    json_provider.init_app(app)
+
     # Expose asset helper globally for templates (cache-busted static URLs)
     from app.utils.assets import asset_url
 
@@ -29,6 +33,14 @@ def create_app(config_name: str | None = None) -> Flask:
     _register_cli(app)
     _register_routes(app)
 
+    from app.utils import access_log, metrics, profiler, slow_queries, tracing
+
+    access_log.init_app(app)
+    metrics.init_app(app)
+    slow_queries.init_app(app)
+    profiler.init_app(app)
+    tracing.init_app(app)  # last: wraps every view registered above
+
     return app
 
 
@@ -89,6 +101,16 @@ def _register_cli(app: Flask) -> None:
     app.cli.add_command(cli.hello)
     app.cli.add_command(cli.seed_data)
     app.cli.add_command(cli.create_admin)
+    app.cli.add_command(cli.loadgen)
+    app.cli.add_command(cli.backfill_powder_lab)
+    app.cli.add_command(cli.extract_powder_colors)
+    app.cli.add_command(cli.build_photo_derivatives)
+    app.cli.add_command(cli.migrate_uploads_to_blobs)
+    app.cli.add_command(cli.purge_stale_uploads)
+    app.cli.add_command(cli.worker)
+    app.cli.add_command(cli.scheduler)
+    app.cli.add_command(cli.slow_queries)
+    app.cli.add_command(cli.traces)
 
 
 def _register_routes(app: Flask) -> None:
@@ -96,7 +118,15 @@ def _register_routes(app: Flask) -> None:
     import json
     import os
 
-    from flask import jsonify, redirect, request, send_file, send_from_directory, url_for
+    from flask import flash, jsonify, redirect, request, send_from_directory, url_for
+    from werkzeug.exceptions import RequestEntityTooLarge
+
+    @app.before_request
+    def _start_scheduler() -> None:
+        # Started lazily so the thread lives in the serving (post-fork) process.
+        from app.services.maintenance_service import scheduler_service
+
+        scheduler_service.start(app)
 
     @app.get("/")
     def index():
@@ -152,9 +182,17 @@ def _register_routes(app: Flask) -> None:
 
     @app.get("/healthz")
     def healthz() -> dict[str, Any]:
-        """Container health check endpoint."""
+        """Liveness check: the process is up and answering."""
         return {"ok": True}
 
+    @app.get("/readyz")
+    def readyz() -> Any:
+        """Readiness check: 503 while the database, pool or uploads volume is unhealthy."""
+        from app.services.health_service import health_service
+
+        report = health_service.readiness()
+        return jsonify(report), 200 if report["ready"] else 503
+
     @app.get("/favicon.ico")
     def favicon() -> Any:
         """Serve favicon for legacy agents and browsers requesting /favicon.ico."""
@@ -165,17 +203,22 @@ def _register_routes(app: Flask) -> None:
             return send_from_directory(static_dir, "favicon.ico")
         return send_from_directory(static_dir, "favicon.png")
 
+    @app.errorhandler(RequestEntityTooLarge)
+    def request_too_large(error: RequestEntityTooLarge):
+        """Explain MAX_CONTENT_LENGTH instead of a bare 413 page."""
+        limit = app.config.get("MAX_CONTENT_LENGTH")
+        message = f"Upload too large (limit {limit // (1024 * 1024)} MB)." if limit else str(error)
+        if request.accept_mimetypes.best == "text/html" and request.referrer:
+            flash(message + " Use the job page uploader for large files.", "error")
+            return redirect(request.referrer)
+        return jsonify({"error": message, "max_bytes": limit}), 413
+
     @app.get("/uploads/<path:name>")
     def uploads(name: str):
         """Serve uploaded files from configured UPLOADS_DIR for legacy parity."""
-        upload_root = app.config.get("UPLOADS_DIR")
-        path = os.path.join(upload_root, name)
-        if not os.path.abspath(path).startswith(os.path.abspath(upload_root)):
-            # Prevent path traversal
-            return {"error": "invalid path"}, 400
-        if not os.path.exists(path):
-            return {"error": "not found"}, 404
-        return send_file(path)
+        from .services.upload_service import send_upload
+
+        return send_upload(name)
 
     # Legacy CSV endpoints at top-level paths
     @app.get("/jobs.csv")
@@ -6,15 +6,28 @@ import os
 import secrets
 from datetime import datetime
 
-from flask import current_app, flash, redirect, render_template, request, session, url_for
+from flask import (
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    session,
+    url_for,
+)
 from sqlalchemy import select
 
 from app.extensions import csrf
 from app.models import User
-from app.repositories import session_scope, settings_repo
+from app.repositories import notification_repo, session_scope, settings_repo, task_repo
+from app.repositories.scheduler import scheduler_repo
 from app.services.auth_service import _hash_password
+from app.services.maintenance_service import scheduler_service
 from app.services.options_service import options_service
 from app.services.settings_service import settings_service
+from app.utils.profiler import list_profiles
 
 from . import bp
 
@@ -148,6 +161,64 @@ def users_create():
     return redirect(url_for("admin.users"))
 
 
+@bp.route("/scheduler")
+def scheduler():
+    """Periodic maintenance jobs and background task queue status."""
+    if not session.get("is_admin"):
+        return redirect(url_for("auth.login", next=url_for("admin.scheduler")))
+    registered = scheduler_service.jobs
+    states = {row.name: row for row in scheduler_repo.list_jobs()}
+    jobs = [
+        {"name": name, "job": job, "state": states.get(name)}
+        for name, job in sorted(registered.items())
+    ]
+    return render_template(
+        "admin/scheduler.html",
+        jobs=jobs,
+        leader=scheduler_service.leader_info(),
+        task_counts=task_repo.counts_by_status(),
+        notification_counts=notification_repo.counts_by_status(),
+        enabled=current_app.config.get("SCHEDULER_ENABLED"),
+    )
+
+
+@bp.post("/scheduler/<name>/run")
+def scheduler_run(name: str):
+    """Make a periodic job due now; the leading scheduler picks it up."""
+    if not session.get("is_admin"):
+        return redirect(url_for("auth.login", next=url_for("admin.scheduler")))
+    if scheduler_service.request_run(name):
+        flash(f"{name} will run on the next scheduler tick", "success")
+    else:
+        flash("Job not found (it appears once the scheduler has run)", "error")
+    return redirect(url_for("admin.scheduler"))
+
+
+@bp.route("/profiles")
+def profiles():
+    """Recent request profiles (taken with ?__profile=1)."""
+    if not session.get("is_admin"):
+        return redirect(url_for("auth.login", next=url_for("admin.profiles")))
+    return render_template(
+        "admin/profiles.html", profiles=list_profiles(current_app.config["PROFILE_DIR"])
+    )
+
+
+@bp.route("/profiles/<profile_id>.folded")
+def profile_download(profile_id: str):
+    """Download one profile's collapsed stacks for a flamegraph tool."""
+    if not session.get("is_admin"):
+        return redirect(url_for("auth.login", next=url_for("admin.profiles")))
+    if not profile_id.replace("-", "").isalnum():
+        abort(404)
+    return send_from_directory(
+        current_app.config["PROFILE_DIR"],
+        f"{profile_id}.folded",
+        mimetype="text/plain",
+        as_attachment=True,
+    )
+
+
 @bp.route("/settings", methods=["GET", "POST"])
 def settings():
     """Application settings page."""
@@ -5,6 +5,7 @@ from __future__ import annotations
 from flask import flash, jsonify, redirect, render_template, request, url_for
 
 from app.repositories import customer_repo
+from app.repositories.projections import as_dicts
 from app.services.auth_service import _hash_password
 
 from . import bp
@@ -179,19 +180,8 @@ def contacts_json():
 @bp.get("/search.json")
 def search_json():
     q = request.args.get("q", "").strip()
-    rows = customer_repo.search_customers(q) if q else []
-    return jsonify(
-        [
-            {
-                "id": c.id,
-                "company": c.company,
-                "contact_name": c.contact_name,
-                "phone": c.phone,
-                "email": c.email,
-            }
-            for c in rows
-        ]
-    )
+    rows = customer_repo.search_customer_rows(q) if q else []
+    return jsonify(as_dicts(rows))
 
 
 @bp.get("/<int:cust_id>/contacts.json")
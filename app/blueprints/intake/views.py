@@ -1,14 +1,28 @@
 """HTTP endpoints for the Intake blueprint."""
 
-from flask import flash, redirect, render_template, request, url_for
+from flask import flash, jsonify, redirect, render_template, request, url_for
 
 from app.services.jobs_service import job_intake_service
 from app.services.options_service import options_service
+from app.services.photo_derivative_service import photo_derivative_service
 from app.services.upload_service import save_job_files
 
 from . import bp
 
 
+def _wants_json() -> bool:
+    """True when the chunked-upload script submits the form and uploads files itself."""
+    return request.accept_mimetypes.best == "application/json"
+
+
+def _submitted(job, message: str):
+    flash(message, "success")
+    target = url_for("jobs.detail", job_id=job.id)
+    if _wants_json():
+        return jsonify({"job_id": job.id, "redirect": target}), 201
+    return redirect(target)
+
+
 @bp.route("/form", methods=["GET", "POST"])
 def intake_form():
     """Production intake form."""
@@ -34,6 +48,8 @@ def intake_form():
                 intake_source=form.get("intake_source") or "production",
             )
         except ValueError as error:
+            if _wants_json():
+                return jsonify({"error": str(error)}), 400
             flash(str(error), "error")
             return render_template(
                 "intake/form.html",
@@ -44,15 +60,22 @@ def intake_form():
             # After job is created, persist any uploaded files and link as photos
             files = request.files.getlist("photos") or []
             if files:
-                saved = save_job_files(job.id, job.company, files)
+                saved = save_job_files(files)
                 # Record in repository via jobs blueprint conventions
                 from app.repositories import job_repo  # local import to avoid cycles
 
-                for rel_path, orig in saved:
-                    job_repo.add_photo(job.id, filename=rel_path, original_name=orig)
+                photos = [
+                    job_repo.add_photo(
+                        job.id,
+                        filename=upload.path,
+                        original_name=upload.original_name,
+                        blob_id=upload.blob_id,
+                    )
+                    for upload in saved
+                ]
+                photo_derivative_service.schedule(photo.id for photo in photos)
 
-            flash("Production intake submitted successfully.", "success")
-            return redirect(url_for("jobs.detail", job_id=job.id))
+            return _submitted(job, "Production intake submitted successfully.")
 
     return render_template(
         "intake/form.html",
@@ -92,18 +115,27 @@ def railing_intake():
                 intake_source="railing",
             )
         except ValueError as error:
+            if _wants_json():
+                return jsonify({"error": str(error)}), 400
             flash(str(error), "error")
             return render_template("intake/railing.html", form_data=form)
         else:
             files = request.files.getlist("photos") or []
             if files:
-                saved = save_job_files(job.id, job.company, files)
+                saved = save_job_files(files)
                 from app.repositories import job_repo  # local import
 
-                for rel_path, orig in saved:
-                    job_repo.add_photo(job.id, filename=rel_path, original_name=orig)
+                photos = [
+                    job_repo.add_photo(
+                        job.id,
+                        filename=upload.path,
+                        original_name=upload.original_name,
+                        blob_id=upload.blob_id,
+                    )
+                    for upload in saved
+                ]
+                photo_derivative_service.schedule(photo.id for photo in photos)
 
-            flash("Railing intake submitted successfully.", "success")
-            return redirect(url_for("jobs.detail", job_id=job.id))
+            return _submitted(job, "Railing intake submitted successfully.")
 
     return render_template("intake/railing.html", form_data={})
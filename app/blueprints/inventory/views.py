@@ -2,7 +2,9 @@
 
 from flask import flash, jsonify, redirect, render_template, request, url_for
 
+from app.repositories.projections import as_dicts
 from app.services.inventory_service import inventory_service
+from app.services.sync_service import sync_service
 
 from . import bp
 
@@ -54,8 +56,16 @@ def index():
 def api_powders():
     """Return powder inventory data.
 
-    Supports legacy flat response when `flat=1` is provided.
+    Supports legacy flat response when `flat=1` is provided. The object
+    response carries a ``cursor``; passing it back as ``?since=`` returns only
+    powders changed since then plus ``deleted`` ids (and no summary).
     """
+    flat = (request.args.get("flat") or "").strip() == "1"
+    try:
+        window = sync_service.open_window(None if flat else request.args.get("since"))
+    except ValueError:
+        return jsonify({"error": "invalid since cursor"}), 400
+
     search = request.args.get("search") or None
     manufacturer = request.args.get("manufacturer") or None
     threshold_param = request.args.get("threshold")
@@ -64,24 +74,24 @@ def api_powders():
     except ValueError:  # pragma: no cover - defensive
         low_stock_threshold = 5.0
 
-    powders, summary = inventory_service.powders_dashboard(
+    rows, summary = inventory_service.powder_stock_rows(
         search=search,
         manufacturer=manufacturer,
         low_stock_threshold=low_stock_threshold,
+        changed_since=window.since,
     )
-    data = [
-        {
-            "id": p.id,
-            "color": getattr(p, "powder_color", None),
-            "manufacturer": getattr(p, "manufacturer", None),
-            "on_hand_kg": float(p.on_hand_kg or 0),
-            "in_stock": float(p.in_stock or 0),
-            "family": getattr(p, "color_family", None),
-        }
-        for p in powders
-    ]
-    if (request.args.get("flat") or "").strip() == "1":
+    data = as_dicts(rows)
+    if flat:
         return jsonify(data)
+    if window.is_delta:
+        return jsonify(
+            {
+                "powders": data,
+                "deleted": sync_service.deleted_ids("powders", window),
+                "cursor": window.cursor,
+                "full": False,
+            }
+        )
     return jsonify(
         {
             "summary": {
@@ -92,6 +102,9 @@ def api_powders():
                 "low_stock_threshold": summary.low_stock_threshold,
             },
             "powders": data,
+            "deleted": [],
+            "cursor": window.cursor,
+            "full": True,
         }
     )
 
@@ -8,8 +8,16 @@ from datetime import date, datetime
 from flask import Response, flash, jsonify, redirect, render_template, request, url_for
 
 from app.repositories import job_repo
+from app.repositories.projections import as_dicts
+from app.services.chunked_upload_service import UploadError, chunked_upload_service
 from app.services.options_service import options_service
-from app.services.upload_service import delete_uploaded_file, save_job_files
+from app.services.photo_derivative_service import photo_derivative_service, photo_urls
+from app.services.sync_service import sync_service
+from app.services.upload_service import (
+    delete_uploaded_file,
+    link_existing_blob,
+    save_job_files,
+)
 
 from . import bp
 
@@ -100,7 +108,7 @@ def _job_to_form_data(job) -> dict[str, str]:
 def index():
     """Render the jobs index view."""
     search_query = request.args.get("q", "").strip() or None
-    jobs = job_repo.list_jobs(query=search_query)
+    jobs = job_repo.list_jobs(query=search_query, profile="index")
     metrics = {
         "active": sum(1 for job in jobs if (job.department or "").lower() != "completed"),
         "due_today": sum(1 for job in jobs if job.due_by and job.due_by == date.today()),
@@ -158,10 +166,28 @@ def new_job():
     return render_template("jobs/new.html", form_data={})
 
 
+@bp.get("/api/jobs")
+def api_jobs():
+    """Return jobs for the SPA; ``?since=<cursor>`` returns only changes."""
+    try:
+        window = sync_service.open_window(request.args.get("since"))
+    except ValueError:
+        return jsonify({"error": "invalid since cursor"}), 400
+    rows = job_repo.list_job_rows(changed_since=window.since)
+    return jsonify(
+        {
+            "jobs": as_dicts(rows),
+            "deleted": sync_service.deleted_ids("jobs", window),
+            "cursor": window.cursor,
+            "full": not window.is_delta,
+        }
+    )
+
+
 @bp.get("/export")
 def export_csv() -> Response:
     """Export job data as CSV (basic implementation)."""
-    jobs = job_repo.list_jobs()
+    jobs = job_repo.list_jobs(profile="summary")
     header = "id,company,status,due_by\n"
     rows = [f"{job.id},{job.company or ''},{job.status or ''},{job.due_by or ''}" for job in jobs]
     csv_content = header + "\n".join(rows)
@@ -226,8 +252,8 @@ def _find_job(job_id: int):
 @bp.get("/<int:job_id>/")
 def detail(job_id: int):
     """Render the job detail view."""
-    job = _find_job(job_id)
-    if not job:
+    view = job_repo.get_job_detail(job_id)
+    if not view:
         return (
             render_template(
                 "errors/error.html",
@@ -239,23 +265,19 @@ def detail(job_id: int):
 
     photos = [
         {
-            "url": url_for("uploads", name=(photo.filename or "")),
+            **photo_urls(photo),
             "label": photo.original_name or (photo.filename or "Job photo"),
         }
-        for photo in getattr(job, "photos", [])
+        for photo in view.photos
     ]
-    time_logs = job_repo.list_time_logs(job.id)
-    powder_usage = job_repo.list_powder_usage(job.id)
-    total_minutes = sum(filter(None, (log.minutes for log in time_logs)))
-    total_powder = sum(filter(None, (usage.amount_used for usage in powder_usage)))
     return render_template(
         "jobs/detail.html",
-        job=job,
+        job=view.job,
         photos=photos,
-        time_logs=time_logs,
-        powder_usage=powder_usage,
-        total_minutes=total_minutes,
-        total_powder=total_powder,
+        time_logs=view.time_logs,
+        powder_usage=view.powder_usage,
+        total_minutes=view.total_minutes,
+        total_powder=view.total_powder_kg,
         is_admin=True,
     )
 
@@ -266,15 +288,18 @@ def photos_json(job_id: int):
     items = []
     for p in photos:
         fname = p.filename or ""
-        ext = fname.rsplit(".", 1)[-1].lower() if "." in fname else ""
+        # Blob paths have no extension; the uploaded name carries it.
+        name = (p.original_name if p.blob_id else fname) or ""
+        ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
         kind = "pdf" if ext == "pdf" else "image"
         items.append(
             {
                 "id": p.id,
                 "filename": fname,
                 "original_name": p.original_name,
-                "url": url_for("uploads", name=fname),
+                **photo_urls(p),
                 "kind": kind,
+                "derivatives_status": p.derivatives_status,
             }
         )
     return jsonify(items)
@@ -294,25 +319,117 @@ def upload_photo(job_id: int):
     if not job:
         return {"error": "job not found"}, 404
 
-    saved = save_job_files(job_id, job.company, files)
-    for rel_path, orig in saved:
-        job_repo.add_photo(job_id, filename=rel_path, original_name=orig)
+    saved = save_job_files(files)
+    photos = [
+        job_repo.add_photo(
+            job_id, filename=upload.path, original_name=upload.original_name, blob_id=upload.blob_id
+        )
+        for upload in saved
+    ]
+    photo_derivative_service.schedule(photo.id for photo in photos)
 
     flash(f"Uploaded {len(saved)} file(s)", "success")
     return redirect(url_for("jobs.detail", job_id=job_id))
 
 
+@bp.post("/<int:job_id>/photos/by-hash")
+def link_photo_by_hash(job_id: int):
+    """Link an already stored file by its SHA-256 instead of uploading it again.
+
+    Clients hash the file first; a 404 means the bytes are needed after all.
+    """
+    payload = request.get_json(silent=True) or {}
+    if not _find_job(job_id):
+        return {"error": "job not found"}, 404
+    upload = link_existing_blob(payload.get("sha256") or "", payload.get("filename") or "")
+    if upload is None:
+        return {"error": "unknown content"}, 404
+    photo = job_repo.add_photo(
+        job_id, filename=upload.path, original_name=upload.original_name, blob_id=upload.blob_id
+    )
+    photo_derivative_service.schedule([photo.id])
+    return jsonify({"id": photo.id, "filename": photo.filename}), 201
+
+
+def _upload_error(error: UploadError):
+    body = {"error": str(error)}
+    if error.offset is not None:
+        body["offset"] = error.offset
+    return jsonify(body), error.status
+
+
+@bp.post("/<int:job_id>/uploads")
+def start_upload(job_id: int):
+    """Open a resumable upload: JSON ``{filename, size, sha256?}``."""
+    payload = request.get_json(silent=True) or {}
+    try:
+        result = chunked_upload_service.start(
+            job_id,
+            filename=str(payload.get("filename") or ""),
+            size=int(payload.get("size") or 0),
+            sha256=payload.get("sha256"),
+        )
+    except UploadError as error:
+        return _upload_error(error)
+    except (TypeError, ValueError):
+        return {"error": "size must be an integer"}, 400
+    return jsonify(result), 201
+
+
+@bp.get("/<int:job_id>/uploads/<upload_id>")
+def upload_status(job_id: int, upload_id: str):
+    try:
+        return jsonify(chunked_upload_service.status(job_id, upload_id))
+    except UploadError as error:
+        return _upload_error(error)
+
+
+@bp.put("/<int:job_id>/uploads/<upload_id>")
+def upload_chunk(job_id: int, upload_id: str):
+    """Append the raw request body at the ``Upload-Offset`` header's position."""
+    length = request.content_length
+    if length is None:
+        return {"error": "Content-Length required"}, 411
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return {"error": "Upload-Offset header required"}, 400
+    try:
+        offset = chunked_upload_service.write_chunk(
+            job_id, upload_id, offset=offset, stream=request.stream, length=length
+        )
+    except UploadError as error:
+        return _upload_error(error)
+    return jsonify({"upload_id": upload_id, "offset": offset})
+
+
+@bp.post("/<int:job_id>/uploads/<upload_id>/complete")
+def complete_upload(job_id: int, upload_id: str):
+    try:
+        photo = chunked_upload_service.complete(job_id, upload_id)
+    except UploadError as error:
+        return _upload_error(error)
+    return jsonify({"photo_id": photo.id, "filename": photo.filename}), 201
+
+
+@bp.delete("/<int:job_id>/uploads/<upload_id>")
+def abort_upload(job_id: int, upload_id: str):
+    try:
+        chunked_upload_service.abort(job_id, upload_id)
+    except UploadError as error:
+        return _upload_error(error)
+    return "", 204
+
+
 @bp.post("/<int:job_id>/photos/<int:photo_id>/delete")
 def delete_photo(job_id: int, photo_id: int):
-    # Retrieve photo to delete disk file first
+    # Blob-backed files are reference counted and removed by the repository
+    # with their last photo; legacy per-job files are deleted here.
     photos = job_repo.list_photos(job_id)
-    rel = None
-    for p in photos:
-        if p.id == photo_id:
-            rel = p.filename
-            break
-    if rel:
-        delete_uploaded_file(rel)
+    photo = next((p for p in photos if p.id == photo_id), None)
+    if photo is not None and photo.filename and photo.blob_id is None:
+        delete_uploaded_file(photo.filename)
+        photo_derivative_service.delete_files(photo)
     ok = job_repo.delete_photo(job_id, photo_id)
     flash("Photo deleted" if ok else "Photo not found", "success" if ok else "error")
     return redirect(url_for("jobs.detail", job_id=job_id))
@@ -353,7 +470,11 @@ def screen_remove(job_id: int):
 
 @bp.get("/completed")
 def completed():
-    jobs = [j for j in job_repo.list_jobs() if (j.department or "").lower() == "completed"]
+    jobs = [
+        j
+        for j in job_repo.list_jobs(profile="card_notes")
+        if (j.department or "").lower() == "completed"
+    ]
     return render_template("jobs/completed.html", jobs=jobs)
 
 
@@ -526,8 +647,8 @@ def edit(job_id: int):
 
 @bp.get("/<int:job_id>/worksheet")
 def worksheet(job_id: int):
-    job = _find_job(job_id)
-    if not job:
+    view = job_repo.get_job_detail(job_id)
+    if not view:
         return (
             render_template(
                 "errors/error.html",
@@ -536,17 +657,13 @@ def worksheet(job_id: int):
             ),
             404,
         )
-    time_logs = job_repo.list_time_logs(job.id)
-    powder_usage = job_repo.list_powder_usage(job.id)
-    total_minutes = sum(filter(None, (log.minutes for log in time_logs)))
-    total_powder = sum(filter(None, (usage.amount_used for usage in powder_usage)))
     return render_template(
         "jobs/worksheet.html",
-        job=job,
-        time_logs=time_logs,
-        powder_usage=powder_usage,
-        total_minutes=total_minutes,
-        total_powder=total_powder,
+        job=view.job,
+        time_logs=view.time_logs,
+        powder_usage=view.powder_usage,
+        total_minutes=view.total_minutes,
+        total_powder=view.total_powder_kg,
     )
 
 
@@ -3,6 +3,10 @@
 from flask import Response, flash, jsonify, redirect, render_template, request, url_for
 
 from app.repositories import powder_repo
+from app.services.color_match_service import color_match_service
+from app.services.powder_suggest_service import powder_suggest_service
+from app.utils.color import hex_to_lab, normalize_hex, ral_to_hex
+from app.utils.json_provider import stream_json_array
 
 from . import bp
 
@@ -87,8 +91,111 @@ def colors_full_json():
 
     Each item should include `color` and may include `aliases` and `family`.
     """
-    items = powder_repo.list_colors_full()
-    return jsonify(items or [])
+    return stream_json_array(powder_repo.list_colors_full())
+
+
+@bp.get("/suggest.json")
+def suggest_json():
+    """Return typeahead matches for ``q`` by color name, product code or alias.
+
+    Optional ``family`` restricts matches to one color family; ``limit`` caps
+    the result (default 10, at most 25).
+    """
+    query = (request.args.get("q") or "").strip()
+    family = (request.args.get("family") or "").strip() or None
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 25)
+    matches = powder_suggest_service.suggest(query, limit=limit, family=family)
+    return jsonify(
+        [
+            {
+                "id": row.id,
+                "color": row.color,
+                "manufacturer": row.manufacturer,
+                "product_code": row.product_code,
+                "family": row.family,
+                "aliases": row.aliases or "",
+                "in_stock": row.in_stock,
+                "matched": tier,
+            }
+            for row, tier in matches
+        ]
+    )
+
+
+def _requested_lab(args) -> tuple[float, float, float] | None:
+    """Read the target color from ``hex``, ``ral`` or ``l``/``a``/``b`` parameters."""
+    if args.get("hex"):
+        hex_value = normalize_hex(args["hex"])
+        return hex_to_lab(hex_value) if hex_value else None
+    if args.get("ral"):
+        hex_value = ral_to_hex(args["ral"])
+        return hex_to_lab(hex_value) if hex_value else None
+    try:
+        return (float(args["l"]), float(args["a"]), float(args["b"]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+@bp.get("/match.json")
+def match_json():
+    """Return the powders closest to a color by CIEDE2000.
+
+    The target is ``hex`` ("#1A2B3C"), ``ral`` ("9005") or Lab ``l``/``a``/``b``.
+    Only in-stock powders are returned unless ``include_out_of_stock=1``;
+    ``limit`` defaults to 5 (at most 50).
+    """
+    lab = _requested_lab(request.args)
+    if lab is None:
+        return jsonify({"error": "pass a valid hex, ral, or l/a/b color"}), 400
+    limit = min(max(request.args.get("limit", 5, type=int), 1), 50)
+    in_stock_only = request.args.get("include_out_of_stock") not in ("1", "true")
+    matches = color_match_service.match(lab, limit=limit, in_stock_only=in_stock_only)
+    return jsonify(
+        {
+            "lab": [round(value, 2) for value in lab],
+            "matches": [
+                {
+                    "id": row.id,
+                    "color": row.color,
+                    "manufacturer": row.manufacturer,
+                    "product_code": row.product_code,
+                    "family": row.family,
+                    "in_stock": row.in_stock,
+                    "lab": [round(row.lab_l, 2), round(row.lab_a, 2), round(row.lab_b, 2)],
+                    "delta_e": round(delta_e, 2),
+                }
+                for row, delta_e in matches
+            ],
+        }
+    )
+
+
+@bp.post("/<int:powder_id>/lab")
+def set_powder_lab(powder_id: int):
+    """Set a powder's Lab color by hand, or ``clear`` it back to the derived value.
+
+    Accepts form or JSON fields ``hex`` or ``l``/``a``/``b``.
+    """
+    payload = request.get_json(silent=True) or request.form
+    if payload.get("clear"):
+        powder = powder_repo.update_powder(powder_id, lab_source=None)
+    else:
+        lab = _requested_lab(payload)
+        if lab is None:
+            return jsonify({"error": "pass a valid hex or l/a/b color"}), 400
+        lab_l, lab_a, lab_b = lab
+        powder = powder_repo.update_powder(
+            powder_id, lab_l=lab_l, lab_a=lab_a, lab_b=lab_b, lab_source="manual"
+        )
+    if powder is None:
+        return jsonify({}), 404
+    return jsonify(
+        {
+            "id": powder.id,
+            "lab": None if powder.lab_l is None else [powder.lab_l, powder.lab_a, powder.lab_b],
+            "lab_source": powder.lab_source,
+        }
+    )
 
 
 @bp.get("/by_color.json")
@@ -117,7 +224,7 @@ def legacy_powders_csv() -> Response:
 
     Delegates to a minimal CSV writer using repository data.
     """
-    powders = powder_repo.list_powders()
+    powders = powder_repo.list_powders(profile="stock")
     header = "id,manufacturer,color,on_hand_kg\n"
     rows = []
     for p in powders:
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from flask import jsonify, request
 
+from app.repositories.projections import as_dicts
 from app.services.print_template_service import print_template_service
 
 from . import bp
@@ -11,24 +12,12 @@ from . import bp
 
 @bp.get("/<template_type>")
 def list_by_type(template_type: str):
-    items = print_template_service.list_by_type(template_type)
-    return jsonify(
-        [
-            {"id": t.id, "name": t.name, "content": t.content, "is_default": bool(t.is_default)}
-            for t in items
-        ]
-    )
+    return jsonify(as_dicts(print_template_service.list_rows_by_type(template_type)))
 
 
 @bp.get("/<template_type>/all")
 def list_all(template_type: str):
-    items = print_template_service.list_all(template_type)
-    return jsonify(
-        [
-            {"id": t.id, "name": t.name, "content": t.content, "is_default": bool(t.is_default)}
-            for t in items
-        ]
-    )
+    return jsonify(as_dicts(print_template_service.list_rows_by_type(template_type)))
 
 
 @bp.post("")
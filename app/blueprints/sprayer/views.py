@@ -3,6 +3,7 @@
 from flask import jsonify, redirect, render_template, request, url_for
 
 from app.repositories import job_repo
+from app.repositories.projections import as_dicts
 from app.services.sprayer_service import sprayer_service
 
 from . import bp
@@ -67,31 +68,13 @@ def batch_detail(batch_id: int):
 
 @bp.get("/candidates.json")
 def candidates_json():
-    jobs = job_repo.list_jobs()
-    return jsonify(
-        [
-            {"id": j.id, "company": j.company, "color": j.color, "due_by": j.due_by}
-            for j in jobs
-            if not getattr(j, "archived", False) and j.completed_at is None
-        ]
-    )
+    jobs = job_repo.list_job_card_rows(active_only=True)
+    return jsonify(as_dicts(jobs, ("id", "company", "color", "due_by")))
 
 
 @bp.get("/hitlist.json")
 def hitlist_json():
-    jobs = job_repo.list_jobs()
-    on_screen = [
-        {
-            "id": j.id,
-            "company": j.company,
-            "color": j.color,
-            "due_by": j.due_by,
-            "priority": j.priority,
-        }
-        for j in jobs
-        if getattr(j, "on_screen", False)
-    ]
-    return jsonify(on_screen)
+    return jsonify(as_dicts(job_repo.list_job_card_rows(on_screen=True)))
 
 
 @bp.post("/batches/<int:batch_id>/add_job")
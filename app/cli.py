@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+import json
+from datetime import UTC, datetime, timedelta
 
 import click
 from flask import current_app
@@ -11,7 +13,21 @@ from werkzeug.security import generate_password_hash
 from .extensions import db
 from .models import Customer, CustomerAccount, Job, JobPowder, Powder, User
 
-__all__ = ["hello", "seed_data", "create_admin"]
+__all__ = [
+    "hello",
+    "seed_data",
+    "create_admin",
+    "loadgen",
+    "backfill_powder_lab",
+    "extract_powder_colors",
+    "build_photo_derivatives",
+    "migrate_uploads_to_blobs",
+    "purge_stale_uploads",
+    "worker",
+    "scheduler",
+    "slow_queries",
+    "traces",
+]
 
 
 @click.command("hello")
@@ -195,3 +211,272 @@ def create_admin(username: str, password: str) -> None:
         user.password_hash = generate_password_hash(password)
         db.session.commit()
         click.echo(f"Admin user ensured: {username}")
+
+
+@click.command("loadgen")
+@click.option("--url", "base_url", default="http://127.0.0.1:8000", show_default=True)
+@click.option("--concurrency", "-c", default=16, show_default=True, help="Virtual users.")
+@click.option("--duration", "-d", default=60.0, show_default=True, help="Seconds to run.")
+@click.option("--scenario-file", type=click.Path(exists=True, dir_okay=False), default=None)
+@click.option("--no-think", is_flag=True, help="Disable per-scenario think time (max pressure).")
+@click.option("--timeout", default=30.0, show_default=True, help="Per-request timeout seconds.")
+@click.option("--seed", type=int, default=None, help="Seed for reproducible scenario picks.")
+@click.option("--output", type=click.Path(dir_okay=False), default=None, help="Write JSON report.")
+def loadgen(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    scenario_file: str | None,
+    no_think: bool,
+    timeout: float,
+    seed: int | None,
+    output: str | None,
+) -> None:
+    """Replay a weighted shop-floor scenario mix against a running instance.
+
+    Run it against gunicorn with different GUNICORN_WORKERS/GUNICORN_THREADS
+    settings and compare throughput, error rate and latency per endpoint.
+    """
+    from .utils.loadgen import format_report, load_plan, run_load
+
+    plan = load_plan(scenario_file)
+    report = asyncio.run(
+        run_load(
+            base_url.rstrip("/"),
+            plan,
+            concurrency=concurrency,
+            duration_s=duration,
+            think=not no_think,
+            timeout_s=timeout,
+            seed=seed,
+        )
+    )
+    for line in format_report(report):
+        click.echo(line)
+    if output:
+        with open(output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        click.echo(f"Report written to {output}")
+
+
+@click.command("backfill-powder-lab")
+@click.option("--batch-size", default=500, show_default=True)
+def backfill_powder_lab(batch_size: int) -> None:
+    """Derive Lab colors for powders from RAL/#hex references in their codes.
+
+    Manually entered colors are left alone.
+    """
+    from .models.powder import derive_lab
+
+    updated = last_id = 0
+    while True:
+        batch = Powder.query.filter(Powder.id > last_id).order_by(Powder.id).limit(batch_size).all()
+        if not batch:
+            break
+        for powder in batch:
+            before = (powder.lab_l, powder.lab_a, powder.lab_b)
+            derive_lab(powder)
+            updated += (powder.lab_l, powder.lab_a, powder.lab_b) != before
+        db.session.commit()
+        last_id = batch[-1].id
+    click.echo(f"Lab colors updated for {updated} powders.")
+
+
+@click.command("extract-powder-colors")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: CPUs).")
+@click.option("--clusters", "k", default=5, show_default=True, help="k-means clusters per photo.")
+@click.option("--force", is_flag=True, help="Re-analyse photos whose hash is unchanged.")
+@click.option("--limit", type=int, default=None, help="Only process the first N photos.")
+@click.option("--verbose", "-v", is_flag=True, help="Print one line per photo.")
+def extract_powder_colors(
+    workers: int | None, k: int, force: bool, limit: int | None, verbose: bool
+) -> None:
+    """Store the dominant color of each powder's picture_url photo."""
+    from .services.powder_picture_service import powder_picture_service
+
+    def report(result) -> None:
+        if result.status == "failed":
+            click.echo(f"powder {result.powder_id}: {result.error}", err=True)
+        elif verbose:
+            detail = f" {result.color.hex}" if result.color else ""
+            click.echo(f"powder {result.powder_id}: {result.status}{detail}")
+
+    try:
+        counts = powder_picture_service.extract_colors(
+            workers=workers, k=k, force=force, limit=limit, on_result=report
+        )
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc)) from exc
+    click.echo(
+        f"Photos updated: {counts['updated']}, unchanged: {counts['unchanged']}, "
+        f"failed: {counts['failed']}."
+    )
+
+
+@click.command("build-photo-derivatives")
+@click.option("--retry-failed", is_flag=True, help="Also retry photos that failed before.")
+@click.option("--limit", type=int, default=None, help="Only process the first N photos.")
+def build_photo_derivatives(retry_failed: bool, limit: int | None) -> None:
+    """Build WebP renditions for job photos that do not have them yet."""
+    from .services.photo_derivative_service import photo_derivative_service
+
+    counts = photo_derivative_service.build_pending(retry_failed=retry_failed, limit=limit)
+    summary = ", ".join(f"{status}: {count}" for status, count in sorted(counts.items()))
+    click.echo(f"Photos processed. {summary or 'nothing to do'}.")
+
+
+@click.command("migrate-uploads-to-blobs")
+@click.option("--dry-run", is_flag=True, help="Report what would move without changing anything.")
+def migrate_uploads_to_blobs(dry_run: bool) -> None:
+    """Move legacy per-job photo files into deduplicated blob storage."""
+    import os
+
+    from .repositories import blob_repo, job_repo
+    from .services.upload_service import delete_uploaded_file, guess_content_type, store_blob
+
+    root = current_app.config["UPLOADS_DIR"]
+    moved = missing = 0
+    for photo in job_repo.list_legacy_photos():
+        path = os.path.join(root, photo.filename)
+        if not os.path.isfile(path):
+            missing += 1
+            continue
+        moved += 1
+        if dry_run:
+            continue
+        # Moving updates this same instance, so note the old paths first.
+        legacy_paths = [photo.filename]
+        legacy_paths += [info["path"] for info in (photo.derivatives or {}).values()]
+        content_type = guess_content_type(photo.original_name or photo.filename)
+        with open(path, "rb") as handle:
+            blob = store_blob(handle, content_type=content_type)
+        if not job_repo.move_photo_to_blob(photo.id, filename=blob.path, blob_id=blob.id):
+            blob_repo.release(blob.id)  # photo deleted meanwhile
+            continue
+        for legacy_path in legacy_paths:
+            delete_uploaded_file(legacy_path)
+    verb = "Would move" if dry_run else "Moved"
+    click.echo(f"{verb} {moved} photo(s) into blob storage; {missing} file(s) missing.")
+    if moved and not dry_run:
+        click.echo("Run `flask build-photo-derivatives` to rebuild renditions.")
+
+
+@click.command("purge-stale-uploads")
+@click.option("--hours", type=float, default=24.0, show_default=True, help="Idle time to purge.")
+def purge_stale_uploads(hours: float) -> None:
+    """Delete chunked uploads that were started but not touched for a while."""
+    from .services.chunked_upload_service import chunked_upload_service
+
+    removed = chunked_upload_service.purge_stale(max_age_seconds=hours * 3600)
+    click.echo(f"Removed {removed} stale upload(s).")
+
+
+@click.command("worker")
+@click.option("--concurrency", "-c", type=int, default=None, help="Consumer threads.")
+@click.option("--poll", type=float, default=None, help="Seconds to wait when the queue is idle.")
+@click.option("--burst", is_flag=True, help="Exit once no task is due instead of polling.")
+def worker(concurrency: int | None, poll: float | None, burst: bool) -> None:
+    """Run background task consumers until interrupted."""
+    from .services.task_service import TaskWorker, task_service
+
+    config = current_app.config
+    runner = TaskWorker(
+        current_app._get_current_object(),
+        task_service,
+        concurrency=concurrency or config["TASK_WORKER_CONCURRENCY"],
+        poll_seconds=poll if poll is not None else config["TASK_POLL_SECONDS"],
+        burst=burst,
+    )
+    from .services.maintenance_service import scheduler_service
+
+    scheduler_service.start(current_app._get_current_object())
+    click.echo(f"Task worker started with {runner.concurrency} consumer(s).")
+    runner.run()
+    click.echo("Task worker stopped.")
+
+
+@click.command("scheduler")
+@click.option("--once", is_flag=True, help="Run the jobs that are due now, then exit.")
+def scheduler(once: bool) -> None:
+    """Run periodic maintenance jobs in the foreground.
+
+    Web and worker processes already run the scheduler (SCHEDULER_ENABLED);
+    this is for deployments that disable it there or for running it by hand.
+    """
+    from .services.maintenance_service import scheduler_service
+
+    if once:
+        ran = scheduler_service.tick()
+        click.echo(f"Ran {len(ran)} job(s): {', '.join(ran)}" if ran else "No jobs due.")
+        return
+    click.echo(f"Scheduler {scheduler_service.identity} started; Ctrl+C to stop.")
+    try:
+        scheduler_service.run(current_app._get_current_object())
+    except KeyboardInterrupt:
+        scheduler_service.stop()
+    click.echo("Scheduler stopped.")
+
+
+@click.command("slow-queries")
+@click.option("--top", type=int, default=15, show_default=True, help="Groups to show.")
+@click.option("--hours", type=float, default=None, help="Only entries from the last N hours.")
+@click.option(
+    "--by",
+    type=click.Choice(["fingerprint", "caller", "endpoint"]),
+    default="fingerprint",
+    show_default=True,
+    help="Group by statement, innermost app frame or view endpoint.",
+)
+@click.option("--file", "path", type=click.Path(dir_okay=False), default=None)
+def slow_queries(top: int, hours: float | None, by: str, path: str | None) -> None:
+    """Summarize the slow query log, worst total time first."""
+    from .utils.slow_queries import aggregate, read_entries
+
+    path = path or current_app.config["SLOW_QUERY_LOG"]
+    since = datetime.now(UTC) - timedelta(hours=hours) if hours else None
+    groups = aggregate(read_entries(path, since=since), key=by)
+    if not groups:
+        click.echo(f"No slow queries logged in {path}.")
+        return
+    for group in groups[:top]:
+        click.echo(
+            f"{group['total_ms']:>10.0f} ms total  {group['count']:>6}x  "
+            f"p95 {group['p95_ms']:.0f} ms  max {group['max_ms']:.0f} ms  [{group['key']}]"
+        )
+        if by == "fingerprint":
+            click.echo(f"    {group['sql'][:200]}")
+        for caller, count in sorted(group["callers"].items(), key=lambda item: -item[1])[:3]:
+            click.echo(f"    {count:>6}x {caller}")
+        endpoints = sorted(group["endpoints"].items(), key=lambda item: -item[1])[:3]
+        click.echo("    endpoints: " + ", ".join(f"{name} ({count})" for name, count in endpoints))
+
+
+@click.command("traces")
+@click.option("--top", type=int, default=5, show_default=True, help="Traces to show.")
+@click.option("--hours", type=float, default=None, help="Only traces from the last N hours.")
+@click.option("--endpoint", default=None, help="Only traces whose root span contains this.")
+@click.option("--depth", type=int, default=8, show_default=True, help="Levels of spans to print.")
+@click.option("--file", "path", type=click.Path(dir_okay=False), default=None)
+def traces(
+    top: int, hours: float | None, endpoint: str | None, depth: int, path: str | None
+) -> None:
+    """Print the slowest recorded traces as span trees, repeated calls grouped."""
+    from .utils.tracing import read_traces, render_tree, trace_started_at
+
+    path = path or current_app.config["TRACE_FILE"]
+    since = datetime.now(UTC) - timedelta(hours=hours) if hours else None
+    found = [
+        spans
+        for spans in read_traces(path, since=since)
+        if endpoint is None or endpoint in spans[0]["name"]
+    ]
+    if not found:
+        click.echo(f"No traces recorded in {path}.")
+        return
+    found.sort(key=lambda spans: spans[0]["ms"], reverse=True)
+    for spans in found[:top]:
+        started = trace_started_at(spans)
+        click.echo(f"trace {spans[0]['trace_id']}  {started:%Y-%m-%d %H:%M:%S}")
+        for line in render_tree(spans, max_depth=depth):
+            click.echo(line)
+        click.echo("")
@@ -6,7 +6,9 @@ from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import CSRFProtect
 
-db = SQLAlchemy()
+# Repositories commit at the end of every ``session_scope``; keeping loaded
+# attributes after commit stops templates from re-selecting each row.
+db = SQLAlchemy(session_options={"expire_on_commit": False})
 migrate = Migrate()
 csrf = CSRFProtect()
 
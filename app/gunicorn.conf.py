@@ -2,6 +2,8 @@
 
 import multiprocessing
 import os
+import shutil
+import tempfile
 
 bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
 workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
@@ -9,3 +11,24 @@ threads = int(os.environ.get("GUNICORN_THREADS", 1))
 worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
 preload_app = True
 timeout = int(os.environ.get("GUNICORN_TIMEOUT", 90))
+
+# Workers write Prometheus samples here so /metrics can sum them. It must be
+# set before the app (and prometheus_client) is imported, hence here.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "chaoticnexus-metrics")
+)
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be summed into this one.
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:  # pragma: no cover - optional dependency
+        return
+    multiprocess.mark_process_dead(worker.pid)
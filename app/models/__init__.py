@@ -3,17 +3,23 @@
 from __future__ import annotations
 
 from .base import BaseModel
+from .blob import Blob
 from .customer import Contact, Customer
 from .customer_account import CustomerAccount
 from .job import Job, JobEditHistory, JobPhoto, TimeLog
+from .notification import NOTIFICATION_STATUSES, Notification
 from .powder import InventoryLog, JobPowder, Powder, PowderUsage, ReorderSetting
 from .print_template import PrintTemplate
+from .scheduled_job import ScheduledJob
 from .setting import Setting
 from .sprayer import SprayBatch, SprayBatchJob
+from .sync import SYNCED_ENTITIES, Tombstone
+from .task import TASK_STATUSES, Task
 from .user import User
 
 __all__ = [
     "BaseModel",
+    "Blob",
     "Contact",
     "Customer",
     "CustomerAccount",
@@ -22,13 +28,20 @@ __all__ = [
     "JobEditHistory",
     "JobPhoto",
     "JobPowder",
+    "NOTIFICATION_STATUSES",
+    "Notification",
     "Powder",
     "PowderUsage",
     "ReorderSetting",
     "PrintTemplate",
+    "ScheduledJob",
     "SprayBatch",
     "SprayBatchJob",
     "Setting",
+    "SYNCED_ENTITIES",
+    "TASK_STATUSES",
+    "Task",
     "TimeLog",
+    "Tombstone",
     "User",
 ]
@@ -0,0 +1,33 @@
+"""Content-addressed upload storage."""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, Integer, String
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+
+class Blob(BaseModel, TimestampMixin):
+    """One stored file, shared by every upload with the same SHA-256.
+
+    The bytes live at ``UPLOADS_DIR/blobs/<sha[:2]>/<sha[2:4]>/<sha>``;
+    ``ref_count`` counts the rows (job photos) pointing at it.
+    """
+
+    __tablename__ = "blobs"
+    __repr_attrs__ = ("id", "sha256", "ref_count")
+
+    sha256 = Column(String(64), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(120), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    @property
+    def path(self) -> str:
+        """Location relative to UPLOADS_DIR."""
+        return blob_path(self.sha256)
+
+
+def blob_path(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
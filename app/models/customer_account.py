@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -14,6 +14,13 @@ class CustomerAccount(BaseModel, TimestampMixin):
 
     __tablename__ = "customer_accounts"
     __repr_attrs__ = ("id", "email", "is_active")
+    __table_args__ = (
+        Index(
+            "ix_customer_accounts_reset_token",
+            "reset_token",
+            postgresql_where=text("reset_token IS NOT NULL"),
+        ),
+    )
 
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -2,7 +2,19 @@
 
 from __future__ import annotations
 
-from sqlalchemy import JSON, Boolean, Column, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -14,6 +26,24 @@ class Job(BaseModel, TimestampMixin, SoftDeleteMixin):
 
     __tablename__ = "jobs"
     __repr_attrs__ = ("id", "company", "status")
+    __table_args__ = (
+        Index("ix_jobs_department", "department"),
+        Index("ix_jobs_completed_at", "completed_at"),
+        Index("ix_jobs_due_by", "due_by"),
+        Index("ix_jobs_updated_at", "updated_at"),
+        Index("ix_jobs_customer_account_created", "customer_account_id", "created_at"),
+        Index(
+            "ix_jobs_on_screen_order",
+            "screen_order_index",
+            postgresql_where=text("on_screen"),
+        ),
+        Index(
+            "ix_jobs_active_department",
+            "department",
+            "id",
+            postgresql_where=text("NOT archived AND completed_at IS NULL"),
+        ),
+    )
 
     date_in = Column(Date, nullable=True)
     due_by = Column(Date, nullable=True)
@@ -77,8 +107,17 @@ class JobPhoto(BaseModel, TimestampMixin):
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
     filename = Column(String(255), nullable=False)
     original_name = Column(String(255), nullable=True)
+    # Set for content-addressed uploads (filename is then the blob path);
+    # NULL for legacy per-job files.
+    blob_id = Column(Integer, ForeignKey("blobs.id"), nullable=True, index=True)
+    # Web renditions keyed by name ("thumb", "medium", "full" for HEIC):
+    # {"path": <relative to UPLOADS_DIR>, "width": int, "height": int}.
+    derivatives = Column(JSON, nullable=True)
+    # NULL until processed, then "ready", "skipped" (not an image) or "failed".
+    derivatives_status = Column(String(20), nullable=True)
 
     job = relationship("Job", back_populates="photos")
+    blob = relationship("Blob")
 
 
 class JobEditHistory(BaseModel, TimestampMixin):
@@ -0,0 +1,42 @@
+"""Transactional outbox for customer email notifications."""
+
+from __future__ import annotations
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func, text
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+NOTIFICATION_STATUSES = ("pending", "sending", "sent", "failed", "superseded")
+
+
+class Notification(BaseModel, TimestampMixin):
+    """An email to send, written in the same transaction as the change it reports.
+
+    Rows sharing a ``coalesce_key`` while ``pending`` are merged into one, so a
+    burst of changes to the same job produces a single message. The dispatcher
+    renders ``kind`` with ``payload`` at send time.
+    """
+
+    __tablename__ = "notifications"
+    __repr_attrs__ = ("id", "kind", "recipient", "status")
+    __table_args__ = (
+        Index(
+            "ix_notifications_due",
+            "send_after",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        Index("ix_notifications_coalesce_key", "coalesce_key", "status"),
+    )
+
+    kind = Column(String(50), nullable=False)
+    recipient = Column(String(255), nullable=False)
+    coalesce_key = Column(String(120), nullable=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="pending", server_default="pending")
+    send_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error = Column(Text, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
@@ -2,16 +2,32 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    event,
+    inspect,
+)
 from sqlalchemy.orm import relationship
 
+from ..utils.color import hex_to_lab, parse_color_code
 from .base import BaseModel
 from .mixins import TimestampMixin
 
+_LAB_INPUTS = ("product_code", "additional_code", "lab_source")
+
 
 class Powder(BaseModel, TimestampMixin):
     __tablename__ = "powders"
     __repr_attrs__ = ("id", "powder_color", "manufacturer")
+    __table_args__ = (Index("ix_powders_updated_at", "updated_at"),)
 
     powder_color = Column(String(255), nullable=False, index=True)
     manufacturer = Column(String(255), nullable=True)
@@ -40,6 +56,17 @@ class Powder(BaseModel, TimestampMixin):
     on_hand_kg = Column(Numeric(10, 2), nullable=True)
     last_weighed_kg = Column(Numeric(10, 2), nullable=True)
     last_weighed_at = Column(DateTime(timezone=True), nullable=True)
+    # CIELAB color used by /powders/match.json. Derived from a RAL or #hex
+    # reference in the codes unless lab_source is "manual"; without such a
+    # reference the photo color (picture_hex) is used, source "photo".
+    lab_l = Column(Float, nullable=True)
+    lab_a = Column(Float, nullable=True)
+    lab_b = Column(Float, nullable=True)
+    lab_source = Column(String(20), nullable=True)
+    # Dominant color of picture_url and the hash of the image it came from,
+    # so unchanged photos are skipped on the next extraction run.
+    picture_hex = Column(String(7), nullable=True)
+    picture_sha256 = Column(String(64), nullable=True)
 
     job_powders = relationship("JobPowder", back_populates="powder", cascade="all, delete-orphan")
     inventory_logs = relationship(
@@ -53,10 +80,45 @@ class Powder(BaseModel, TimestampMixin):
     )
 
 
+def derive_lab(target: Powder) -> None:
+    """Set ``target``'s Lab color unless it was entered manually.
+
+    A RAL/#hex code wins; without one the photo color (``picture_hex``) is
+    used, so clearing a manual value brings back the color it overrode.
+    """
+    if target.lab_source == "manual":
+        return
+    parsed = parse_color_code(target.product_code, target.additional_code)
+    if parsed is None:
+        if target.lab_source == "photo" and target.lab_l is not None:
+            return  # keep the extracted value, which is finer than its hex
+        if target.picture_hex:
+            target.lab_l, target.lab_a, target.lab_b = hex_to_lab(target.picture_hex)
+            target.lab_source = "photo"
+        else:
+            target.lab_l = target.lab_a = target.lab_b = target.lab_source = None
+        return
+    source, hex_value = parsed
+    target.lab_l, target.lab_a, target.lab_b = hex_to_lab(hex_value)
+    target.lab_source = source
+
+
+@event.listens_for(Powder, "before_insert")
+def _derive_lab_on_insert(mapper, connection, target: Powder) -> None:
+    derive_lab(target)
+
+
+@event.listens_for(Powder, "before_update")
+def _derive_lab_on_update(mapper, connection, target: Powder) -> None:
+    attrs = inspect(target).attrs
+    if any(attrs[name].history.has_changes() for name in _LAB_INPUTS):
+        derive_lab(target)
+
+
 class JobPowder(BaseModel, TimestampMixin):
     __tablename__ = "job_powders"
 
-    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
     powder_id = Column(Integer, ForeignKey("powders.id", ondelete="SET NULL"), nullable=True)
     powder_color = Column(String(255), nullable=True)
     manufacturer = Column(String(255), nullable=True)
@@ -70,6 +132,7 @@ class JobPowder(BaseModel, TimestampMixin):
 class InventoryLog(BaseModel, TimestampMixin):
     __tablename__ = "inventory_log"
     __repr_attrs__ = ("id", "powder_id", "change_type")
+    __table_args__ = (Index("ix_inventory_log_powder_created", "powder_id", "created_at"),)
 
     powder_id = Column(Integer, ForeignKey("powders.id", ondelete="CASCADE"), nullable=False)
     change_type = Column(String(120), nullable=False)
@@ -97,7 +160,7 @@ class PowderUsage(BaseModel, TimestampMixin):
     __tablename__ = "powder_usage"
 
     powder_id = Column(Integer, ForeignKey("powders.id", ondelete="CASCADE"), nullable=False)
-    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
+    job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False, index=True)
     amount_used = Column(Numeric(10, 2), nullable=True)
     notes = Column(Text, nullable=True)
 
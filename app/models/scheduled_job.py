@@ -0,0 +1,37 @@
+"""Run state of the periodic maintenance jobs."""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+
+class ScheduledJob(BaseModel, TimestampMixin):
+    """One registered periodic job: its schedule, next run and last outcome.
+
+    Rows are written only by the elected scheduler process; the admin status
+    page reads them, and sets ``next_run_at`` to now for "run now".
+    """
+
+    __tablename__ = "scheduled_jobs"
+    __repr_attrs__ = ("id", "name", "next_run_at")
+
+    name = Column(String(120), nullable=False, unique=True)
+    schedule = Column(String(120), nullable=False)
+    next_run_at = Column(DateTime(timezone=True), nullable=False)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+    # "running", "ok" or "failed".
+    last_status = Column(String(20), nullable=True)
+    last_result = Column(String(255), nullable=True)
+    last_error = Column(Text, nullable=True)
+    run_count = Column(Integer, nullable=False, default=0, server_default="0")
+    failure_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_duration_ms = Column(Float, nullable=False, default=0.0, server_default="0")
+
+    @property
+    def mean_duration_ms(self) -> float | None:
+        return self.total_duration_ms / self.run_count if self.run_count else None
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric, String, Text
 from sqlalchemy.orm import relationship
 
 from .base import BaseModel
@@ -11,6 +11,7 @@ from .mixins import TimestampMixin
 
 class SprayBatch(BaseModel, TimestampMixin):
     __tablename__ = "spray_batch"
+    __table_args__ = (Index("ix_spray_batch_ended_at", "ended_at"),)
 
     powder_id = Column(Integer, ForeignKey("powders.id", ondelete="RESTRICT"), nullable=False)
     role = Column(String(50), nullable=True)
@@ -29,6 +30,7 @@ class SprayBatch(BaseModel, TimestampMixin):
 
 class SprayBatchJob(BaseModel, TimestampMixin):
     __tablename__ = "spray_batch_jobs"
+    __table_args__ = (Index("uq_spray_batch_jobs_batch_job", "batch_id", "job_id", unique=True),)
 
     batch_id = Column(Integer, ForeignKey("spray_batch.id", ondelete="CASCADE"), nullable=False)
     job_id = Column(Integer, ForeignKey("jobs.id", ondelete="CASCADE"), nullable=False)
@@ -0,0 +1,35 @@
+"""Tombstones recording deleted rows for delta-sync clients."""
+
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, event, func, insert
+
+from .base import BaseModel
+from .job import Job
+from .powder import Powder
+
+
+class Tombstone(BaseModel):
+    """One deleted row of a synced entity, kept so clients can drop it locally."""
+
+    __tablename__ = "sync_tombstones"
+    __repr_attrs__ = ("id", "entity", "entity_id")
+    __table_args__ = (Index("ix_sync_tombstones_entity_deleted", "entity", "deleted_at"),)
+
+    entity = Column(String(60), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+# Entities exposed through ``?since=`` delta endpoints, keyed by tombstone name.
+SYNCED_ENTITIES: dict[str, type[BaseModel]] = {"powders": Powder, "jobs": Job}
+
+
+def _register_tombstone_listener(entity: str, model: type[BaseModel]) -> None:
+    @event.listens_for(model, "after_delete")
+    def _record_tombstone(mapper, connection, target) -> None:
+        connection.execute(insert(Tombstone.__table__).values(entity=entity, entity_id=target.id))
+
+
+for _entity, _model in SYNCED_ENTITIES.items():
+    _register_tombstone_listener(_entity, _model)
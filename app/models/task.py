@@ -0,0 +1,45 @@
+"""Durable background tasks consumed by ``flask worker``."""
+
+from __future__ import annotations
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text, func, text
+
+from .base import BaseModel
+from .mixins import TimestampMixin
+
+TASK_STATUSES = ("queued", "running", "done", "failed")
+
+
+class Task(BaseModel, TimestampMixin):
+    """One unit of deferred work: a registered handler name plus its arguments.
+
+    ``queued`` tasks whose ``run_at`` has passed are claimed highest
+    ``priority`` first. A failed attempt goes back to ``queued`` with a later
+    ``run_at`` until ``max_attempts`` is reached, then stays ``failed``.
+    """
+
+    __tablename__ = "tasks"
+    __repr_attrs__ = ("id", "name", "status", "attempts")
+    __table_args__ = (
+        # Only queued rows are scanned when claiming, so index just those.
+        Index(
+            "ix_tasks_claim",
+            text("priority DESC"),
+            "run_at",
+            postgresql_where=text("status = 'queued'"),
+            sqlite_where=text("status = 'queued'"),
+        ),
+        Index("ix_tasks_status_finished", "status", "finished_at"),
+    )
+
+    name = Column(String(120), nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String(20), nullable=False, default="queued", server_default="queued")
+    priority = Column(Integer, nullable=False, default=0, server_default="0")
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String(120), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
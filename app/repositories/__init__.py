@@ -2,24 +2,34 @@
 
 from __future__ import annotations
 
+from .blobs import BlobRepository, blob_repo
 from .customers import CustomerRepository, customer_repo
 from .inventory import InventoryRepository, inventory_repo
-from .jobs import JobRepository, job_repo
+from .jobs import JobDetailView, JobRepository, job_repo
+from .notifications import NotificationRepository, notification_repo
 from .powders import PowderRepository, powder_repo
 from .session import get_session, session_scope
 from .settings import SettingsRepository, settings_repo
+from .tasks import TaskRepository, task_repo
 
 __all__ = [
+    "BlobRepository",
     "CustomerRepository",
     "InventoryRepository",
+    "JobDetailView",
     "JobRepository",
+    "NotificationRepository",
     "PowderRepository",
     "SettingsRepository",
+    "TaskRepository",
+    "blob_repo",
     "customer_repo",
     "inventory_repo",
     "job_repo",
+    "notification_repo",
     "powder_repo",
     "settings_repo",
+    "task_repo",
     "get_session",
     "session_scope",
 ]
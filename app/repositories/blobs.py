@@ -0,0 +1,115 @@
+"""Repository for reference-counted, content-addressed upload blobs."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models import Blob, JobPhoto
+from .session import session_scope
+
+
+class BlobRepository:
+    """Track blobs by SHA-256 and count the rows referencing each one.
+
+    Counts change under a row lock (``SELECT ... FOR UPDATE`` on PostgreSQL),
+    so an upload taking a reference and a delete dropping the last one cannot
+    interleave: whichever locks second sees the other's result.
+    """
+
+    def __init__(self) -> None:
+        self._unreferenced_listeners: list[Callable[[Blob], None]] = []
+
+    def on_unreferenced(self, listener: Callable[[Blob], None]) -> None:
+        """Call ``listener(blob)`` when a blob loses its last reference.
+
+        Listeners run inside the releasing transaction while the blob row is
+        still locked, so they can remove the stored bytes before a concurrent
+        upload of the same content is allowed to re-create the row.
+        """
+        self._unreferenced_listeners.append(listener)
+
+    def get_by_sha256(self, sha256: str) -> Blob | None:
+        with session_scope() as session:
+            return session.execute(select(Blob).filter(Blob.sha256 == sha256)).scalar_one_or_none()
+
+    def acquire(self, sha256: str, *, size: int, content_type: str | None = None) -> Blob:
+        """Take a reference to the blob for ``sha256``, creating its row if needed."""
+        try:
+            return self._acquire(sha256, size=size, content_type=content_type)
+        except IntegrityError:
+            # Another request inserted the same hash first; count against its row.
+            return self._acquire(sha256, size=size, content_type=content_type)
+
+    def _acquire(self, sha256: str, *, size: int, content_type: str | None) -> Blob:
+        with session_scope() as session:
+            blob = session.execute(
+                select(Blob).filter(Blob.sha256 == sha256).with_for_update()
+            ).scalar_one_or_none()
+            if blob is None:
+                blob = Blob(sha256=sha256, size=size, content_type=content_type, ref_count=0)
+                session.add(blob)
+            blob.ref_count += 1
+            session.flush()
+            return blob
+
+    def release_in(self, session: Session, blob_id: int | None) -> None:
+        """Drop one reference within the caller's transaction.
+
+        At zero the unreferenced listeners run and the row is deleted.
+        """
+        if blob_id is None:
+            return
+        blob = session.execute(
+            select(Blob).filter(Blob.id == blob_id).with_for_update()
+        ).scalar_one_or_none()
+        if blob is None:
+            return
+        blob.ref_count -= 1
+        if blob.ref_count > 0:
+            return
+        for listener in self._unreferenced_listeners:
+            listener(blob)
+        session.delete(blob)
+
+    def release(self, blob_id: int | None) -> None:
+        with session_scope() as session:
+            self.release_in(session, blob_id)
+
+    def list_sha256s(self) -> set[str]:
+        with session_scope() as session:
+            return set(session.execute(select(Blob.sha256)).scalars())
+
+    def reconcile(self, *, untouched_before: datetime) -> tuple[int, int]:
+        """Repair reference counts from the photo rows; returns ``(fixed, removed)``.
+
+        Only blobs not acquired since ``untouched_before`` are checked: a fresh
+        upload holds its reference before its photo row exists. Blobs left
+        with no photo are released (files removed by the listeners).
+        """
+        refs = select(func.count(JobPhoto.id)).where(JobPhoto.blob_id == Blob.id).scalar_subquery()
+        stmt = (
+            select(Blob, refs)
+            .filter(Blob.updated_at < untouched_before, Blob.ref_count != refs)
+            .with_for_update(skip_locked=True, of=Blob)
+        )
+        fixed = removed = 0
+        with session_scope() as session:
+            for blob, count in session.execute(stmt).all():
+                if count:
+                    blob.ref_count = count
+                    fixed += 1
+                    continue
+                for listener in self._unreferenced_listeners:
+                    listener(blob)
+                session.delete(blob)
+                removed += 1
+            session.flush()
+        return fixed, removed
+
+
+blob_repo = BlobRepository()
@@ -7,9 +7,20 @@ from collections.abc import Iterable
 from sqlalchemy import select
 
 from ..models import Contact, Customer, CustomerAccount
+from .projections import CUSTOMER_SEARCH_COLUMNS, CustomerSearchRow, project
 from .session import session_scope
 
 
+def _customer_search_filter(query: str):
+    like = f"%{query}%"
+    return (
+        Customer.company.ilike(like)
+        | Customer.contact_name.ilike(like)
+        | Customer.email.ilike(like)
+        | Customer.phone.ilike(like)
+    )
+
+
 class CustomerRepository:
     """Encapsulate database access for customers and contacts."""
 
@@ -42,20 +53,21 @@ class CustomerRepository:
         return select(Customer).filter(Customer.company.ilike(company_name))
 
     def search_customers(self, query: str) -> list[Customer]:
-        like = f"%{query}%"
         with session_scope() as session:
             stmt = (
-                select(Customer)
-                .filter(
-                    Customer.company.ilike(like)
-                    | Customer.contact_name.ilike(like)
-                    | Customer.email.ilike(like)
-                    | Customer.phone.ilike(like)
-                )
-                .order_by(Customer.company)
+                select(Customer).filter(_customer_search_filter(query)).order_by(Customer.company)
             )
             return session.execute(stmt).scalars().all()
 
+    def search_customer_rows(self, query: str) -> list[CustomerSearchRow]:
+        stmt = (
+            select(*CUSTOMER_SEARCH_COLUMNS)
+            .filter(_customer_search_filter(query))
+            .order_by(Customer.company)
+        )
+        with session_scope() as session:
+            return project(CustomerSearchRow, session.execute(stmt))
+
     # Customer portal accounts (admin side)
     def list_accounts(self, customer_id: int | None = None) -> list[CustomerAccount]:
         with session_scope() as session:
@@ -2,15 +2,32 @@
 
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Sequence
 
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from ..models import InventoryLog, Powder, ReorderSetting
+from .powders import POWDER_LOAD_PROFILES
+from .projections import POWDER_STOCK_COLUMNS, PowderStockRow, project
 from .session import session_scope
 
 
+def _filter_powders(stmt, *, search: str | None, manufacturer: str | None):
+    if search:
+        like = f"%{search}%"
+        stmt = stmt.filter(
+            Powder.powder_color.ilike(like)
+            | Powder.product_code.ilike(like)
+            | Powder.manufacturer.ilike(like)
+            | Powder.color_family.ilike(like)
+        )
+    if manufacturer:
+        stmt = stmt.filter(Powder.manufacturer == manufacturer)
+    return stmt
+
+
 class InventoryRepository:
     """Encapsulates data access for powder inventory features."""
 
@@ -19,32 +36,48 @@ class InventoryRepository:
         *,
         search: str | None = None,
         manufacturer: str | None = None,
+        profile: str = "stock",
     ) -> list[Powder]:
-        """Return powders with related inventory metadata eagerly loaded."""
+        """Return powders for inventory screens.
 
-        stmt = (
-            select(Powder)
-            .options(
+        The default ``stock`` profile loads only the stock columns; ``full``
+        also eagerly loads reorder settings and the inventory log.
+        """
+
+        stmt = select(Powder).options(*POWDER_LOAD_PROFILES[profile])
+        if profile == "full":
+            stmt = stmt.options(
                 selectinload(Powder.reorder_settings),
                 selectinload(Powder.inventory_logs),
             )
-            .order_by(Powder.powder_color)
+        stmt = _filter_powders(
+            stmt.order_by(Powder.powder_color), search=search, manufacturer=manufacturer
         )
 
-        if search:
-            like = f"%{search}%"
-            stmt = stmt.filter(
-                Powder.powder_color.ilike(like)
-                | Powder.product_code.ilike(like)
-                | Powder.manufacturer.ilike(like)
-                | Powder.color_family.ilike(like)
-            )
+        with session_scope() as session:
+            return session.execute(stmt).scalars().unique().all()
 
-        if manufacturer:
-            stmt = stmt.filter(Powder.manufacturer == manufacturer)
+    def list_powder_stock_rows(
+        self,
+        *,
+        search: str | None = None,
+        manufacturer: str | None = None,
+        changed_since: datetime | None = None,
+    ) -> list[PowderStockRow]:
+        """Return stock projections for the inventory JSON API.
 
+        ``changed_since`` limits the result to rows updated at or after that time.
+        """
+
+        stmt = _filter_powders(
+            select(*POWDER_STOCK_COLUMNS).order_by(Powder.powder_color),
+            search=search,
+            manufacturer=manufacturer,
+        )
+        if changed_since is not None:
+            stmt = stmt.filter(Powder.updated_at >= changed_since)
         with session_scope() as session:
-            return session.execute(stmt).scalars().unique().all()
+            return project(PowderStockRow, session.execute(stmt))
 
     def get_powder(self, powder_id: int) -> Powder | None:
         """Fetch a single powder by identifier."""
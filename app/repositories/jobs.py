@@ -3,18 +3,96 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+from dataclasses import dataclass
 from datetime import datetime
+from decimal import Decimal
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
 from ..models import Customer, Job, JobPhoto, JobPowder, PowderUsage, TimeLog
+from .blobs import blob_repo
+from .notifications import notification_repo
+from .projections import JOB_CARD_COLUMNS, JOB_LIST_COLUMNS, JobCardRow, JobListRow, project
 from .session import session_scope
 
+_JOB_SUMMARY_COLUMNS = (
+    Job.id,
+    Job.company,
+    Job.status,
+    Job.department,
+    Job.priority,
+    Job.color,
+    Job.po,
+    Job.type,
+    Job.date_in,
+    Job.due_by,
+    Job.completed_at,
+    Job.archived,
+    Job.on_screen,
+    Job.screen_order_index,
+    Job.customer_id,
+    Job.customer_account_id,
+    Job.created_at,
+    Job.updated_at,
+)
+_JOB_CUSTOMER_NAME = selectinload(Job.customer).load_only(Customer.id, Customer.company)
+
+# Column groups per view. Cards render a few scalar fields, so the notes and
+# work order JSON stay deferred until the detail page (or a lazy access) asks
+# for them.
+JOB_LOAD_PROFILES: dict[str, tuple] = {
+    "summary": (load_only(*_JOB_SUMMARY_COLUMNS),),
+    "card": (load_only(*_JOB_SUMMARY_COLUMNS, Job.description), _JOB_CUSTOMER_NAME),
+    "card_notes": (
+        load_only(*_JOB_SUMMARY_COLUMNS, Job.description, Job.notes, Job.shop_notes),
+        _JOB_CUSTOMER_NAME,
+    ),
+    "index": (
+        load_only(*_JOB_SUMMARY_COLUMNS, Job.description, Job.notes, Job.shop_notes),
+        _JOB_CUSTOMER_NAME,
+        selectinload(Job.photos).load_only(JobPhoto.id, JobPhoto.job_id),
+    ),
+    "full": (selectinload(Job.customer),),
+}
+
+
+def _queue_status_notification(session, job: Job, previous_status: str | None) -> None:
+    """Tell the job's portal account about a status change, in this transaction.
+
+    Changes are coalesced per job: a burst of edits sends one email with the
+    status the job settles on, and none if it settles back where it started.
+    """
+    if job.status == previous_status or job.customer_account_id is None:
+        return
+    account = job.customer_account
+    if account is None or not account.is_active or not account.email:
+        return
+    notification_repo.queue_in(
+        session,
+        kind="job_status",
+        recipient=account.email,
+        payload={"job_id": job.id, "status": job.status, "previous_status": previous_status},
+        coalesce_key=f"job-status:{job.id}",
+        keep=("previous_status",),
+    )
+
+
+@dataclass(frozen=True)
+class JobDetailView:
+    """Everything the job detail and worksheet pages render for one job."""
+
+    job: Job
+    photos: list[JobPhoto]
+    time_logs: list[TimeLog]
+    powder_usage: list[PowderUsage]
+    total_minutes: int
+    total_powder_kg: Decimal
+
 
 class JobRepository:
-    def list_jobs(self, *, query: str | None = None) -> Iterable[Job]:
-        stmt = select(Job).options(selectinload(Job.customer)).order_by(Job.id.desc())
+    def list_jobs(self, *, query: str | None = None, profile: str = "card") -> Iterable[Job]:
+        stmt = select(Job).options(*JOB_LOAD_PROFILES[profile]).order_by(Job.id.desc())
         if query:
             like = f"%{query}%"
             stmt = stmt.filter(Job.company.ilike(like) | Job.description.ilike(like))
@@ -22,6 +100,34 @@ class JobRepository:
         with session_scope() as session:
             return session.execute(stmt).scalars().all()
 
+    def list_job_card_rows(
+        self,
+        *,
+        on_screen: bool | None = None,
+        active_only: bool = False,
+    ) -> list[JobCardRow]:
+        """Return card projections for the shop-floor JSON feeds."""
+
+        stmt = select(*JOB_CARD_COLUMNS).order_by(Job.id.desc())
+        # Bare boolean predicates so PostgreSQL can match the partial indexes.
+        if on_screen is not None:
+            stmt = stmt.filter(Job.on_screen if on_screen else ~Job.on_screen)
+        if active_only:
+            stmt = stmt.filter(~Job.archived, Job.completed_at.is_(None))
+
+        with session_scope() as session:
+            return project(JobCardRow, session.execute(stmt))
+
+    def list_job_rows(self, *, changed_since: datetime | None = None) -> list[JobListRow]:
+        """Return list projections for the jobs JSON API, optionally only recent changes."""
+
+        stmt = select(*JOB_LIST_COLUMNS).order_by(Job.id.desc())
+        if changed_since is not None:
+            stmt = stmt.filter(Job.updated_at >= changed_since)
+
+        with session_scope() as session:
+            return project(JobListRow, session.execute(stmt))
+
     def create_job(
         self,
         *,
@@ -79,9 +185,11 @@ class JobRepository:
             if not job:
                 return None
 
+            previous_status = job.status
             for key, value in fields.items():
                 if key in allowed_fields:
                     setattr(job, key, value)
+            _queue_status_notification(session, job, previous_status)
 
             session.flush()
             return job
@@ -100,6 +208,64 @@ class JobRepository:
                 .filter(Job.id == job_id)
             ).scalar_one_or_none()
 
+    def get_job_detail(self, job_id: int) -> JobDetailView | None:
+        """Load a job and its detail-page collections in five queries."""
+
+        with session_scope() as session:
+            job = session.execute(
+                select(Job)
+                .options(joinedload(Job.customer), joinedload(Job.customer_account))
+                .filter(Job.id == job_id)
+            ).scalar_one_or_none()
+            if job is None:
+                return None
+
+            photos = (
+                session.execute(
+                    select(JobPhoto).filter(JobPhoto.job_id == job_id).order_by(JobPhoto.id)
+                )
+                .scalars()
+                .all()
+            )
+            time_logs = (
+                session.execute(
+                    select(TimeLog)
+                    .filter(TimeLog.job_id == job_id)
+                    .order_by(TimeLog.start_ts.desc())
+                )
+                .scalars()
+                .all()
+            )
+            powder_usage = (
+                session.execute(
+                    select(PowderUsage)
+                    .options(joinedload(PowderUsage.powder))
+                    .filter(PowderUsage.job_id == job_id)
+                    .order_by(PowderUsage.created_at.desc())
+                )
+                .scalars()
+                .all()
+            )
+            total_minutes, total_powder = session.execute(
+                select(
+                    select(func.coalesce(func.sum(TimeLog.minutes), 0))
+                    .filter(TimeLog.job_id == job_id)
+                    .scalar_subquery(),
+                    select(func.coalesce(func.sum(PowderUsage.amount_used), 0))
+                    .filter(PowderUsage.job_id == job_id)
+                    .scalar_subquery(),
+                )
+            ).one()
+
+            return JobDetailView(
+                job=job,
+                photos=list(photos),
+                time_logs=list(time_logs),
+                powder_usage=list(powder_usage),
+                total_minutes=int(total_minutes or 0),
+                total_powder_kg=Decimal(str(total_powder or 0)),
+            )
+
     def list_time_logs(self, job_id: int) -> Iterable[TimeLog]:
         with session_scope() as session:
             return (
@@ -132,18 +298,88 @@ class JobRepository:
                 session.execute(select(JobPhoto).filter(JobPhoto.job_id == job_id)).scalars().all()
             )
 
-    def add_photo(self, job_id: int, *, filename: str, original_name: str | None) -> JobPhoto:
+    def add_photo(
+        self,
+        job_id: int,
+        *,
+        filename: str,
+        original_name: str | None,
+        blob_id: int | None = None,
+    ) -> JobPhoto:
+        """Link an uploaded file; ``blob_id`` must carry a reference already acquired."""
         with session_scope() as session:
-            photo = JobPhoto(job_id=job_id, filename=filename, original_name=original_name)
+            photo = JobPhoto(
+                job_id=job_id, filename=filename, original_name=original_name, blob_id=blob_id
+            )
             session.add(photo)
             session.flush()
             return photo
 
+    def get_photo(self, photo_id: int) -> JobPhoto | None:
+        with session_scope() as session:
+            return session.get(JobPhoto, photo_id)
+
+    def list_photo_ids_needing_derivatives(
+        self, *, retry_failed: bool = False, limit: int | None = None
+    ) -> list[int]:
+        """Return ids of photos whose web renditions have not been built."""
+        pending = JobPhoto.derivatives_status.is_(None)
+        if retry_failed:
+            pending = pending | (JobPhoto.derivatives_status == "failed")
+        stmt = select(JobPhoto.id).filter(pending).order_by(JobPhoto.id).limit(limit)
+        with session_scope() as session:
+            return list(session.execute(stmt).scalars())
+
+    def find_blob_derivatives(self, blob_id: int) -> dict | None:
+        """Return ready renditions already built for another photo of ``blob_id``."""
+        stmt = (
+            select(JobPhoto.derivatives)
+            .filter(JobPhoto.blob_id == blob_id, JobPhoto.derivatives_status == "ready")
+            .limit(1)
+        )
+        with session_scope() as session:
+            return session.execute(stmt).scalar_one_or_none()
+
+    def list_legacy_photos(self) -> list[JobPhoto]:
+        """Photos still stored as per-job files rather than blobs."""
+        with session_scope() as session:
+            return list(
+                session.execute(
+                    select(JobPhoto).filter(JobPhoto.blob_id.is_(None)).order_by(JobPhoto.id)
+                ).scalars()
+            )
+
+    def move_photo_to_blob(self, photo_id: int, *, filename: str, blob_id: int) -> bool:
+        """Point a legacy photo at ``blob_id`` (reference already acquired)."""
+        with session_scope() as session:
+            photo = session.get(JobPhoto, photo_id)
+            if photo is None:
+                return False
+            photo.filename = filename
+            photo.blob_id = blob_id
+            photo.derivatives = None
+            photo.derivatives_status = None
+            session.flush()
+            return True
+
+    def set_photo_derivatives(
+        self, photo_id: int, *, status: str, derivatives: dict | None = None
+    ) -> bool:
+        with session_scope() as session:
+            photo = session.get(JobPhoto, photo_id)
+            if photo is None:
+                return False
+            photo.derivatives = derivatives
+            photo.derivatives_status = status
+            session.flush()
+            return True
+
     def delete_photo(self, job_id: int, photo_id: int) -> bool:
         with session_scope() as session:
             photo = session.get(JobPhoto, photo_id)
             if not photo or photo.job_id != job_id:
                 return False
+            blob_repo.release_in(session, photo.blob_id)
             session.delete(photo)
             session.flush()
             return True
@@ -176,6 +412,26 @@ class JobRepository:
                     job.screen_order_index = index
             session.flush()
 
+    def compact_screen_order(self) -> int:
+        """Renumber on-screen jobs 0..n-1 in their current order; returns rows changed.
+
+        Repeated drag-and-drop leaves gaps and large indexes behind.
+        """
+        stmt = (
+            select(Job)
+            .options(load_only(Job.id, Job.screen_order_index))
+            .filter(Job.on_screen.is_(True), Job.screen_order_index.is_not(None))
+            .order_by(Job.screen_order_index, Job.id)
+        )
+        changed = 0
+        with session_scope() as session:
+            for index, job in enumerate(session.execute(stmt).scalars()):
+                if job.screen_order_index != index:
+                    job.screen_order_index = index
+                    changed += 1
+            session.flush()
+        return changed
+
     def reorder_jobs(self, job_ids_in_order: list[int]) -> None:
         """Set global order_index for jobs according to provided order.
 
@@ -213,7 +469,9 @@ class JobRepository:
             job = session.get(Job, job_id)
             if not job:
                 return False
+            previous_status = job.status
             job.status = "Completed"
+            _queue_status_notification(session, job, previous_status)
             job.department = "completed"
             job.completed_at = completed_at or datetime.utcnow()
             session.flush()
@@ -224,7 +482,9 @@ class JobRepository:
             job = session.get(Job, job_id)
             if not job:
                 return False
+            previous_status = job.status
             job.status = "In Progress"
+            _queue_status_notification(session, job, previous_status)
             job.department = "intake"
             job.completed_at = None
             session.flush()
@@ -235,6 +495,8 @@ class JobRepository:
             job = session.get(Job, job_id)
             if not job:
                 return False
+            for photo in job.photos:
+                blob_repo.release_in(session, photo.blob_id)
             session.delete(job)
             session.flush()
             return True
@@ -0,0 +1,169 @@
+"""Repository for the customer notification outbox."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Notification
+from .session import session_scope
+from .tasks import task_repo
+
+# Task that wakes a worker to send notifications queued for immediate delivery.
+DISPATCH_TASK = "notifications.dispatch"
+
+
+class NotificationRepository:
+    """Queue, claim and settle outbox rows.
+
+    Rows are added inside the transaction that makes the change they report,
+    so a rolled-back change never emails anyone and a committed one always
+    leaves a row for the dispatcher.
+    """
+
+    def queue_in(
+        self,
+        session: Session,
+        *,
+        kind: str,
+        recipient: str,
+        payload: dict,
+        coalesce_key: str | None = None,
+        keep: tuple[str, ...] = (),
+    ) -> Notification:
+        """Add a notification, or fold it into the pending one with the same key.
+
+        When folding, ``payload`` replaces the pending payload except for the
+        ``keep`` keys, which hold their first value (e.g. the status before a
+        burst of changes). Keyed rows are sent once they stop changing (see
+        :meth:`claim_due`); unkeyed rows also enqueue a dispatch task so a
+        worker sends them right away.
+        """
+        if coalesce_key is not None:
+            pending = session.execute(
+                select(Notification)
+                .filter(Notification.coalesce_key == coalesce_key, Notification.status == "pending")
+                .order_by(Notification.id)
+                .limit(1)
+                .with_for_update()
+            ).scalar_one_or_none()
+            if pending is not None:
+                merged = dict(payload)
+                merged.update({key: pending.payload[key] for key in keep if key in pending.payload})
+                pending.payload = merged
+                pending.recipient = recipient
+                # Bumping updated_at restarts the quiet period the dispatcher waits for.
+                pending.updated_at = func.now()
+                return pending
+        notification = Notification(
+            kind=kind, recipient=recipient, payload=payload, coalesce_key=coalesce_key
+        )
+        session.add(notification)
+        if coalesce_key is None:
+            task_repo.enqueue_in(session, DISPATCH_TASK, priority=10)
+        return notification
+
+    def claim_due(self, *, limit: int, settled_before: datetime) -> list[Notification]:
+        """Lock up to ``limit`` due rows and mark them ``sending``.
+
+        Keyed rows are due once unchanged since ``settled_before``. If racing
+        writers left two pending rows under one key, only the newest is
+        claimed and the others are marked ``superseded``.
+        """
+        stmt = (
+            select(Notification)
+            .filter(
+                Notification.status == "pending",
+                Notification.send_after <= func.now(),
+                or_(
+                    Notification.coalesce_key.is_(None),
+                    Notification.updated_at <= settled_before,
+                ),
+            )
+            .order_by(Notification.send_after, Notification.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        with session_scope() as session:
+            claimed: dict[object, Notification] = {}
+            for notification in session.execute(stmt).scalars():
+                key = notification.coalesce_key or ("id", notification.id)
+                previous = claimed.get(key)
+                if previous is not None:
+                    previous.status = "superseded"
+                claimed[key] = notification
+            for notification in claimed.values():
+                notification.status = "sending"
+                notification.attempts += 1
+                notification.locked_at = func.now()
+            session.flush()
+            return list(claimed.values())
+
+    def mark_sent(self, notification_ids: list[int]) -> None:
+        if not notification_ids:
+            return
+        with session_scope() as session:
+            session.execute(
+                update(Notification)
+                .where(Notification.id.in_(notification_ids))
+                .values(status="sent", sent_at=func.now(), locked_at=None, last_error=None)
+            )
+
+    def mark_superseded(self, notification_ids: list[int]) -> None:
+        """Settle rows that turned out to have nothing worth sending."""
+        if not notification_ids:
+            return
+        with session_scope() as session:
+            session.execute(
+                update(Notification)
+                .where(Notification.id.in_(notification_ids))
+                .values(status="superseded", locked_at=None)
+            )
+
+    def mark_failed(self, notification_id: int, error: str, *, retry_at: datetime | None) -> None:
+        """Record a failed send; back to ``pending`` at ``retry_at`` or give up when ``None``."""
+        values = {"last_error": error, "locked_at": None}
+        if retry_at is None:
+            values["status"] = "failed"
+        else:
+            values.update(status="pending", send_after=retry_at)
+        with session_scope() as session:
+            session.execute(
+                update(Notification).where(Notification.id == notification_id).values(**values)
+            )
+
+    def requeue_stale(self, locked_before: datetime) -> int:
+        """Return rows left ``sending`` by a dispatcher that died to ``pending``.
+
+        The message may already have gone out; sending is at-least-once.
+        """
+        with session_scope() as session:
+            result = session.execute(
+                update(Notification)
+                .where(Notification.status == "sending", Notification.locked_at < locked_before)
+                .values(status="pending", locked_at=None)
+            )
+            return result.rowcount or 0
+
+    def counts_by_status(self) -> dict[str, int]:
+        with session_scope() as session:
+            rows = session.execute(
+                select(Notification.status, func.count()).group_by(Notification.status)
+            )
+            return {status: count for status, count in rows}
+
+    def purge_settled(self, before: datetime) -> int:
+        """Delete sent, superseded and failed rows last touched before ``before``."""
+        with session_scope() as session:
+            result = session.execute(
+                delete(Notification).where(
+                    Notification.status.in_(("sent", "superseded", "failed")),
+                    Notification.updated_at < before,
+                )
+            )
+            return result.rowcount or 0
+
+
+notification_repo = NotificationRepository()
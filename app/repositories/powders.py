@@ -2,22 +2,83 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Callable, Collection, Iterable
+from datetime import datetime
 
 from sqlalchemy import select
+from sqlalchemy.orm import load_only
 
 from ..models import Powder
+from .projections import (
+    POWDER_COLOR_COLUMNS,
+    POWDER_SUGGEST_COLUMNS,
+    PowderColorRow,
+    PowderSuggestRow,
+    project,
+)
 from .session import session_scope
 
+_POWDER_STOCK_COLUMNS = (
+    Powder.id,
+    Powder.powder_color,
+    Powder.manufacturer,
+    Powder.product_code,
+    Powder.color_family,
+    Powder.in_stock,
+    Powder.on_hand_kg,
+)
+
+_PICTURE_COLOR_COLUMNS = (
+    Powder.id,
+    Powder.product_code,
+    Powder.additional_code,
+    Powder.lab_l,
+    Powder.lab_a,
+    Powder.lab_b,
+    Powder.lab_source,
+    Powder.picture_hex,
+    Powder.picture_sha256,
+)
+
+# Column groups per view. List pages only render a handful of fields, so the
+# notes, cure schedule and URL text blobs stay deferred until a detail view
+# touches them.
+POWDER_LOAD_PROFILES: dict[str, tuple] = {
+    "stock": (load_only(*_POWDER_STOCK_COLUMNS),),
+    "catalog": (
+        load_only(
+            *_POWDER_STOCK_COLUMNS,
+            Powder.gloss_level,
+            Powder.finish,
+            Powder.needs_clear,
+            Powder.notes,
+        ),
+    ),
+    "full": (),
+}
+
 
 class PowderRepository:
+    def __init__(self) -> None:
+        self._change_listeners: list[Callable[[int], None]] = []
+
+    def on_change(self, listener: Callable[[int], None]) -> Callable[[int], None]:
+        """Register ``listener(powder_id)``, called after a powder write commits."""
+        self._change_listeners.append(listener)
+        return listener
+
+    def _notify_change(self, powder_id: int) -> None:
+        for listener in self._change_listeners:
+            listener(powder_id)
+
     def list_powders(
         self,
         *,
         query: str | None = None,
         manufacturer: str | None = None,
+        profile: str = "catalog",
     ) -> Iterable[Powder]:
-        stmt = select(Powder).order_by(Powder.powder_color)
+        stmt = select(Powder).options(*POWDER_LOAD_PROFILES[profile]).order_by(Powder.powder_color)
         if query:
             like = f"%{query}%"
             stmt = stmt.filter(
@@ -61,6 +122,76 @@ class PowderRepository:
                 )
             return items
 
+    def list_suggest_rows(
+        self,
+        *,
+        ids: Collection[int] | None = None,
+        changed_since: datetime | None = None,
+    ) -> list[PowderSuggestRow]:
+        """Return the columns the color suggest index is built from."""
+        stmt = select(*POWDER_SUGGEST_COLUMNS)
+        if ids is not None:
+            stmt = stmt.filter(Powder.id.in_(ids))
+        if changed_since is not None:
+            stmt = stmt.filter(Powder.updated_at >= changed_since)
+        with session_scope() as session:
+            return project(PowderSuggestRow, session.execute(stmt))
+
+    def list_color_rows(
+        self,
+        *,
+        ids: Collection[int] | None = None,
+        changed_since: datetime | None = None,
+    ) -> list[PowderColorRow]:
+        """Return stock and CIELAB columns for the color match index."""
+        stmt = select(*POWDER_COLOR_COLUMNS)
+        if ids is not None:
+            stmt = stmt.filter(Powder.id.in_(ids))
+        if changed_since is not None:
+            stmt = stmt.filter(Powder.updated_at >= changed_since)
+        with session_scope() as session:
+            return project(PowderColorRow, session.execute(stmt))
+
+    def list_picture_sources(self) -> list[tuple[int, str, str | None]]:
+        """Return ``(id, picture_url, picture_sha256)`` for powders with a photo."""
+        stmt = (
+            select(Powder.id, Powder.picture_url, Powder.picture_sha256)
+            .filter(Powder.picture_url.isnot(None), Powder.picture_url != "")
+            .order_by(Powder.id)
+        )
+        with session_scope() as session:
+            return [tuple(row) for row in session.execute(stmt)]
+
+    def save_picture_colors(self, colors: dict[int, tuple[str, str, tuple]]) -> int:
+        """Store ``{powder_id: (sha256, hex, lab)}`` from photo color extraction.
+
+        The Lab value is only written where the powder has no manual or
+        code-derived color. Returns the number of powders updated.
+        """
+        if not colors:
+            return 0
+        with session_scope() as session:
+            powders = (
+                session.execute(
+                    select(Powder)
+                    .options(load_only(*_PICTURE_COLOR_COLUMNS))
+                    .filter(Powder.id.in_(colors))
+                )
+                .scalars()
+                .all()
+            )
+            for powder in powders:
+                sha256, hex_value, lab = colors[powder.id]
+                powder.picture_sha256 = sha256
+                powder.picture_hex = hex_value
+                if powder.lab_source in (None, "photo"):
+                    powder.lab_l, powder.lab_a, powder.lab_b = lab
+                    powder.lab_source = "photo"
+            session.flush()
+        for powder in powders:
+            self._notify_change(powder.id)
+        return len(powders)
+
     def get_powder(self, powder_id: int) -> Powder | None:
         with session_scope() as session:
             return session.get(Powder, powder_id)
@@ -78,7 +209,8 @@ class PowderRepository:
             powder = Powder(**kwargs)
             session.add(powder)
             session.flush()
-            return powder
+        self._notify_change(powder.id)
+        return powder
 
     def update_powder(self, powder_id: int, **fields) -> Powder | None:
         with session_scope() as session:
@@ -89,7 +221,8 @@ class PowderRepository:
                 if hasattr(powder, key):
                     setattr(powder, key, value)
             session.flush()
-            return powder
+        self._notify_change(powder_id)
+        return powder
 
     def delete_powder(self, powder_id: int) -> bool:
         with session_scope() as session:
@@ -98,7 +231,8 @@ class PowderRepository:
                 return False
             session.delete(powder)
             session.flush()
-            return True
+        self._notify_change(powder_id)
+        return True
 
 
 powder_repo = PowderRepository()
@@ -7,6 +7,7 @@ from collections.abc import Iterable
 from sqlalchemy import select
 
 from ..models import PrintTemplate
+from .projections import PRINT_TEMPLATE_COLUMNS, PrintTemplateRow, project
 from .session import session_scope
 
 
@@ -24,6 +25,11 @@ class PrintTemplateRepository:
     def list_all(self, template_type: str) -> Iterable[PrintTemplate]:
         return self.list_by_type(template_type)
 
+    def list_rows_by_type(self, template_type: str) -> list[PrintTemplateRow]:
+        stmt = select(*PRINT_TEMPLATE_COLUMNS).filter(PrintTemplate.template_type == template_type)
+        with session_scope() as session:
+            return project(PrintTemplateRow, session.execute(stmt))
+
     def create(self, *, template_type: str, name: str, content: str) -> PrintTemplate:
         with session_scope() as session:
             tpl = PrintTemplate(template_type=template_type, name=name, content=content)
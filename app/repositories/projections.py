@@ -0,0 +1,167 @@
+"""Read-only row projections for JSON endpoints.
+
+JSON APIs only need a few columns per row, so instead of materializing ORM
+instances (identity map, change tracking, lazy-load state) the repositories
+``select()`` the exact columns and wrap each row tuple in a slotted
+dataclass. ``as_dicts`` turns a list of projections into JSON-ready dicts.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, fields
+from datetime import date
+from operator import attrgetter
+from typing import Any
+
+from sqlalchemy import Float, cast, func
+
+from ..models import Customer, Job, Powder, PrintTemplate
+
+
+@dataclass(frozen=True, slots=True)
+class PowderStockRow:
+    id: int
+    color: str
+    manufacturer: str | None
+    on_hand_kg: float
+    in_stock: float
+    family: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class PowderSuggestRow:
+    id: int
+    color: str
+    manufacturer: str | None
+    product_code: str | None
+    family: str | None
+    aliases: str | None
+    in_stock: float
+
+
+@dataclass(frozen=True, slots=True)
+class PowderColorRow:
+    id: int
+    color: str
+    manufacturer: str | None
+    product_code: str | None
+    family: str | None
+    in_stock: float
+    lab_l: float | None
+    lab_a: float | None
+    lab_b: float | None
+
+
+@dataclass(frozen=True, slots=True)
+class JobCardRow:
+    id: int
+    company: str
+    color: str | None
+    due_by: date | None
+    priority: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class JobListRow:
+    id: int
+    company: str
+    description: str | None
+    status: str
+    priority: str | None
+    color: str | None
+    department: str | None
+    due_by: date | None
+    archived: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerSearchRow:
+    id: int
+    company: str
+    contact_name: str | None
+    phone: str | None
+    email: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class PrintTemplateRow:
+    id: int
+    name: str
+    content: str
+    is_default: bool
+
+
+# Column lists in dataclass field order; rows unpack positionally.
+POWDER_STOCK_COLUMNS = (
+    Powder.id,
+    Powder.powder_color,
+    Powder.manufacturer,
+    cast(func.coalesce(Powder.on_hand_kg, 0), Float),
+    cast(func.coalesce(Powder.in_stock, 0), Float),
+    Powder.color_family,
+)
+# Same fallback as ``by_color.json``: on-hand weight, else the in-stock figure.
+_AVAILABLE_KG = cast(func.coalesce(func.nullif(Powder.on_hand_kg, 0), Powder.in_stock, 0), Float)
+POWDER_SUGGEST_COLUMNS = (
+    Powder.id,
+    Powder.powder_color,
+    Powder.manufacturer,
+    Powder.product_code,
+    Powder.color_family,
+    Powder.aliases,
+    _AVAILABLE_KG,
+)
+POWDER_COLOR_COLUMNS = (
+    Powder.id,
+    Powder.powder_color,
+    Powder.manufacturer,
+    Powder.product_code,
+    Powder.color_family,
+    _AVAILABLE_KG,
+    Powder.lab_l,
+    Powder.lab_a,
+    Powder.lab_b,
+)
+JOB_CARD_COLUMNS = (Job.id, Job.company, Job.color, Job.due_by, Job.priority)
+JOB_LIST_COLUMNS = (
+    Job.id,
+    Job.company,
+    Job.description,
+    Job.status,
+    Job.priority,
+    Job.color,
+    Job.department,
+    Job.due_by,
+    Job.archived,
+)
+CUSTOMER_SEARCH_COLUMNS = (
+    Customer.id,
+    Customer.company,
+    Customer.contact_name,
+    Customer.phone,
+    Customer.email,
+)
+PRINT_TEMPLATE_COLUMNS = (
+    PrintTemplate.id,
+    PrintTemplate.name,
+    PrintTemplate.content,
+    PrintTemplate.is_default,
+)
+
+
+def project(cls: type, rows: Iterable[Sequence[Any]]) -> list:
+    """Build ``cls`` instances from positional row tuples."""
+    return [cls(*row) for row in rows]
+
+
+def as_dicts(items: Sequence[Any], names: Sequence[str] | None = None) -> list[dict[str, Any]]:
+    """Serialize projections to dicts, optionally restricted to ``names``."""
+    if not items:
+        return []
+    keys = tuple(names or (f.name for f in fields(items[0])))
+    if len(keys) == 1:
+        key = keys[0]
+        return [{key: getattr(item, key)} for item in items]
+    getter = attrgetter(*keys)
+    return [dict(zip(keys, getter(item), strict=True)) for item in items]
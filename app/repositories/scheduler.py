@@ -0,0 +1,100 @@
+"""Repository for periodic job state and scheduler leadership."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Connection, func, select, text, update
+
+from ..models import ScheduledJob
+from .session import session_scope
+
+
+class SchedulerRepository:
+    def list_jobs(self) -> list[ScheduledJob]:
+        with session_scope() as session:
+            return list(session.execute(select(ScheduledJob).order_by(ScheduledJob.name)).scalars())
+
+    def sync_registered(self, schedules: dict[str, tuple[str, datetime]]) -> None:
+        """Create rows for new jobs and reschedule jobs whose cron changed.
+
+        ``schedules`` maps job name to ``(cron expression, next run if new)``.
+        """
+        with session_scope() as session:
+            existing = {
+                job.name: job
+                for job in session.execute(
+                    select(ScheduledJob).filter(ScheduledJob.name.in_(list(schedules)))
+                ).scalars()
+            }
+            for name, (expression, next_run_at) in schedules.items():
+                job = existing.get(name)
+                if job is None:
+                    session.add(
+                        ScheduledJob(name=name, schedule=expression, next_run_at=next_run_at)
+                    )
+                elif job.schedule != expression:
+                    job.schedule = expression
+                    job.next_run_at = next_run_at
+            session.flush()
+
+    def mark_started(self, name: str, started_at: datetime) -> None:
+        with session_scope() as session:
+            session.execute(
+                update(ScheduledJob)
+                .where(ScheduledJob.name == name)
+                .values(last_started_at=started_at, last_status="running")
+            )
+
+    def mark_finished(
+        self,
+        name: str,
+        *,
+        finished_at: datetime,
+        duration_ms: float,
+        ok: bool,
+        result: str | None,
+        error: str | None,
+        next_run_at: datetime,
+    ) -> None:
+        values = {
+            "last_finished_at": finished_at,
+            "last_duration_ms": duration_ms,
+            "last_status": "ok" if ok else "failed",
+            "last_result": (result or "")[:255] or None,
+            "last_error": error,
+            "next_run_at": next_run_at,
+            "run_count": ScheduledJob.run_count + 1,
+            "total_duration_ms": ScheduledJob.total_duration_ms + duration_ms,
+        }
+        if not ok:
+            values["failure_count"] = ScheduledJob.failure_count + 1
+        with session_scope() as session:
+            session.execute(update(ScheduledJob).where(ScheduledJob.name == name).values(**values))
+
+    def request_run(self, name: str) -> bool:
+        """Make ``name`` due now; the scheduler runs it on its next tick."""
+        with session_scope() as session:
+            result = session.execute(
+                update(ScheduledJob).where(ScheduledJob.name == name).values(next_run_at=func.now())
+            )
+            return bool(result.rowcount)
+
+    def try_advisory_lock(self, connection: Connection, key: int) -> bool:
+        """Take a session-level advisory lock on ``connection`` without waiting.
+
+        The lock lasts until it is released or the connection closes, so a
+        crashed holder frees it automatically.
+        """
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": key}
+        ).scalar_one()
+        connection.commit()  # end the implicit transaction; the lock stays held
+        return bool(acquired)
+
+    def advisory_unlock(self, connection: Connection, key: int) -> None:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
+        connection.commit()
+
+
+scheduler_repo = SchedulerRepository()
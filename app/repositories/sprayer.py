@@ -8,13 +8,22 @@ from datetime import datetime
 from sqlalchemy import select
 
 from ..models import Job, Powder, SprayBatch, SprayBatchJob
+from .powders import POWDER_LOAD_PROFILES
 from .session import session_scope
 
 
 class SprayerRepository:
     def list_powders(self) -> Iterable[Powder]:
         with session_scope() as session:
-            return session.execute(select(Powder).order_by(Powder.powder_color)).scalars().all()
+            return (
+                session.execute(
+                    select(Powder)
+                    .options(*POWDER_LOAD_PROFILES["stock"])
+                    .order_by(Powder.powder_color)
+                )
+                .scalars()
+                .all()
+            )
 
     def list_open_batches(self) -> Iterable[SprayBatch]:
         with session_scope() as session:
@@ -0,0 +1,43 @@
+"""Repository helpers for delta-sync cursors and tombstones."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, func, select
+
+from ..models import Tombstone
+from .session import session_scope
+
+
+class SyncRepository:
+    """Read tombstones and the database clock used to issue sync cursors."""
+
+    def server_time(self) -> datetime:
+        """Return the database's current time (UTC, tz-aware)."""
+
+        with session_scope() as session:
+            now = session.execute(select(func.now())).scalar_one()
+        if isinstance(now, str):  # SQLite returns CURRENT_TIMESTAMP as text
+            now = datetime.fromisoformat(now)
+        return now if now.tzinfo else now.replace(tzinfo=UTC)
+
+    def deleted_ids(self, entity: str, since: datetime) -> list[int]:
+        with session_scope() as session:
+            return list(
+                session.execute(
+                    select(Tombstone.entity_id)
+                    .filter(Tombstone.entity == entity, Tombstone.deleted_at >= since)
+                    .distinct()
+                ).scalars()
+            )
+
+    def purge_tombstones(self, before: datetime) -> int:
+        """Delete tombstones older than ``before``; returns the number removed."""
+
+        with session_scope() as session:
+            result = session.execute(delete(Tombstone).where(Tombstone.deleted_at < before))
+            return result.rowcount or 0
+
+
+sync_repo = SyncRepository()
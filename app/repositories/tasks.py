@@ -0,0 +1,164 @@
+"""Repository for the durable background task queue."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from ..models import Task
+from .session import session_scope
+
+
+class TaskRepository:
+    """Enqueue, claim and settle rows of the ``tasks`` table.
+
+    Claiming uses ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent workers
+    never block on, or double-claim, the same row.
+    """
+
+    def enqueue(
+        self,
+        name: str,
+        payload: dict | None = None,
+        *,
+        priority: int = 0,
+        run_at: datetime | None = None,
+        max_attempts: int = 5,
+    ) -> Task:
+        with session_scope() as session:
+            task = self.enqueue_in(
+                session,
+                name,
+                payload,
+                priority=priority,
+                run_at=run_at,
+                max_attempts=max_attempts,
+            )
+            session.flush()
+            return task
+
+    def enqueue_in(
+        self,
+        session: Session,
+        name: str,
+        payload: dict | None = None,
+        *,
+        priority: int = 0,
+        run_at: datetime | None = None,
+        max_attempts: int = 5,
+    ) -> Task:
+        """Add a task within the caller's transaction; it runs only if that commits."""
+        task = Task(
+            name=name,
+            payload=payload or {},
+            priority=priority,
+            max_attempts=max_attempts,
+        )
+        if run_at is not None:
+            task.run_at = run_at
+        session.add(task)
+        return task
+
+    def claim(self, worker_id: str, *, limit: int = 1) -> list[Task]:
+        """Lock the next due tasks for ``worker_id`` and mark them running."""
+        stmt = (
+            select(Task)
+            .filter(Task.status == "queued", Task.run_at <= func.now())
+            .order_by(Task.priority.desc(), Task.run_at, Task.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        with session_scope() as session:
+            tasks = list(session.execute(stmt).scalars())
+            for task in tasks:
+                task.status = "running"
+                task.attempts += 1
+                task.locked_by = worker_id
+                task.locked_at = func.now()
+            session.flush()
+            return tasks
+
+    def complete(self, task_id: int) -> None:
+        with session_scope() as session:
+            session.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(status="done", finished_at=func.now(), locked_by=None, last_error=None)
+            )
+
+    def fail(self, task_id: int, error: str, *, retry_at: datetime | None) -> None:
+        """Record a failed attempt; requeue at ``retry_at`` or give up when ``None``."""
+        values = {"last_error": error, "locked_by": None, "locked_at": None}
+        if retry_at is None:
+            values.update(status="failed", finished_at=func.now())
+        else:
+            values.update(status="queued", run_at=retry_at)
+        with session_scope() as session:
+            session.execute(update(Task).where(Task.id == task_id).values(**values))
+
+    def requeue_stale(self, locked_before: datetime) -> int:
+        """Return tasks held by workers that died mid-task to the queue.
+
+        Their attempt is already counted, so a task that keeps killing its
+        worker ends up ``failed`` instead of looping.
+        """
+        stale = (Task.status == "running") & (Task.locked_at < locked_before)
+        with session_scope() as session:
+            exhausted = session.execute(
+                update(Task)
+                .where(stale, Task.attempts >= Task.max_attempts)
+                .values(
+                    status="failed",
+                    finished_at=func.now(),
+                    last_error="worker stopped while running the task",
+                    locked_by=None,
+                )
+            ).rowcount
+            requeued = session.execute(
+                update(Task)
+                .where(stale)
+                .values(status="queued", run_at=func.now(), locked_by=None, locked_at=None)
+            ).rowcount
+            return (exhausted or 0) + (requeued or 0)
+
+    def counts_by_status(self) -> dict[str, int]:
+        with session_scope() as session:
+            rows = session.execute(select(Task.status, func.count()).group_by(Task.status))
+            return {status: count for status, count in rows}
+
+    def oldest_due_age_seconds(self) -> float:
+        """Seconds the longest-waiting due task has been queued (0 when none)."""
+        with session_scope() as session:
+            oldest = session.execute(
+                select(func.min(Task.run_at)).filter(
+                    Task.status == "queued", Task.run_at <= func.now()
+                )
+            ).scalar_one_or_none()
+            if oldest is None:
+                return 0.0
+            now = session.execute(select(func.now())).scalar_one()
+        if isinstance(now, str):  # SQLite returns CURRENT_TIMESTAMP as text
+            now = datetime.fromisoformat(now)
+        if oldest.tzinfo is None or now.tzinfo is None:
+            oldest, now = oldest.replace(tzinfo=None), now.replace(tzinfo=None)
+        return max(0.0, (now - oldest).total_seconds())
+
+    def list_recent(self, *, status: str | None = None, limit: int = 50) -> list[Task]:
+        stmt = select(Task).order_by(Task.id.desc()).limit(limit)
+        if status:
+            stmt = stmt.filter(Task.status == status)
+        with session_scope() as session:
+            return list(session.execute(stmt).scalars())
+
+    def purge_finished(self, before: datetime) -> int:
+        """Delete done and failed tasks finished before ``before``."""
+        with session_scope() as session:
+            result = session.execute(
+                delete(Task).where(Task.status.in_(("done", "failed")), Task.finished_at < before)
+            )
+            return result.rowcount or 0
+
+
+task_repo = TaskRepository()
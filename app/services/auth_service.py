@@ -6,6 +6,7 @@ import secrets
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 
 try:  # pragma: no cover - optional dependency
@@ -16,7 +17,7 @@ except ImportError:  # pragma: no cover - optional dependency fallback
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app.models import Customer, CustomerAccount, User
-from app.repositories import session_scope
+from app.repositories import notification_repo, session_scope
 
 
 def _hash_password(password: str) -> str:
@@ -125,6 +126,16 @@ class CustomerAuthService:
                 return
             account.reset_token = secrets.token_urlsafe(32)
             account.reset_token_expires = datetime.utcnow() + timedelta(hours=2)
+            notification_repo.queue_in(
+                session,
+                kind="password_reset",
+                recipient=account.email,
+                payload={
+                    "account_id": account.id,
+                    "token": account.reset_token,
+                    "first_name": account.first_name,
+                },
+            )
             session.flush()
 
     def reset_password(self, *, token: str, new_password: str) -> bool:
@@ -149,6 +160,19 @@ class CustomerAuthService:
             session.flush()
             return True
 
+    def purge_expired_reset_tokens(self) -> int:
+        """Clear reset tokens past their expiry; returns how many were cleared."""
+        with session_scope() as session:
+            result = session.execute(
+                update(CustomerAccount)
+                .where(
+                    CustomerAccount.reset_token.is_not(None),
+                    CustomerAccount.reset_token_expires < datetime.utcnow(),
+                )
+                .values(reset_token=None, reset_token_expires=None)
+            )
+            return result.rowcount or 0
+
 
 customer_auth_service = CustomerAuthService()
 
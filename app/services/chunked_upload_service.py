@@ -0,0 +1,237 @@
+"""Resumable chunked uploads for large job attachments.
+
+A client opens an upload with the file's name and size (and SHA-256 when it
+can compute one), then sends the bytes in chunks, each tagged with the offset
+it starts at. Chunks are appended straight from the request stream to a part
+file under ``UPLOADS_DIR/blobs/tmp/uploads/``; the part file's length is the
+resume point, so after a dropped connection the client asks for the offset
+and carries on from there. Completing checks size and checksum, moves the
+file into blob storage with a rename and records the ``JobPhoto``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import BinaryIO
+
+from flask import current_app
+
+from app.models import JobPhoto
+from app.repositories import job_repo
+
+from .photo_derivative_service import photo_derivative_service
+from .upload_service import (
+    CHUNK_SIZE,
+    StoredUpload,
+    adopt_file,
+    allowed_extension,
+    blob_tmp_dir,
+    file_sha256,
+    guess_content_type,
+    link_existing_blob,
+)
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadError(ValueError):
+    """Rejected upload request; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message: str, *, status: int = 400, offset: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+class ChunkedUploadService:
+    def __init__(self, repository=job_repo):
+        self._repo = repository
+
+    # Paths -----------------------------------------------------------------
+    def _dir(self) -> str:
+        return os.path.join(blob_tmp_dir(), "uploads")
+
+    def _paths(self, upload_id: str) -> tuple[str, str]:
+        if not _UPLOAD_ID.match(upload_id or ""):
+            raise UploadError("upload not found", status=404)
+        base = os.path.join(self._dir(), upload_id)
+        return f"{base}.json", f"{base}.part"
+
+    def _load(self, job_id: int, upload_id: str) -> tuple[dict, str]:
+        meta_path, part_path = self._paths(upload_id)
+        try:
+            with open(meta_path, encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            raise UploadError("upload not found", status=404) from None
+        if meta["job_id"] != job_id:
+            raise UploadError("upload not found", status=404)
+        return meta, part_path
+
+    @contextmanager
+    def _locked(self, part_path: str) -> Iterator[BinaryIO]:
+        """Open the part file for appending, refusing (409) if another request holds it."""
+        try:
+            # No O_CREAT: a part file already adopted must not reappear.
+            handle = os.fdopen(os.open(part_path, os.O_WRONLY | os.O_APPEND), "ab")
+        except FileNotFoundError:
+            raise UploadError("upload not found", status=404) from None
+        with handle:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    raise UploadError("upload busy with another request", status=409) from None
+            yield handle
+
+    def _discard(self, upload_id: str) -> None:
+        for path in self._paths(upload_id):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # API -------------------------------------------------------------------
+    def chunk_size(self) -> int:
+        size = current_app.config.get("UPLOAD_CHUNK_BYTES", 8 * 1024 * 1024)
+        limit = current_app.config.get("MAX_CONTENT_LENGTH")
+        return min(size, limit) if limit else size
+
+    def start(self, job_id: int, *, filename: str, size: int, sha256: str | None = None) -> dict:
+        """Open an upload; returns ``{"upload_id", "offset", "chunk_size"}``.
+
+        When ``sha256`` names content already stored, the photo is linked at
+        once and ``{"photo_id"}`` is returned instead: nothing to send.
+        """
+        if self._repo.get_job(job_id) is None:
+            raise UploadError("job not found", status=404)
+        if not allowed_extension(filename):
+            raise UploadError("file type not allowed")
+        max_bytes = current_app.config.get("UPLOAD_MAX_FILE_BYTES")
+        if size <= 0:
+            raise UploadError("size must be positive")
+        if max_bytes and size > max_bytes:
+            raise UploadError(f"file larger than {max_bytes} bytes", status=413)
+        sha256 = (sha256 or "").strip().lower() or None
+        if sha256 is not None and not _SHA256.match(sha256):
+            raise UploadError("sha256 must be 64 hex digits")
+
+        if sha256 is not None:
+            existing = link_existing_blob(sha256, filename)
+            if existing is not None:
+                return {"photo_id": self._record(job_id, existing).id}
+
+        upload_id = secrets.token_hex(16)
+        os.makedirs(self._dir(), exist_ok=True)
+        meta_path, part_path = self._paths(upload_id)
+        open(part_path, "wb").close()
+        meta = {"job_id": job_id, "filename": filename, "size": size, "sha256": sha256}
+        with open(meta_path, "w", encoding="utf-8") as handle:
+            json.dump(meta, handle)
+        return {"upload_id": upload_id, "offset": 0, "chunk_size": self.chunk_size()}
+
+    def status(self, job_id: int, upload_id: str) -> dict:
+        meta, part_path = self._load(job_id, upload_id)
+        return {"upload_id": upload_id, "offset": os.path.getsize(part_path), "size": meta["size"]}
+
+    def write_chunk(
+        self, job_id: int, upload_id: str, *, offset: int, stream: BinaryIO, length: int
+    ) -> int:
+        """Append ``length`` bytes from ``stream`` at ``offset``; returns the new offset.
+
+        The offset must equal the bytes received so far, so a retried or
+        reordered chunk is refused (409, with the current offset) rather than
+        written twice. If the client disconnects mid-chunk the bytes that did
+        arrive are kept and the next status call reports them.
+        """
+        meta, part_path = self._load(job_id, upload_id)
+        if offset + length > meta["size"]:
+            raise UploadError("chunk extends past the declared size", status=416)
+        with self._locked(part_path) as handle:
+            current = os.fstat(handle.fileno()).st_size
+            if offset != current:
+                raise UploadError("offset mismatch", status=409, offset=current)
+            remaining = length
+            while remaining:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                handle.write(chunk)
+                remaining -= len(chunk)
+            handle.flush()
+            return current + length - remaining
+
+    def complete(self, job_id: int, upload_id: str) -> JobPhoto:
+        """Verify the received file and attach it to the job.
+
+        A checksum mismatch discards the upload (422); the client starts over.
+        """
+        meta, part_path = self._load(job_id, upload_id)
+        with self._locked(part_path) as handle:
+            received = os.fstat(handle.fileno()).st_size
+            if received != meta["size"]:
+                raise UploadError("upload incomplete", status=409, offset=received)
+            sha256 = file_sha256(part_path)
+            if meta["sha256"] and sha256 != meta["sha256"]:
+                self._discard(upload_id)
+                raise UploadError("checksum mismatch", status=422)
+            blob = adopt_file(
+                part_path,
+                sha256,
+                size=received,
+                content_type=guess_content_type(meta["filename"]),
+            )
+            # Only now: if adopting fails the client can retry. A retry after
+            # this point finds no part file (it was moved) and gets a 404.
+            os.remove(self._paths(upload_id)[0])
+        return self._record(job_id, StoredUpload(blob.path, meta["filename"], blob.id))
+
+    def abort(self, job_id: int, upload_id: str) -> None:
+        self._load(job_id, upload_id)
+        self._discard(upload_id)
+
+    def purge_stale(self, *, max_age_seconds: float) -> int:
+        """Remove uploads untouched for ``max_age_seconds``; returns how many."""
+        directory = self._dir()
+        if not os.path.isdir(directory):
+            return 0
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        # Part files without metadata count too, e.g. from a crash in start()
+        # between creating the part file and writing its metadata.
+        upload_ids = {
+            upload_id
+            for upload_id, ext in map(os.path.splitext, os.listdir(directory))
+            if ext in (".json", ".part") and _UPLOAD_ID.match(upload_id)
+        }
+        for upload_id in sorted(upload_ids):
+            meta_path, part_path = self._paths(upload_id)
+            if not (os.path.exists(meta_path) or os.path.exists(part_path)):
+                continue  # finished or aborted while this ran
+            touched = max(
+                os.path.getmtime(path) for path in (meta_path, part_path) if os.path.exists(path)
+            )
+            if touched < cutoff:
+                self._discard(upload_id)
+                removed += 1
+        return removed
+
+    def _record(self, job_id: int, upload: StoredUpload) -> JobPhoto:
+        photo = self._repo.add_photo(
+            job_id, filename=upload.path, original_name=upload.original_name, blob_id=upload.blob_id
+        )
+        photo_derivative_service.schedule([photo.id])
+        return photo
+
+
+chunked_upload_service = ChunkedUploadService()
@@ -0,0 +1,128 @@
+"""Nearest-color powder matching over CIELAB values.
+
+Each worker keeps the catalog's Lab values in a packed array (NumPy when
+installed). A query first shortlists candidates by Euclidean Lab distance
+(ΔE76, one cheap vector operation), then ranks the shortlist exactly by
+CIEDE2000. ΔE76 and ΔE2000 agree closely at the small distances that matter
+for a match, so the shortlist only drops colors that would rank far down
+anyway, and lookups stay fast with tens of thousands of powders.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from collections.abc import Iterable
+
+from app.repositories import powder_repo
+from app.repositories.projections import PowderColorRow
+from app.utils.color import Lab, delta_e2000_many, lab_array, np
+
+from .sync_service import SyncedMirror, sync_service
+
+# Shortlist size is max(limit * factor, minimum); small catalogs skip it.
+SHORTLIST_FACTOR = 40
+SHORTLIST_MIN = 400
+
+
+class _Packed:
+    """Rows and their Lab values in parallel arrays."""
+
+    def __init__(self, rows: list[PowderColorRow]) -> None:
+        self.rows = rows
+        self.labs = lab_array([(row.lab_l, row.lab_a, row.lab_b) for row in rows])
+
+
+class ColorMatchIndex:
+    """Powders with a Lab value, searchable by CIEDE2000 distance."""
+
+    def __init__(self, rows: Iterable[PowderColorRow] = ()) -> None:
+        self._lock = threading.RLock()
+        self._rows: dict[int, PowderColorRow] = {}
+        self._packed: dict[bool, _Packed] | None = None
+        for row in rows:
+            self.upsert(row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(self, row: PowderColorRow) -> None:
+        with self._lock:
+            if row.lab_l is None or row.lab_a is None or row.lab_b is None:
+                self._rows.pop(row.id, None)
+            else:
+                self._rows[row.id] = row
+            self._packed = None
+
+    def remove(self, powder_id: int) -> None:
+        with self._lock:
+            if self._rows.pop(powder_id, None) is not None:
+                self._packed = None
+
+    def _arrays(self, in_stock_only: bool) -> _Packed:
+        with self._lock:
+            if self._packed is None:
+                rows = sorted(self._rows.values(), key=lambda row: row.id)
+                self._packed = {
+                    False: _Packed(rows),
+                    True: _Packed([row for row in rows if row.in_stock > 0]),
+                }
+            return self._packed[in_stock_only]
+
+    def nearest(
+        self, lab: Lab, *, limit: int = 5, in_stock_only: bool = True
+    ) -> list[tuple[PowderColorRow, float]]:
+        """Return the ``limit`` closest powders as ``(row, delta_e)`` pairs."""
+        packed = self._arrays(in_stock_only)
+        count = len(packed.rows)
+        if not count or limit <= 0:
+            return []
+        shortlist = max(limit * SHORTLIST_FACTOR, SHORTLIST_MIN)
+
+        if np is not None:
+            candidates = np.arange(count)
+            if count > shortlist:
+                distance = ((packed.labs - np.asarray(lab)) ** 2).sum(axis=1)
+                candidates = np.argpartition(distance, shortlist)[:shortlist]
+            deltas = delta_e2000_many(lab, packed.labs[candidates])
+            order = np.argsort(deltas, kind="stable")[:limit]
+            return [(packed.rows[candidates[i]], float(deltas[i])) for i in order]
+
+        labs = packed.labs
+        candidates = range(count)
+        if count > shortlist:
+            candidates = heapq.nsmallest(
+                shortlist,
+                candidates,
+                key=lambda i: sum((x - y) ** 2 for x, y in zip(labs[i], lab, strict=True)),
+            )
+        candidates = list(candidates)
+        deltas = delta_e2000_many(lab, [labs[i] for i in candidates])
+        best = heapq.nsmallest(limit, range(len(candidates)), key=deltas.__getitem__)
+        return [(packed.rows[candidates[i]], deltas[i]) for i in best]
+
+
+class ColorMatchService(SyncedMirror):
+    """Owns this worker's color match index and keeps it in step with the database."""
+
+    entity = "powders"
+    refresh_setting = "POWDER_INDEX_REFRESH_SECONDS"
+
+    def __init__(self, repository=powder_repo, sync=sync_service):
+        super().__init__(sync)
+        self._repo = repository
+
+    def match(
+        self, lab: Lab, *, limit: int = 5, in_stock_only: bool = True
+    ) -> list[tuple[PowderColorRow, float]]:
+        return self.current().nearest(lab, limit=limit, in_stock_only=in_stock_only)
+
+    def _load(self, *, ids=None, changed_since=None) -> list[PowderColorRow]:
+        return self._repo.list_color_rows(ids=ids, changed_since=changed_since)
+
+    def _build(self, rows: Iterable[PowderColorRow]) -> ColorMatchIndex:
+        return ColorMatchIndex(rows)
+
+
+color_match_service = ColorMatchService()
+powder_repo.on_change(color_match_service.refresh_row)
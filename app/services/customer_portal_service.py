@@ -11,6 +11,7 @@ from sqlalchemy.orm import selectinload
 
 from app.models import CustomerAccount, Job, JobEditHistory
 from app.repositories import session_scope
+from app.repositories.jobs import JOB_LOAD_PROFILES
 
 
 @dataclass
@@ -44,13 +45,11 @@ class CustomerPortalService:
         *,
         search: str | None = None,
         status: str | None = None,
+        profile: str = "card",
     ) -> Iterable[Job]:
         stmt = (
             select(Job)
-            .options(
-                selectinload(Job.powder_usage),
-                selectinload(Job.time_logs),
-            )
+            .options(*JOB_LOAD_PROFILES[profile])
             .filter(Job.customer_account_id == account_id)
             .order_by(Job.created_at.desc())
         )
@@ -66,11 +65,7 @@ class CustomerPortalService:
     def list_recent_jobs(self, account_id: int, limit: int = 5) -> Iterable[Job]:
         stmt = (
             select(Job)
-            .options(
-                selectinload(Job.customer),
-                selectinload(Job.time_logs),
-                selectinload(Job.powder_usage),
-            )
+            .options(*JOB_LOAD_PROFILES["card"])
             .filter(Job.customer_account_id == account_id)
             .order_by(Job.created_at.desc())
             .limit(limit)
@@ -136,7 +131,7 @@ class CustomerPortalService:
         )
 
     def customer_summary(self, account_id: int) -> dict[str, int]:
-        jobs = self.list_jobs_for_account(account_id)
+        jobs = self.list_jobs_for_account(account_id, profile="summary")
         total = len(jobs)
         completed = sum(1 for job in jobs if job.status == "Completed")
         in_progress = sum(
@@ -0,0 +1,180 @@
+"""Readiness checks behind ``/readyz``.
+
+``/healthz`` only says the process answers. ``/readyz`` also checks what a
+request needs. It answers 503 as soon as one of these fails:
+
+- a database round trip, failing when slower than ``READY_DB_MAX_MS``;
+- connection pool use, failing at ``READY_POOL_MAX_UTILIZATION``;
+- the uploads volume being writable with ``READY_MIN_FREE_MB`` free.
+
+The thresholds sit below the point where users see timeouts, so the load
+balancer stops routing to a worker before its requests start failing.
+
+Task queue lag only warns, even when its query errors or times out. A
+stalled ``flask worker`` is no reason to take the web workers out of
+rotation.
+
+Checks run on a small per-process thread pool. Each one must answer within
+``READY_TIMEOUT_SECONDS``, otherwise it fails (or warns, for task lag).
+Errors show only the exception class; details go to the server log. A check still stuck from an
+earlier probe is not started again. The report is cached for
+``READY_CACHE_SECONDS``, so frequent probes cannot add load of their own.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import UTC, datetime
+
+from flask import Flask, current_app
+
+from app.extensions import db
+from app.repositories import task_repo
+
+OK, WARN, FAIL = "ok", "warn", "fail"
+
+logger = logging.getLogger(__name__)
+
+
+def _check_database(config) -> tuple[str, dict]:
+    started = time.perf_counter()
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+    round_trip_ms = (time.perf_counter() - started) * 1000
+    limit_ms = config.get("READY_DB_MAX_MS", 500)
+    return (FAIL if round_trip_ms > limit_ms else OK), {
+        "round_trip_ms": round(round_trip_ms, 1),
+        "limit_ms": limit_ms,
+    }
+
+
+def _check_pool(config) -> tuple[str, dict]:
+    pool = db.engine.pool
+    max_overflow = getattr(pool, "_max_overflow", -1)
+    if not hasattr(pool, "checkedout") or max_overflow < 0:
+        return OK, {"pool": type(pool).__name__}  # unbounded: nothing to saturate
+    capacity = pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    utilization = checked_out / capacity if capacity else 0.0
+    limit = config.get("READY_POOL_MAX_UTILIZATION", 0.9)
+    return (FAIL if utilization >= limit else OK), {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "utilization": round(utilization, 2),
+        "limit": limit,
+    }
+
+
+def _check_uploads(config) -> tuple[str, dict]:
+    root = config["UPLOADS_DIR"]
+    with tempfile.NamedTemporaryFile(dir=root, prefix=".readyz-") as handle:
+        handle.write(b"ok")
+        handle.flush()
+    free_mb = shutil.disk_usage(root).free / (1024 * 1024)
+    min_free_mb = config.get("READY_MIN_FREE_MB", 1024)
+    return (FAIL if free_mb < min_free_mb else OK), {
+        "free_mb": round(free_mb),
+        "min_free_mb": min_free_mb,
+    }
+
+
+def _check_task_queue(config) -> tuple[str, dict]:
+    lag = task_repo.oldest_due_age_seconds()
+    limit = config.get("READY_TASK_LAG_SECONDS", 300)
+    return (WARN if lag > limit else OK), {"lag_seconds": round(lag, 1), "limit_seconds": limit}
+
+
+Check = Callable[..., tuple[str, dict]]
+
+# Name -> (check, status reported when it raises or does not answer). Advisory
+# checks fail soft, so a broken tasks query cannot take the web tier out.
+CHECKS: dict[str, tuple[Check, str]] = {
+    "database": (_check_database, FAIL),
+    "pool": (_check_pool, FAIL),
+    "uploads": (_check_uploads, FAIL),
+    "task_queue": (_check_task_queue, WARN),
+}
+
+
+class HealthService:
+    def __init__(self, checks: dict[str, tuple[Check, str]] = CHECKS) -> None:
+        self._checks = checks
+        self._lock = threading.Lock()
+        self._report: dict | None = None
+        self._reported_at = 0.0
+        self._executor: ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+        self._running: dict[str, Future] = {}
+
+    def readiness(self) -> dict:
+        """The latest report, re-checked when older than READY_CACHE_SECONDS."""
+        ttl = current_app.config.get("READY_CACHE_SECONDS", 1.0)
+        if self._report is not None and time.monotonic() - self._reported_at < ttl:
+            return self._report
+        # Probes arriving while another thread checks get the previous report.
+        if not self._lock.acquire(blocking=self._report is None):
+            return self._report
+        try:
+            if self._report is None or time.monotonic() - self._reported_at >= ttl:
+                self._report = self._check_all(current_app._get_current_object())
+                self._reported_at = time.monotonic()
+            return self._report
+        finally:
+            self._lock.release()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor_pid != os.getpid():
+            # Forked workers inherit the executor object but not its threads.
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self._checks), thread_name_prefix="readyz"
+            )
+            self._executor_pid = os.getpid()
+            self._running = {}
+        return self._executor
+
+    def _check_all(self, app: Flask) -> dict:
+        timeout = app.config.get("READY_TIMEOUT_SECONDS", 2.0)
+        results: dict[str, dict] = {}
+        started: dict[str, Future] = {}
+        for name, (check, on_error) in self._checks.items():
+            previous = self._running.get(name)
+            if previous is not None and not previous.done():
+                results[name] = {"status": on_error, "error": "previous check still running"}
+                continue
+            started[name] = self._running[name] = self._pool().submit(
+                self._run, app, name, check, on_error
+            )
+        done, _ = wait(started.values(), timeout=timeout)
+        for name, future in started.items():
+            if future in done:
+                results[name] = future.result()
+            else:
+                logger.warning("Readiness check %s gave no answer within %gs", name, timeout)
+                results[name] = {"status": self._checks[name][1], "error": "timeout"}
+        return {
+            "ready": all(result["status"] != FAIL for result in results.values()),
+            "checked_at": datetime.now(UTC).isoformat(timespec="seconds"),
+            "checks": results,
+        }
+
+    @staticmethod
+    def _run(app: Flask, name: str, check: Check, on_error: str) -> dict:
+        started = time.perf_counter()
+        with app.app_context():
+            try:
+                status, detail = check(app.config)
+            except Exception as exc:
+                # The probe is unauthenticated: details go to the log, not the body.
+                logger.warning("Readiness check %s failed", name, exc_info=True)
+                status, detail = on_error, {"error": type(exc).__name__}
+        return {"status": status, "ms": round((time.perf_counter() - started) * 1000, 1), **detail}
+
+
+health_service = HealthService()
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 
 from app.models import InventoryLog, Powder, ReorderSetting
 from app.repositories import inventory_repo
+from app.repositories.projections import PowderStockRow
 
 
 @dataclass
@@ -35,30 +37,28 @@ class InventoryService:
             search=search,
             manufacturer=manufacturer,
         )
+        return powders, _summarize(powders, low_stock_threshold)
 
-        in_stock_list: list[Powder] = []
-        low_stock_list: list[Powder] = []
-        out_of_stock_list: list[Powder] = []
-
-        for powder in powders:
-            stock_value = _coerce_float(powder.on_hand_kg or powder.in_stock)
-
-            if stock_value <= 0:
-                out_of_stock_list.append(powder)
-            elif stock_value <= low_stock_threshold:
-                low_stock_list.append(powder)
-            else:
-                in_stock_list.append(powder)
-
-        summary = InventorySummary(
-            total_powders=len(powders),
-            in_stock=len(in_stock_list),
-            low_stock=len(low_stock_list),
-            out_of_stock=len(out_of_stock_list),
-            low_stock_threshold=low_stock_threshold,
+    def powder_stock_rows(
+        self,
+        *,
+        search: str | None = None,
+        manufacturer: str | None = None,
+        low_stock_threshold: float = 5.0,
+        changed_since: datetime | None = None,
+    ) -> tuple[list[PowderStockRow], InventorySummary | None]:
+        """Like ``powders_dashboard`` but returns projections for JSON APIs.
+
+        With ``changed_since`` only rows changed at or after that time are
+        returned and no summary is computed, since it would need the whole
+        catalog.
+        """
+        rows = self._repo.list_powder_stock_rows(
+            search=search, manufacturer=manufacturer, changed_since=changed_since
         )
-
-        return powders, summary
+        if changed_since is not None:
+            return rows, None
+        return rows, _summarize(rows, low_stock_threshold)
 
     def recent_logs(self, powder_id: int, limit: int = 50) -> list[InventoryLog]:
         return self._repo.list_recent_inventory_logs(powder_id, limit=limit)
@@ -109,6 +109,26 @@ class InventoryService:
         return log
 
 
+def _summarize(powders, low_stock_threshold: float) -> InventorySummary:
+    in_stock = low_stock = out_of_stock = 0
+    for powder in powders:
+        stock_value = _coerce_float(powder.on_hand_kg or powder.in_stock)
+        if stock_value <= 0:
+            out_of_stock += 1
+        elif stock_value <= low_stock_threshold:
+            low_stock += 1
+        else:
+            in_stock += 1
+
+    return InventorySummary(
+        total_powders=len(powders),
+        in_stock=in_stock,
+        low_stock=low_stock,
+        out_of_stock=out_of_stock,
+        low_stock_threshold=low_stock_threshold,
+    )
+
+
 def _coerce_float(value) -> float:
     if value is None:
         return 0.0
@@ -0,0 +1,83 @@
+"""Periodic maintenance jobs registered with the scheduler.
+
+Times are in SCHEDULER_TIMEZONE. The nightly jobs are spread between 02:50
+and 03:45, with jitter, away from shop hours. Each returns a short summary
+that the admin status page shows.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from flask import current_app
+
+from app.repositories import job_repo, notification_repo, task_repo
+from app.repositories.sync import sync_repo
+
+from . import upload_service
+from .auth_service import customer_auth_service
+from .chunked_upload_service import chunked_upload_service
+from .notification_service import notification_service
+from .scheduler_service import scheduler_service
+
+
+@scheduler_service.job("jobs.compact_screen_order", "50 2 * * *", jitter_seconds=120)
+def compact_screen_order() -> str:
+    """Renumber the shop-screen order without gaps."""
+    return f"{job_repo.compact_screen_order()} job(s) renumbered"
+
+
+@scheduler_service.job("sync.purge_tombstones", "10 3 * * *", jitter_seconds=300)
+def purge_tombstones() -> str:
+    """Drop delete markers older than the sync retention window.
+
+    Clients with an older cursor get a full reload instead (see
+    ``SyncService.open_window``), so nothing is missed.
+    """
+    days = current_app.config.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30)
+    removed = sync_repo.purge_tombstones(datetime.now(UTC) - timedelta(days=days))
+    return f"{removed} tombstone(s) removed"
+
+
+@scheduler_service.job("uploads.collect_garbage", "30 3 * * *", jitter_seconds=300)
+def collect_upload_garbage() -> str:
+    """Repair blob reference counts and delete files no row points at."""
+    counts = upload_service.collect_garbage()
+    return ", ".join(f"{kind}: {count}" for kind, count in counts.items())
+
+
+@scheduler_service.job("tasks.purge_finished", "40 3 * * *", jitter_seconds=300)
+def purge_finished_tasks() -> str:
+    """Delete finished background tasks past the retention window."""
+    days = current_app.config.get("TASK_RETENTION_DAYS", 7)
+    removed = task_repo.purge_finished(datetime.now(UTC) - timedelta(days=days))
+    return f"{removed} task(s) removed"
+
+
+@scheduler_service.job("auth.purge_reset_tokens", "5 * * * *", jitter_seconds=60)
+def purge_reset_tokens() -> str:
+    """Clear expired customer password-reset tokens."""
+    return f"{customer_auth_service.purge_expired_reset_tokens()} token(s) cleared"
+
+
+@scheduler_service.job("uploads.purge_stale", "20 * * * *", jitter_seconds=60)
+def purge_stale_uploads() -> str:
+    """Remove chunked uploads abandoned for a day."""
+    return f"{chunked_upload_service.purge_stale(max_age_seconds=24 * 3600)} upload(s) removed"
+
+
+@scheduler_service.job("notifications.dispatch", "* * * * *")
+def dispatch_notifications() -> str:
+    """Send coalesced job status emails and retry failed sends."""
+    requeued = notification_service.requeue_stale()
+    counts = notification_service.dispatch()
+    summary = ", ".join(f"{outcome}: {count}" for outcome, count in counts.items())
+    return f"{summary}, requeued: {requeued}" if requeued else summary
+
+
+@scheduler_service.job("notifications.purge", "45 3 * * *", jitter_seconds=300)
+def purge_notifications() -> str:
+    """Delete settled outbox rows past the retention window."""
+    days = current_app.config.get("NOTIFY_RETENTION_DAYS", 30)
+    removed = notification_repo.purge_settled(datetime.now(UTC) - timedelta(days=days))
+    return f"{removed} notification(s) removed"
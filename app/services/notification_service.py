@@ -0,0 +1,244 @@
+"""Send queued customer notifications by email.
+
+Writers only add outbox rows (see ``NotificationRepository.queue_in``); no
+request waits on mail delivery. The dispatcher claims due rows in batches,
+renders each from the current database state and sends the batch over one
+SMTP connection. It runs from the ``notifications.dispatch`` task (queued
+with password resets) and from a once-a-minute scheduler job, which also
+picks up coalesced job status changes once they have been quiet for
+``NOTIFY_COALESCE_SECONDS``.
+
+With ``MAIL_SERVER`` unset messages are written to the log instead, so
+development needs no mail server. To see real SMTP traffic locally, run a
+sink such as ``python -m aiosmtpd -n -l localhost:1025`` and set
+``MAIL_SERVER=localhost MAIL_PORT=1025``.
+"""
+
+from __future__ import annotations
+
+import smtplib
+import ssl
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from email.message import EmailMessage
+from email.utils import make_msgid
+
+from flask import current_app, render_template, url_for
+
+from app.models import CustomerAccount, Notification
+from app.repositories import job_repo, notification_repo, session_scope
+from app.repositories.notifications import DISPATCH_TASK
+
+from .task_service import task_service
+
+# Errors that say the address will never accept mail; anything else is retried.
+_PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPNotSupportedError)
+# Errors after which the connection is unusable for the rest of the batch.
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class LogMailer:
+    """Stand-in transport used when no SMTP server is configured."""
+
+    def __enter__(self) -> LogMailer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def send(self, message: EmailMessage) -> None:
+        # Never the body: password reset mails carry a live token.
+        current_app.logger.info(
+            "Email %s to %s: %s",
+            message["X-Notification-Id"],
+            message["To"],
+            message["Subject"],
+        )
+
+
+class SmtpMailer:
+    """One SMTP session reused for every message in a batch."""
+
+    def __init__(self, config) -> None:
+        self._config = config
+        self._smtp: smtplib.SMTP | None = None
+
+    def __enter__(self) -> SmtpMailer:
+        config = self._config
+        host, port = config["MAIL_SERVER"], config["MAIL_PORT"]
+        timeout = config["MAIL_TIMEOUT_SECONDS"]
+        if config["MAIL_USE_SSL"]:
+            smtp = smtplib.SMTP_SSL(
+                host, port, timeout=timeout, context=ssl.create_default_context()
+            )
+        else:
+            smtp = smtplib.SMTP(host, port, timeout=timeout)
+            if config["MAIL_USE_TLS"]:
+                smtp.starttls(context=ssl.create_default_context())
+        if config["MAIL_USERNAME"]:
+            smtp.login(config["MAIL_USERNAME"], config["MAIL_PASSWORD"])
+        self._smtp = smtp
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except smtplib.SMTPException:  # pragma: no cover - server already gone
+            self._smtp.close()
+        self._smtp = None
+
+    def send(self, message: EmailMessage) -> None:
+        if self._smtp is None:
+            raise smtplib.SMTPServerDisconnected("mailer is not open")
+        self._smtp.send_message(message)
+
+
+Renderer = Callable[[Notification], "tuple[str, str, dict] | None"]
+
+
+class NotificationService:
+    def __init__(self, repository=notification_repo):
+        self._repo = repository
+        self._renderers: dict[str, Renderer] = {
+            "job_status": self._render_job_status,
+            "password_reset": self._render_password_reset,
+        }
+
+    # Rendering ---------------------------------------------------------------
+    def _render_job_status(self, notification: Notification) -> tuple[str, str, dict] | None:
+        job = job_repo.get_job(notification.payload.get("job_id"))
+        if job is None or job.status == notification.payload.get("previous_status"):
+            return None  # deleted, or flipped back before we got to it
+        context = {
+            "job": job,
+            "status": job.status,
+            "job_url": url_for("customer_portal.job_detail", job_id=job.id, _external=True),
+        }
+        return f"Job #{job.id}: {job.status}", "job_status", context
+
+    def _render_password_reset(self, notification: Notification) -> tuple[str, str, dict] | None:
+        token = notification.payload.get("token")
+        with session_scope() as session:
+            account = session.get(CustomerAccount, notification.payload.get("account_id"))
+        if account is None or account.reset_token != token:
+            return None  # used, expired or replaced by a newer request
+        context = {
+            "first_name": notification.payload.get("first_name"),
+            "reset_url": url_for("customer_portal.reset_password", token=token, _external=True),
+        }
+        return "Reset your portal password", "password_reset", context
+
+    def build_message(self, notification: Notification) -> EmailMessage | None:
+        """Render ``notification``; ``None`` when there is nothing left to say."""
+        renderer = self._renderers.get(notification.kind)
+        if renderer is None:
+            raise ValueError(f"unknown notification kind {notification.kind!r}")
+        rendered = renderer(notification)
+        if rendered is None:
+            return None
+        subject, template, context = rendered
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = current_app.config["MAIL_DEFAULT_SENDER"]
+        message["To"] = notification.recipient
+        message["Message-ID"] = make_msgid(domain="chaoticnexus")
+        message["X-Notification-Id"] = str(notification.id)
+        message.set_content(render_template(f"customer_portal/emails/{template}.txt", **context))
+        return message
+
+    def _mailer(self) -> LogMailer | SmtpMailer:
+        config = current_app.config
+        return SmtpMailer(config) if config.get("MAIL_SERVER") else LogMailer()
+
+    def retry_delay(self, attempts: int) -> float:
+        base = current_app.config.get("TASK_RETRY_BASE_SECONDS", 10)
+        cap = current_app.config.get("TASK_RETRY_MAX_SECONDS", 3600)
+        return min(cap, base * 2 ** (attempts - 1))
+
+    # Dispatch ----------------------------------------------------------------
+    def dispatch(self) -> dict[str, int]:
+        """Send every due notification; returns counts by outcome."""
+        config = current_app.config
+        batch_size = config.get("NOTIFY_BATCH_SIZE", 50)
+        counts = {"sent": 0, "skipped": 0, "failed": 0}
+        base_url = config.get("PUBLIC_BASE_URL") or "http://localhost"
+        # Links in the mail need an external URL even when no request is active.
+        with current_app.test_request_context(base_url=base_url):
+            while True:
+                settled_before = datetime.now(UTC) - timedelta(
+                    seconds=config.get("NOTIFY_COALESCE_SECONDS", 120)
+                )
+                batch = self._repo.claim_due(limit=batch_size, settled_before=settled_before)
+                if not batch:
+                    break
+                self._send_batch(batch, counts)
+                if len(batch) < batch_size:
+                    break
+        return counts
+
+    def _send_batch(self, batch: list[Notification], counts: dict[str, int]) -> None:
+        sent: list[int] = []
+        skipped: list[int] = []
+        max_attempts = current_app.config.get("NOTIFY_MAX_ATTEMPTS", 5)
+        pending = list(batch)
+        try:
+            with self._mailer() as mailer:
+                while pending:
+                    notification = pending[0]
+                    try:
+                        message = self.build_message(notification)
+                        if message is None:
+                            skipped.append(notification.id)
+                        else:
+                            mailer.send(message)
+                            sent.append(notification.id)
+                    except _PERMANENT_ERRORS as exc:
+                        self._fail(notification, exc, permanent=True)
+                        counts["failed"] += 1
+                    except _CONNECTION_ERRORS:
+                        raise  # the rest of the batch would fail the same way
+                    except Exception as exc:
+                        self._fail(
+                            notification, exc, permanent=notification.attempts >= max_attempts
+                        )
+                        counts["failed"] += 1
+                    pending.pop(0)
+        except (smtplib.SMTPException, OSError) as exc:
+            current_app.logger.warning("Mail server unavailable: %s", exc)
+            for notification in pending:
+                self._fail(notification, exc, permanent=notification.attempts >= max_attempts)
+                counts["failed"] += 1
+        self._repo.mark_sent(sent)
+        self._repo.mark_superseded(skipped)
+        counts["sent"] += len(sent)
+        counts["skipped"] += len(skipped)
+
+    def _fail(self, notification: Notification, exc: Exception, *, permanent: bool) -> None:
+        error = f"{type(exc).__name__}: {exc}"
+        retry_at = None
+        if not permanent:
+            retry_at = datetime.now(UTC) + timedelta(
+                seconds=self.retry_delay(notification.attempts)
+            )
+        current_app.logger.warning(
+            "Notification %s to %s failed (%s)%s",
+            notification.id,
+            notification.recipient,
+            error,
+            "" if retry_at else "; giving up",
+        )
+        self._repo.mark_failed(notification.id, error, retry_at=retry_at)
+
+    def requeue_stale(self) -> int:
+        timeout = current_app.config.get("TASK_LOCK_TIMEOUT_SECONDS", 600)
+        return self._repo.requeue_stale(datetime.now(UTC) - timedelta(seconds=timeout))
+
+
+notification_service = NotificationService()
+
+
+@task_service.task(DISPATCH_TASK)
+def dispatch_notifications() -> None:
+    notification_service.dispatch()
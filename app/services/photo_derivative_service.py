@@ -0,0 +1,139 @@
+"""Background generation of web renditions for job photos.
+
+Uploads are saved as-is; right after the request commits the photo rows,
+``schedule`` queues one ``photos.build_derivatives`` task per photo for
+``flask worker``, which writes WebP renditions next to the original under
+``derived/``. Photos sharing a blob share its renditions, so they are built
+once per content. Photos uploaded before the queue existed are picked up by
+``flask build-photo-derivatives``.
+"""
+
+from __future__ import annotations
+
+import os
+from collections import Counter
+from collections.abc import Iterable
+
+from flask import current_app, url_for
+
+from app.models import JobPhoto
+from app.repositories import job_repo
+from app.utils import image_derivatives
+
+from .task_service import task_service
+from .upload_service import delete_uploaded_file
+
+BUILD_TASK = "photos.build_derivatives"
+
+
+class PhotoDerivativeService:
+    def __init__(self, repository=job_repo, tasks=task_service):
+        self._repo = repository
+        self._tasks = tasks
+
+    def schedule(self, photo_ids: Iterable[int]) -> None:
+        """Queue rendition builds for ``photo_ids``; returns once they are enqueued."""
+        for photo_id in photo_ids:
+            self._tasks.enqueue(BUILD_TASK, {"photo_id": photo_id})
+
+    def build(self, photo_id: int) -> str | None:
+        """Build and record renditions for one photo; returns the new status.
+
+        Returns ``None`` (photo left pending) when the photo is gone or Pillow
+        is not installed.
+        """
+        photo = self._repo.get_photo(photo_id)
+        if photo is None:
+            return None
+        # Blob files carry no extension; the uploaded name tells the format.
+        name = (photo.original_name if photo.blob_id else photo.filename) or ""
+        if not image_derivatives.is_raster(name):
+            self._repo.set_photo_derivatives(photo_id, status="skipped")
+            return "skipped"
+        if photo.blob_id is not None:
+            # Looked up when the task runs, not when it was queued: another
+            # photo of the same blob may have been built in the meantime.
+            shared = self._repo.find_blob_derivatives(photo.blob_id)
+            if shared:
+                self._repo.set_photo_derivatives(photo_id, status="ready", derivatives=shared)
+                return "ready"
+        if not image_derivatives.available():
+            current_app.logger.warning("Pillow not installed; photo %s left pending", photo_id)
+            return None
+
+        root = current_app.config["UPLOADS_DIR"]
+        source = os.path.join(root, photo.filename)
+        try:
+            renditions = image_derivatives.build_derivatives(
+                source,
+                os.path.join(os.path.dirname(source), "derived"),
+                extension=name.rsplit(".", 1)[-1],
+            )
+        except Exception as exc:  # corrupt, truncated or unsupported image
+            current_app.logger.warning("Photo %s: cannot build renditions: %s", photo_id, exc)
+            self._repo.set_photo_derivatives(photo_id, status="failed")
+            return "failed"
+
+        derivatives = {
+            name: {
+                "path": os.path.relpath(info["path"], root).replace("\\", "/"),
+                "width": info["width"],
+                "height": info["height"],
+            }
+            for name, info in renditions.items()
+        }
+        self._repo.set_photo_derivatives(photo_id, status="ready", derivatives=derivatives)
+        return "ready"
+
+    def build_pending(self, *, retry_failed: bool = False, limit: int | None = None) -> Counter:
+        """Synchronously process photos without renditions; returns status counts."""
+        counts: Counter = Counter()
+        for photo_id in self._repo.list_photo_ids_needing_derivatives(
+            retry_failed=retry_failed, limit=limit
+        ):
+            counts[self.build(photo_id) or "pending"] += 1
+        return counts
+
+    def delete_files(self, photo: JobPhoto) -> None:
+        """Remove a legacy photo's rendition files.
+
+        Blob renditions are shared and go with the blob (``delete_blob_files``).
+        """
+        if photo.blob_id is not None:
+            return
+        for info in (photo.derivatives or {}).values():
+            delete_uploaded_file(info["path"])
+
+
+def photo_urls(photo: JobPhoto) -> dict:
+    """URLs for displaying ``photo``, preferring WebP renditions when built.
+
+    ``src``/``srcset`` suit an ``<img>`` in a grid; ``display_url`` is the
+    largest browser-friendly version; ``url`` stays the original upload.
+    """
+    original = url_for("uploads", name=photo.filename or "")
+    renditions = photo.derivatives or {}
+    if photo.derivatives_status != "ready" or not renditions:
+        return {"url": original, "src": original, "srcset": None, "display_url": original}
+
+    def rendition_url(name: str) -> str:
+        return url_for("uploads", name=renditions[name]["path"])
+
+    # Small originals give renditions of equal width; srcset needs one per width.
+    by_width: dict[int, str] = {}
+    for name, info in sorted(renditions.items(), key=lambda item: item[1]["width"]):
+        if name != "full":
+            by_width.setdefault(info["width"], name)
+    srcset = ", ".join(f"{rendition_url(name)} {width}w" for width, name in by_width.items())
+    names = list(by_width.values())
+    display = "full" if "full" in renditions else names[-1]
+    return {
+        "url": original,
+        "src": rendition_url(names[0]),
+        "srcset": srcset,
+        "display_url": rendition_url(display),
+    }
+
+
+photo_derivative_service = PhotoDerivativeService()
+task_service.register(BUILD_TASK, photo_derivative_service.build)
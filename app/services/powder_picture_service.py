@@ -0,0 +1,129 @@
+"""Batch extraction of dominant colors from powder sample photos.
+
+Photos are fetched, hashed and analysed in a process pool (decoding and
+k-means are CPU bound); the parent only talks to the database. A photo whose
+SHA-256 matches ``Powder.picture_sha256`` is skipped before any decoding.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+import urllib.request
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+from flask import current_app
+
+from app.repositories import powder_repo
+from app.utils import dominant_color as dominant
+
+# Results are written back in batches of this many powders.
+SAVE_BATCH = 100
+
+
+@dataclass(frozen=True)
+class PictureResult:
+    powder_id: int
+    status: str  # "updated", "unchanged" or "failed"
+    sha256: str | None = None
+    color: dominant.DominantColor | None = None
+    error: str | None = None
+
+
+def _read_picture(url: str, *, uploads_dir: str, timeout: float, max_bytes: int) -> bytes:
+    if url.startswith(("http://", "https://")):
+        request = urllib.request.Request(url, headers={"User-Agent": "chaotic-nexus/colors"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read(max_bytes + 1)
+    else:
+        name = url.split("/uploads/", 1)[-1].lstrip("/")
+        path = os.path.abspath(os.path.join(uploads_dir, name))
+        if not path.startswith(os.path.abspath(uploads_dir) + os.sep):
+            raise ValueError("picture path outside uploads directory")
+        with open(path, "rb") as handle:
+            data = handle.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"picture larger than {max_bytes} bytes")
+    return data
+
+
+def analyse_picture(
+    source: tuple[int, str, str | None],
+    *,
+    uploads_dir: str,
+    k: int,
+    force: bool,
+    timeout: float,
+    max_bytes: int,
+) -> PictureResult:
+    """Fetch one photo and extract its dominant color (runs in a worker process)."""
+    powder_id, url, known_sha256 = source
+    try:
+        data = _read_picture(url, uploads_dir=uploads_dir, timeout=timeout, max_bytes=max_bytes)
+        sha256 = hashlib.sha256(data).hexdigest()
+        if sha256 == known_sha256 and not force:
+            return PictureResult(powder_id, "unchanged", sha256)
+        return PictureResult(powder_id, "updated", sha256, dominant.dominant_color(data, k=k))
+    except Exception as exc:  # one bad photo must not stop the batch
+        return PictureResult(powder_id, "failed", error=f"{type(exc).__name__}: {exc}")
+
+
+class PowderPictureService:
+    def __init__(self, repository=powder_repo):
+        self._repo = repository
+
+    def extract_colors(
+        self,
+        *,
+        workers: int | None = None,
+        k: int = 5,
+        force: bool = False,
+        limit: int | None = None,
+        timeout: float = 15.0,
+        max_bytes: int = 20 * 1024 * 1024,
+        on_result: Callable[[PictureResult], None] | None = None,
+    ) -> Counter:
+        """Analyse every powder photo and store the colors; returns status counts.
+
+        Raises ``RuntimeError`` when Pillow or NumPy is not installed.
+        """
+        if not dominant.available():
+            raise RuntimeError("Pillow and NumPy are required for color extraction")
+
+        sources = self._repo.list_picture_sources()
+        if limit is not None:
+            sources = sources[:limit]
+        analyse = partial(
+            analyse_picture,
+            uploads_dir=current_app.config["UPLOADS_DIR"],
+            k=k,
+            force=force,
+            timeout=timeout,
+            max_bytes=max_bytes,
+        )
+
+        counts: Counter = Counter()
+        pending: dict[int, tuple] = {}
+        # Spawned workers do not inherit the parent's database connections.
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for result in pool.map(analyse, sources, chunksize=8):
+                counts[result.status] += 1
+                if on_result is not None:
+                    on_result(result)
+                if result.status == "updated":
+                    color = result.color
+                    pending[result.powder_id] = (result.sha256, color.hex, color.lab)
+                if len(pending) >= SAVE_BATCH:
+                    self._repo.save_picture_colors(pending)
+                    pending = {}
+        self._repo.save_picture_colors(pending)
+        return counts
+
+
+powder_picture_service = PowderPictureService()
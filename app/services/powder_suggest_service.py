@@ -0,0 +1,161 @@
+"""Powder color typeahead backed by a per-worker in-memory index.
+
+The index keeps sorted ``(key, powder_id)`` arrays per match tier, so a
+prefix lookup is a ``bisect`` plus a short forward scan and never touches
+the database. Tiers are searched in order, which also ranks the results:
+
+``color``  the full color name,
+``code``   the product code with separators removed,
+``alias``  each alias,
+``word``   every later word of the name or an alias ("black" in "Jet Black").
+
+Writes through ``PowderRepository`` update this worker's index right after
+they commit. Writes handled by other workers are pulled with the delta-sync
+cursor (changed rows plus tombstones) every ``POWDER_INDEX_REFRESH_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+
+from app.repositories import powder_repo
+from app.repositories.projections import PowderSuggestRow
+
+from .sync_service import SyncedMirror, sync_service
+
+TIERS = ("color", "code", "alias", "word")
+_COLOR, _CODE, _ALIAS, _WORD = range(len(TIERS))
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_ALIAS_SPLIT = re.compile(r"[,;|\n]+")
+
+
+def normalize(text: str | None) -> str:
+    """Lower-case, strip accents and collapse punctuation to single spaces."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(part for part in _NON_ALNUM.split(text.lower()) if part)
+
+
+def _later_words(name: str) -> Iterable[str]:
+    words = name.split(" ")
+    for start in range(1, len(words)):
+        yield " ".join(words[start:])
+
+
+def _index_keys(row: PowderSuggestRow) -> set[tuple[int, str]]:
+    keys: set[tuple[int, str]] = set()
+    color = normalize(row.color)
+    if color:
+        keys.add((_COLOR, color))
+        keys.update((_WORD, words) for words in _later_words(color))
+    code = normalize(row.product_code).replace(" ", "")
+    if code:
+        keys.add((_CODE, code))
+    for alias in _ALIAS_SPLIT.split(row.aliases or ""):
+        alias = normalize(alias)
+        if alias:
+            keys.add((_ALIAS, alias))
+            keys.update((_WORD, words) for words in _later_words(alias))
+    return keys
+
+
+class PowderSuggestIndex:
+    """Prefix index over powder names, product codes and aliases."""
+
+    def __init__(self, rows: Iterable[PowderSuggestRow] = ()) -> None:
+        self._lock = threading.RLock()
+        self._tiers: list[list[tuple[str, int]]] = [[] for _ in TIERS]
+        self._rows: dict[int, PowderSuggestRow] = {}
+        self._families: dict[int, str] = {}
+        self._keys: dict[int, set[tuple[int, str]]] = {}
+        for row in rows:
+            self._store(row)
+            for tier, key in self._keys[row.id]:
+                self._tiers[tier].append((key, row.id))
+        for entries in self._tiers:
+            entries.sort()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _store(self, row: PowderSuggestRow) -> None:
+        self._rows[row.id] = row
+        self._families[row.id] = normalize(row.family)
+        self._keys[row.id] = _index_keys(row)
+
+    def upsert(self, row: PowderSuggestRow) -> None:
+        with self._lock:
+            self.remove(row.id)
+            self._store(row)
+            for tier, key in self._keys[row.id]:
+                insort(self._tiers[tier], (key, row.id))
+
+    def remove(self, powder_id: int) -> None:
+        with self._lock:
+            for tier, key in self._keys.pop(powder_id, ()):
+                entries = self._tiers[tier]
+                pos = bisect_left(entries, (key, powder_id))
+                if pos < len(entries) and entries[pos] == (key, powder_id):
+                    del entries[pos]
+            self._rows.pop(powder_id, None)
+            self._families.pop(powder_id, None)
+
+    def search(
+        self, query: str, *, limit: int = 10, family: str | None = None
+    ) -> list[tuple[PowderSuggestRow, str]]:
+        """Return up to ``limit`` ``(row, tier)`` matches for the prefix ``query``."""
+        prefix = normalize(query)
+        if not prefix or limit <= 0:
+            return []
+        family_key = normalize(family)
+        results: list[tuple[PowderSuggestRow, str]] = []
+        seen: set[int] = set()
+        with self._lock:
+            for tier, entries in enumerate(self._tiers):
+                tier_prefix = prefix.replace(" ", "") if tier == _CODE else prefix
+                pos = bisect_left(entries, (tier_prefix,))
+                while pos < len(entries) and entries[pos][0].startswith(tier_prefix):
+                    powder_id = entries[pos][1]
+                    pos += 1
+                    if powder_id in seen:
+                        continue
+                    if family_key and self._families[powder_id] != family_key:
+                        continue
+                    seen.add(powder_id)
+                    results.append((self._rows[powder_id], TIERS[tier]))
+                    if len(results) >= limit:
+                        return results
+        return results
+
+
+class PowderSuggestService(SyncedMirror):
+    """Owns this worker's suggest index and keeps it in step with the database."""
+
+    entity = "powders"
+    refresh_setting = "POWDER_INDEX_REFRESH_SECONDS"
+
+    def __init__(self, repository=powder_repo, sync=sync_service):
+        super().__init__(sync)
+        self._repo = repository
+
+    def suggest(
+        self, query: str, *, limit: int = 10, family: str | None = None
+    ) -> list[tuple[PowderSuggestRow, str]]:
+        return self.current().search(query, limit=limit, family=family)
+
+    def _load(self, *, ids=None, changed_since=None) -> list[PowderSuggestRow]:
+        return self._repo.list_suggest_rows(ids=ids, changed_since=changed_since)
+
+    def _build(self, rows: Iterable[PowderSuggestRow]) -> PowderSuggestIndex:
+        return PowderSuggestIndex(rows)
+
+
+powder_suggest_service = PowderSuggestService()
+powder_repo.on_change(powder_suggest_service.refresh_row)
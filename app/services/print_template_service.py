@@ -15,6 +15,9 @@ class PrintTemplateService:
     def list_all(self, template_type: str):
         return self._repo.list_all(template_type)
 
+    def list_rows_by_type(self, template_type: str):
+        return self._repo.list_rows_by_type(template_type)
+
     def create(self, template_type: str, name: str, content: str):
         if not template_type or not name or not content:
             raise ValueError("template_type, name, and content are required")
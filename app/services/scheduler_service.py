@@ -0,0 +1,255 @@
+"""Periodic maintenance jobs run by one elected process.
+
+Every web worker and ``flask worker`` process starts a scheduler thread, but
+only the one holding a PostgreSQL advisory lock runs jobs. The lock is held
+on a connection the scheduler opens itself (``NullPool``, outside the app's
+pool), so it costs no pooled connection and closing it really disconnects.
+The others retry the lock each tick and take over within a tick of the
+leader exiting, because the lock dies with its connection. Job
+state lives in ``scheduled_jobs`` so next-run times survive a failover and
+the admin status page can show them.
+
+Without PostgreSQL (SQLite in development) there is no lock and every
+process that starts the scheduler runs jobs, so run a single process there.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import socket
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from flask import Flask, current_app
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.extensions import db
+from app.repositories import settings_repo
+from app.repositories.scheduler import scheduler_repo
+from app.utils.cron import CronSchedule
+
+LEADER_LOCK_KEY = zlib.crc32(b"chaoticnexus:scheduler")
+LEADER_SETTING = "scheduler:leader"
+
+
+@dataclass(frozen=True)
+class PeriodicJob:
+    name: str
+    schedule: CronSchedule
+    func: Callable[[], object]
+    jitter_seconds: float = 0.0
+    description: str = ""
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored in UTC.
+    return moment if moment.tzinfo else moment.replace(tzinfo=UTC)
+
+
+class SchedulerService:
+    def __init__(self, repository=scheduler_repo):
+        self._repo = repository
+        self._jobs: dict[str, PeriodicJob] = {}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._thread_pid: int | None = None
+        self._stop = threading.Event()
+        self._leader_conn = None
+        self._leader_since: datetime | None = None
+        self._lock_engine = None
+        self.identity = f"{socket.gethostname()}:{os.getpid()}"
+
+    # Registration ------------------------------------------------------------
+    def register(
+        self,
+        name: str,
+        cron: str,
+        func: Callable[[], object],
+        *,
+        jitter_seconds: float = 0.0,
+        description: str = "",
+    ) -> None:
+        """Run ``func`` on the cron schedule, delayed by up to ``jitter_seconds``.
+
+        Jitter keeps jobs sharing a schedule from all hitting the database at
+        the same second.
+        """
+        self._jobs[name] = PeriodicJob(
+            name, CronSchedule.parse(cron), func, jitter_seconds, description or func.__doc__ or ""
+        )
+
+    def job(self, name: str, cron: str, **options) -> Callable:
+        def decorator(func: Callable[[], object]) -> Callable[[], object]:
+            self.register(name, cron, func, **options)
+            return func
+
+        return decorator
+
+    @property
+    def jobs(self) -> dict[str, PeriodicJob]:
+        return dict(self._jobs)
+
+    def next_run(self, job: PeriodicJob, after: datetime) -> datetime:
+        zone = ZoneInfo(current_app.config.get("SCHEDULER_TIMEZONE", "UTC"))
+        local = job.schedule.next_after(after.astimezone(zone))
+        jitter = timedelta(seconds=random.uniform(0, job.jitter_seconds))
+        return local.astimezone(UTC) + jitter
+
+    # Leadership --------------------------------------------------------------
+    def is_leader(self) -> bool:
+        if db.engine.dialect.name != "postgresql":
+            return True
+        if self._leader_conn is not None:
+            try:
+                self._leader_conn.exec_driver_sql("SELECT 1")
+                self._leader_conn.commit()
+                return True
+            except Exception:  # connection lost, and the lock with it
+                current_app.logger.warning("Scheduler %s lost leadership", self.identity)
+                self._release_leadership()
+        if self._lock_engine is None:
+            # Not the app pool: a pooled connection returned with the lock
+            # still held would keep it forever and block failover.
+            self._lock_engine = create_engine(db.engine.url, poolclass=NullPool)
+        conn = self._lock_engine.connect()
+        if self._repo.try_advisory_lock(conn, LEADER_LOCK_KEY):
+            self._leader_conn = conn
+            self._leader_since = datetime.now(UTC)
+            current_app.logger.info("Scheduler %s elected leader", self.identity)
+            return True
+        conn.close()
+        return False
+
+    def _release_leadership(self) -> None:
+        if self._leader_conn is not None:
+            try:
+                self._repo.advisory_unlock(self._leader_conn, LEADER_LOCK_KEY)
+            except Exception:  # connection already broken; closing frees the lock
+                pass
+            try:
+                self._leader_conn.close()
+            except Exception:  # pragma: no cover - already broken
+                pass
+        self._leader_conn = None
+        self._leader_since = None
+
+    def leader_info(self) -> dict | None:
+        row = settings_repo.get_setting(LEADER_SETTING)
+        try:
+            return json.loads(row.value) if row and row.value else None
+        except ValueError:
+            return None
+
+    # Running -----------------------------------------------------------------
+    def tick(self, now: datetime | None = None) -> list[str]:
+        """Run every due job if this process leads; returns the names run."""
+        if not self._jobs or not self.is_leader():
+            return []
+        now = now or datetime.now(UTC)
+        settings_repo.set_setting(
+            LEADER_SETTING,
+            json.dumps(
+                {
+                    "identity": self.identity,
+                    "since": (self._leader_since or now).isoformat(),
+                    "heartbeat": now.isoformat(),
+                }
+            ),
+        )
+        self._repo.sync_registered(
+            {
+                name: (job.schedule.expression, self.next_run(job, now))
+                for name, job in self._jobs.items()
+            }
+        )
+        ran = []
+        for state in self._repo.list_jobs():
+            job = self._jobs.get(state.name)
+            if job is not None and _as_utc(state.next_run_at) <= now:
+                self.run_job(job)
+                ran.append(job.name)
+        return ran
+
+    def run_job(self, job: PeriodicJob) -> None:
+        started_at = datetime.now(UTC)
+        self._repo.mark_started(job.name, started_at)
+        started = time.perf_counter()
+        result, error = None, None
+        try:
+            outcome = job.func()
+            result = None if outcome is None else str(outcome)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            current_app.logger.exception("Scheduled job %s failed", job.name)
+        duration_ms = (time.perf_counter() - started) * 1000
+        finished_at = datetime.now(UTC)
+        self._repo.mark_finished(
+            job.name,
+            finished_at=finished_at,
+            duration_ms=duration_ms,
+            ok=error is None,
+            result=result,
+            error=error,
+            next_run_at=self.next_run(job, finished_at),
+        )
+        current_app.logger.info(
+            "Scheduled job %s %s in %.0f ms%s",
+            job.name,
+            "failed" if error else "finished",
+            duration_ms,
+            f": {result}" if result else "",
+        )
+
+    def request_run(self, name: str) -> bool:
+        return name in self._jobs and self._repo.request_run(name)
+
+    # Thread ------------------------------------------------------------------
+    def start(self, app: Flask) -> None:
+        """Start this process's scheduler thread once (no-op when disabled)."""
+        if not app.config.get("SCHEDULER_ENABLED"):
+            return
+        if self._thread_pid == os.getpid() and self._thread and self._thread.is_alive():
+            return  # fast path for the per-request hook
+        with self._lock:
+            if self._thread_pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            # Forked children inherit neither the thread nor a usable connection.
+            self._leader_conn = None
+            self._leader_since = None
+            self._lock_engine = None
+            self.identity = f"{socket.gethostname()}:{os.getpid()}"
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.run, args=(app,), name="scheduler", daemon=True
+            )
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, app: Flask) -> None:
+        """Tick every SCHEDULER_TICK_SECONDS until :meth:`stop` is called."""
+        interval = app.config.get("SCHEDULER_TICK_SECONDS", 15)
+        # Spread processes started together so they do not all poll at once.
+        self._stop.wait(random.uniform(0, interval))
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    self.tick()
+                except Exception:  # pragma: no cover - keep the thread alive
+                    app.logger.exception("Scheduler tick failed")
+            self._stop.wait(interval)
+        with app.app_context():
+            self._release_leadership()
+
+
+scheduler_service = SchedulerService()
@@ -0,0 +1,155 @@
+"""Delta-sync cursors for the SPA's ``?since=`` endpoints.
+
+A cursor is the database time at which a response was produced. Clients send
+it back as ``since`` and receive rows whose ``updated_at`` is newer, plus the
+ids of rows deleted meanwhile (from the tombstone table). The window opens a
+little before the cursor (``SYNC_CURSOR_OVERLAP_SECONDS``) because a row can
+be committed after the cursor was issued while carrying an earlier
+``updated_at``; clients upsert by id, so the repeated rows are harmless.
+"""
+
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from time import monotonic
+from typing import Any, Protocol
+
+from flask import current_app
+
+from app.repositories.sync import sync_repo
+from app.utils import metrics
+
+
+@dataclass(frozen=True)
+class SyncWindow:
+    """Lower bound for a delta query (``None`` for a full snapshot) and the next cursor."""
+
+    since: datetime | None
+    cursor: str
+
+    @property
+    def is_delta(self) -> bool:
+        return self.since is not None
+
+
+class SyncService:
+    def __init__(self, repository=sync_repo):
+        self._repo = repository
+
+    def open_window(self, since_param: str | None) -> SyncWindow:
+        """Parse ``since_param`` and issue the cursor for this response.
+
+        Raises ``ValueError`` when the cursor cannot be parsed.
+        """
+        now = self._repo.server_time()
+        cursor = now.isoformat()
+        if not since_param:
+            return SyncWindow(since=None, cursor=cursor)
+
+        since = datetime.fromisoformat(since_param.strip().replace(" ", "+"))
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        retention = timedelta(days=current_app.config.get("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+        if since < now - retention:
+            # Tombstones this old may have been purged; reload instead of missing deletes.
+            return SyncWindow(since=None, cursor=cursor)
+        overlap = timedelta(seconds=current_app.config.get("SYNC_CURSOR_OVERLAP_SECONDS", 30))
+        return SyncWindow(since=since - overlap, cursor=cursor)
+
+    def deleted_ids(self, entity: str, window: SyncWindow) -> list[int]:
+        if window.since is None:
+            return []
+        return self._repo.deleted_ids(entity, window.since)
+
+
+sync_service = SyncService()
+
+
+class MirrorIndex(Protocol):
+    def upsert(self, row: Any) -> None: ...
+
+    def remove(self, row_id: int) -> None: ...
+
+
+class SyncedMirror(ABC):
+    """Per-worker in-memory index over a synced entity.
+
+    The index is built on first use. ``refresh_row`` applies writes made by
+    this worker (wire it to a repository change hook); writes from other
+    workers are pulled through a delta window at most every
+    ``refresh_setting`` seconds. Subclasses provide ``_load`` and ``_build``.
+    """
+
+    entity: str
+    refresh_setting: str
+
+    def __init__(self, sync: SyncService = sync_service):
+        self._sync = sync
+        self._index: MirrorIndex | None = None
+        self._cursor: str | None = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _load(
+        self, *, ids: Collection[int] | None = None, changed_since: datetime | None = None
+    ) -> list:
+        """Rows with ``ids``, changed since ``changed_since``, or all of them."""
+
+    @abstractmethod
+    def _build(self, rows: Iterable[Any]) -> MirrorIndex:
+        """A fresh index over ``rows``."""
+
+    def current(self) -> MirrorIndex:
+        cache = type(self).__name__
+        with self._lock:
+            if self._index is None:
+                metrics.record_cache(cache, "miss")
+                window = self._sync.open_window(None)
+                self._index = self._build(self._load())
+                self._cursor = window.cursor
+                self._checked_at = monotonic()
+            elif monotonic() - self._checked_at >= current_app.config.get(self.refresh_setting, 30):
+                metrics.record_cache(cache, "refresh")
+                self._catch_up()
+            else:
+                metrics.record_cache(cache, "hit")
+            return self._index
+
+    def refresh_row(self, row_id: int) -> None:
+        """Re-read one row into the index (drops it when it no longer exists)."""
+        index = self._index
+        if index is None:
+            return
+        rows = self._load(ids=[row_id])
+        if rows:
+            index.upsert(rows[0])
+        else:
+            index.remove(row_id)
+
+    def reset(self) -> None:
+        """Discard the index; the next lookup rebuilds it from the database."""
+        with self._lock:
+            self._index = None
+            self._cursor = None
+
+    def _catch_up(self) -> None:
+        window = self._sync.open_window(self._cursor)
+        if not window.is_delta:
+            # Cursor older than the tombstone retention: deletions since then
+            # may be gone, so only a rebuild drops every deleted row.
+            self._index = self._build(self._load())
+            self._cursor = window.cursor
+            self._checked_at = monotonic()
+            return
+        # Deletions first: a row returned as changed exists now, whatever its tombstones say.
+        for row_id in self._sync.deleted_ids(self.entity, window):
+            self._index.remove(row_id)
+        for row in self._load(changed_since=window.since):
+            self._index.upsert(row)
+        self._cursor = window.cursor
+        self._checked_at = monotonic()
@@ -0,0 +1,179 @@
+"""Durable background tasks on the ``tasks`` table.
+
+Code registers a handler under a name and enqueues work by that name with a
+JSON payload; the request returns as soon as the row is committed. ``flask
+worker`` runs consumer threads that claim due tasks (``SKIP LOCKED``, so
+several workers share the queue safely), call the handler with the payload
+as keyword arguments and retry failures with exponential backoff.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from flask import Flask, current_app
+
+from app.models import Task
+from app.repositories import task_repo
+
+TaskHandler = Callable[..., object]
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler when retrying cannot help (bad payload, missing row)."""
+
+
+class TaskService:
+    def __init__(self, repository=task_repo):
+        self._repo = repository
+        self._handlers: dict[str, TaskHandler] = {}
+
+    # Registration ------------------------------------------------------------
+    def register(self, name: str, handler: TaskHandler) -> TaskHandler:
+        self._handlers[name] = handler
+        return handler
+
+    def task(self, name: str) -> Callable[[TaskHandler], TaskHandler]:
+        """Decorator form of ``register``."""
+        return lambda handler: self.register(name, handler)
+
+    # Producing ---------------------------------------------------------------
+    def enqueue(
+        self,
+        name: str,
+        payload: dict | None = None,
+        *,
+        priority: int = 0,
+        delay_seconds: float = 0,
+        max_attempts: int | None = None,
+    ) -> Task:
+        """Queue ``name`` to run with ``payload``; higher ``priority`` runs first."""
+        if name not in self._handlers:
+            raise ValueError(f"unknown task {name!r}")
+        run_at = datetime.now(UTC) + timedelta(seconds=delay_seconds) if delay_seconds else None
+        attempts = max_attempts or current_app.config.get("TASK_MAX_ATTEMPTS", 5)
+        return self._repo.enqueue(
+            name, payload, priority=priority, run_at=run_at, max_attempts=attempts
+        )
+
+    # Consuming ---------------------------------------------------------------
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before retry number ``attempts``: doubling, capped, with jitter."""
+        base = current_app.config.get("TASK_RETRY_BASE_SECONDS", 10)
+        cap = current_app.config.get("TASK_RETRY_MAX_SECONDS", 3600)
+        delay = min(cap, base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.8, 1.2)
+
+    def run_one(self, worker_id: str) -> bool:
+        """Claim and run one due task; returns ``False`` when none was due."""
+        claimed = self._repo.claim(worker_id, limit=1)
+        if not claimed:
+            return False
+        task = claimed[0]
+        handler = self._handlers.get(task.name)
+        logger = current_app.logger
+        started = time.perf_counter()
+        try:
+            if handler is None:
+                raise PermanentTaskError(f"no handler registered for {task.name!r}")
+            handler(**(task.payload or {}))
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            retry = not isinstance(exc, PermanentTaskError) and task.attempts < task.max_attempts
+            retry_at = (
+                datetime.now(UTC) + timedelta(seconds=self.retry_delay(task.attempts))
+                if retry
+                else None
+            )
+            self._repo.fail(task.id, error, retry_at=retry_at)
+            logger.warning(
+                "Task %s (%s) attempt %s/%s failed%s: %s",
+                task.id,
+                task.name,
+                task.attempts,
+                task.max_attempts,
+                "; will retry" if retry else "",
+                error,
+                exc_info=not isinstance(exc, PermanentTaskError),
+            )
+        else:
+            self._repo.complete(task.id)
+            logger.debug(
+                "Task %s (%s) done in %.3fs", task.id, task.name, time.perf_counter() - started
+            )
+        return True
+
+    def requeue_stale(self) -> int:
+        timeout = current_app.config.get("TASK_LOCK_TIMEOUT_SECONDS", 600)
+        return self._repo.requeue_stale(datetime.now(UTC) - timedelta(seconds=timeout))
+
+
+class TaskWorker:
+    """``concurrency`` consumer threads polling the queue until stopped.
+
+    SIGINT/SIGTERM let each thread finish its current task, then exit. With
+    ``burst`` the threads exit as soon as the queue has nothing due.
+    """
+
+    STALE_CHECK_SECONDS = 60
+
+    def __init__(
+        self,
+        app: Flask,
+        service: TaskService,
+        *,
+        concurrency: int = 2,
+        poll_seconds: float = 1.0,
+        burst: bool = False,
+    ) -> None:
+        self.app = app
+        self.service = service
+        self.concurrency = max(1, concurrency)
+        self.poll_seconds = poll_seconds
+        self.burst = burst
+        self.stop_event = threading.Event()
+        self._prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+    def run(self) -> None:
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop_event.set())
+        threads = [
+            threading.Thread(target=self._consume, args=(index,), name=f"task-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _consume(self, index: int) -> None:
+        worker_id = f"{self._prefix}:{index}"
+        next_stale_check = 0.0
+        while not self.stop_event.is_set():
+            # A fresh app context per task gives each one a clean session.
+            with self.app.app_context():
+                if index == 0 and time.monotonic() >= next_stale_check:
+                    requeued = self.service.requeue_stale()
+                    if requeued:
+                        self.app.logger.warning("Requeued %s stale task(s)", requeued)
+                    next_stale_check = time.monotonic() + self.STALE_CHECK_SECONDS
+                try:
+                    processed = self.service.run_one(worker_id)
+                except Exception:  # pragma: no cover - database hiccup; keep polling
+                    self.app.logger.exception("Task worker %s failed to poll", worker_id)
+                    processed = False
+            if not processed:
+                if self.burst:
+                    return
+                self.stop_event.wait(self.poll_seconds)
+
+
+task_service = TaskService()
@@ -1,34 +1,52 @@
 """Utilities for saving and deleting job-linked files.
 
-Creates safe, unique filenames labeled with the job id and a timestamp.
-Files are stored under UPLOADS_DIR/jobs/<company-seg>/job-<id>/, and the
-function returns a relative path served by the /uploads/<name> route.
+Uploads are content-addressed: each file is hashed while it streams to a
+temporary file, then stored once under
+``UPLOADS_DIR/blobs/<sha[:2]>/<sha[2:4]>/<sha256>`` and shared by every job
+photo with the same bytes (see ``Blob``). Paths returned here are relative
+to UPLOADS_DIR and served by the /uploads/<name> route.
+
+Serving (``send_upload``) marks blob paths immutable with their hash as a
+strong ETag, supports range and conditional requests, and can hand the
+transfer to nginx (``X-Accel-Redirect``) or Apache (``X-Sendfile``).
+
+A reference is taken before the file is put in place and dropped only after
+the photo row is gone, so a crash between steps can leak a reference (the
+blob is kept) but never leaves a photo pointing at a missing file.
 """
 
 from __future__ import annotations
 
+import hashlib
+import mimetypes
 import os
-import re
 import secrets
+import time
 from collections.abc import Iterable
-from datetime import datetime
-
-from flask import current_app
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import BinaryIO, NamedTuple
+from urllib.parse import quote
 
-_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+from flask import current_app, request, send_file
+from flask.typing import ResponseReturnValue
+from werkzeug.security import safe_join
 
+from app.models import Blob
+from app.models.blob import blob_path
+from app.repositories import blob_repo
+from app.utils import metrics
 
-def _slugify(value: str) -> str:
-    value = (value or "").strip().lower()
-    value = _NON_ALNUM.sub("-", value).strip("-")
-    return value or "job"
+# Read size while hashing uploads.
+CHUNK_SIZE = 1024 * 1024
+# Blob names change whenever their content does, so caches may keep them forever.
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
 
 
-def build_job_upload_dir(job_id: int, company: str | None) -> str:
-    """Return absolute directory for storing this job's files."""
-    root = current_app.config.get("UPLOADS_DIR")
-    seg = _slugify(company or "walk-ins")
-    return os.path.join(root, "jobs", seg, f"job-{job_id}")
+class StoredUpload(NamedTuple):
+    path: str  # relative to UPLOADS_DIR
+    original_name: str
+    blob_id: int
 
 
 def allowed_extension(filename: str) -> bool:
@@ -38,49 +56,150 @@ def allowed_extension(filename: str) -> bool:
     return ext in {"png", "jpg", "jpeg", "webp", "gif", "heic", "heif", "pdf"}
 
 
-def save_job_files(job_id: int, company: str | None, files: Iterable) -> list[tuple[str, str]]:
-    """Save uploaded files to disk with safe names.
+def guess_content_type(filename: str) -> str | None:
+    return mimetypes.guess_type(filename or "")[0]
+
+
+def _uploads_root() -> str:
+    return current_app.config.get("UPLOADS_DIR")
+
 
-    Returns list of (relative_path, original_name) for each successfully saved file.
+def store_blob(stream: BinaryIO, *, content_type: str | None = None) -> Blob:
+    """Store the bytes of ``stream`` as a blob and take a reference to it.
+
+    Identical content is kept once: when the blob already exists the
+    temporary copy is discarded.
     """
-    saved: list[tuple[str, str]] = []
-    upload_dir = build_job_upload_dir(job_id, company)
+    tmp_dir = blob_tmp_dir()
+    os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, secrets.token_hex(8))
+    digest = hashlib.sha256()
+    size = 0
     try:
-        os.makedirs(upload_dir, exist_ok=True)
-    except Exception:
-        # Fallback to root if nested path cannot be created
-        upload_dir = current_app.config.get("UPLOADS_DIR")
+        with open(tmp_path, "wb") as handle:
+            while chunk := stream.read(CHUNK_SIZE):
+                digest.update(chunk)
+                handle.write(chunk)
+                size += len(chunk)
+        return adopt_file(tmp_path, digest.hexdigest(), size=size, content_type=content_type)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def blob_tmp_dir() -> str:
+    """Scratch directory on the blob filesystem, so moves into place are renames."""
+    return os.path.join(_uploads_root(), "blobs", "tmp")
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        while chunk := handle.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    now = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+
+def adopt_file(tmp_path: str, sha256: str, *, size: int, content_type: str | None = None) -> Blob:
+    """Take a reference to blob ``sha256`` and move ``tmp_path`` into place.
+
+    ``tmp_path`` must hold exactly those bytes and live under
+    ``blob_tmp_dir()``. It is consumed: renamed into place, or removed when
+    the blob is already stored.
+    """
+    blob = blob_repo.acquire(sha256, size=size, content_type=content_type)
+    target = os.path.join(_uploads_root(), blob_path(sha256))
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(tmp_path, target)
+    elif os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    return blob
+
+
+def save_job_files(files: Iterable) -> list[StoredUpload]:
+    """Store uploaded files as blobs.
+
+    Returns a ``StoredUpload`` for each successfully saved file; each carries
+    one blob reference for the caller to attach to a photo row.
+    """
+    saved: list[StoredUpload] = []
     for f in files:
         if not f or not getattr(f, "filename", None):
             continue
         orig = f.filename or ""
         if not allowed_extension(orig):
             continue
-        base, ext = os.path.splitext(orig)
-        base = _slugify(base)[:40] or "upload"
-        uniq = secrets.token_hex(4)
-        filename = f"job{job_id}_{now}_{uniq}{ext.lower()}"
-        # Preserve some context while ensuring uniqueness
-        if base and base != "upload":
-            filename = f"{base}_{filename}"
-        abs_path = os.path.join(upload_dir, filename)
         try:
-            f.save(abs_path)
-            rel = os.path.relpath(abs_path, current_app.config.get("UPLOADS_DIR")).replace(
-                "\\", "/"
-            )
-            saved.append((rel, orig))
+            blob = store_blob(f.stream, content_type=guess_content_type(orig) or f.mimetype)
         except Exception:
+            current_app.logger.exception("Failed to store upload %r", orig)
             continue
+        saved.append(StoredUpload(blob.path, orig, blob.id))
     return saved
 
 
+def link_existing_blob(sha256: str, filename: str) -> StoredUpload | None:
+    """Take a reference to an already stored blob without re-uploading it.
+
+    Returns ``None`` when no blob with ``sha256`` exists or its file is gone.
+    """
+    sha256 = (sha256 or "").strip().lower()
+    if len(sha256) != 64 or not allowed_extension(filename):
+        return None
+    existing = blob_repo.get_by_sha256(sha256)
+    if existing is None or not os.path.exists(os.path.join(_uploads_root(), existing.path)):
+        return None
+    blob = blob_repo.acquire(sha256, size=existing.size, content_type=existing.content_type)
+    return StoredUpload(blob.path, filename, blob.id)
+
+
+def delete_blob_files(blob: Blob) -> None:
+    """Remove a blob's bytes and any renditions built from it."""
+    delete_uploaded_file(blob.path)
+    derived_dir = os.path.join(_uploads_root(), os.path.dirname(blob.path), "derived")
+    if os.path.isdir(derived_dir):
+        for name in os.listdir(derived_dir):
+            if name.startswith(f"{blob.sha256}."):
+                os.remove(os.path.join(derived_dir, name))
+
+
+def collect_garbage(*, grace_seconds: float = 3600) -> dict[str, int]:
+    """Reconcile blob references with photo rows and sweep files nobody owns.
+
+    Anything touched within ``grace_seconds`` is left alone so uploads in
+    flight are never collected. Returns counts per kind of cleanup.
+    """
+    cutoff = time.time() - grace_seconds
+    fixed, released = blob_repo.reconcile(untouched_before=datetime.fromtimestamp(cutoff, UTC))
+    known = blob_repo.list_sha256s()
+    root = os.path.join(_uploads_root(), "blobs")
+    orphans = 0
+    for shard, _dirs, names in os.walk(root):
+        if os.path.relpath(shard, root).split(os.sep)[0] == "tmp":
+            continue
+        for name in names:
+            sha256 = name.split(".", 1)[0]
+            path = os.path.join(shard, name)
+            if len(sha256) == 64 and sha256 not in known and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                orphans += 1
+    # Files left by interrupted single-shot uploads (chunked ones purge separately).
+    stale_tmp = 0
+    tmp_dir = blob_tmp_dir()
+    if os.path.isdir(tmp_dir):
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                stale_tmp += 1
+    return {"fixed": fixed, "released": released, "orphans": orphans, "tmp": stale_tmp}
+
+
 def delete_uploaded_file(relative_path: str) -> bool:
     """Delete an uploaded file by its relative path under UPLOADS_DIR."""
     try:
-        root = current_app.config.get("UPLOADS_DIR")
+        root = _uploads_root()
         abs_path = os.path.join(root, relative_path)
         # Safety: ensure path is within root
         if not os.path.abspath(abs_path).startswith(os.path.abspath(root)):
@@ -91,3 +210,83 @@ def delete_uploaded_file(relative_path: str) -> bool:
     except Exception:
         return False
     return False
+
+
+@lru_cache(maxsize=4096)
+def _blob_content_type(sha256: str) -> str | None:
+    # A blob's bytes never change, so neither does its type.
+    blob = blob_repo.get_by_sha256(sha256)
+    return blob.content_type if blob else None
+
+
+def _blob_etag(name: str) -> str | None:
+    """Strong ETag for a content-addressed path, ``None`` for legacy files.
+
+    Originals use their SHA-256; renditions (``derived/<sha>.thumb.webp``)
+    add the rendition name.
+    """
+    if not name.startswith("blobs/"):
+        return None
+    stem = os.path.basename(name)
+    return stem.rsplit(".", 1)[0] if "." in stem else stem
+
+
+def _content_type(name: str, etag: str | None) -> str:
+    guessed = guess_content_type(name)
+    if guessed is None and etag is not None:
+        misses = _blob_content_type.cache_info().misses
+        guessed = _blob_content_type(etag)
+        missed = _blob_content_type.cache_info().misses > misses
+        metrics.record_cache("blob_content_type", "miss" if missed else "hit")
+    return guessed or "application/octet-stream"
+
+
+def send_upload(name: str) -> ResponseReturnValue:
+    """Response for ``/uploads/<name>`` honouring UPLOADS_SERVE_MODE."""
+    root = _uploads_root()
+    path = safe_join(root, name)
+    if path is None:
+        # Prevent path traversal
+        return {"error": "invalid path"}, 400
+    if name.startswith("blobs/tmp/"):
+        return {"error": "not found"}, 404
+    etag = _blob_etag(name)
+    mimetype = _content_type(name, etag)
+    mode = current_app.config.get("UPLOADS_SERVE_MODE", "direct")
+
+    if mode in ("x-accel-redirect", "x-sendfile"):
+        # The front server stats the file and handles ranges and 404s.
+        response = current_app.response_class(mimetype=mimetype)
+        if mode == "x-accel-redirect":
+            prefix = current_app.config.get("UPLOADS_ACCEL_PREFIX", "/_protected_uploads/")
+            response.headers["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+        else:
+            response.headers["X-Sendfile"] = os.path.abspath(path)
+        if etag is not None:
+            response.set_etag(etag)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+    else:
+        try:
+            response = send_file(
+                path,
+                mimetype=mimetype,
+                etag=etag if etag is not None else True,
+                max_age=IMMUTABLE_MAX_AGE if etag is not None else None,
+                conditional=True,
+            )
+        except (FileNotFoundError, IsADirectoryError):
+            return {"error": "not found"}, 404
+
+    if etag is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # Legacy names may be overwritten; revalidate against the ETag each time.
+        response.cache_control.no_cache = True
+    return response
+
+
+blob_repo.on_unreferenced(delete_blob_files)
@@ -0,0 +1,86 @@
+import { useCallback, useEffect, useRef, useState } from 'react'
+
+// Local stores survive navigation between SPA pages, so coming back to a page
+// only pulls what changed since the last visit.
+const stores = new Map()
+
+const getStore = (url) => {
+  if (!stores.has(url)) {
+    stores.set(url, { rows: new Map(), cursor: null, extra: {} })
+  }
+  return stores.get(url)
+}
+
+const toSortedArray = (rows, compare) => {
+  const items = Array.from(rows.values())
+  return compare ? items.sort(compare) : items
+}
+
+/**
+ * Keep a local copy of a delta-sync collection endpoint.
+ *
+ * The endpoint returns `{ [key]: rows, deleted: ids, cursor, full }`. The
+ * first request loads the full collection; `refresh()` sends `?since=cursor`
+ * and applies only the changed rows and deletions. `compare` must be a stable
+ * function (define it at module scope) or every render triggers a refetch.
+ */
+export const useDeltaSync = (url, key, { compare } = {}) => {
+  const store = getStore(url)
+  const [items, setItems] = useState(() => toSortedArray(store.rows, compare))
+  const [extra, setExtra] = useState(store.extra)
+  const [loading, setLoading] = useState(store.cursor === null)
+  const [error, setError] = useState(null)
+  const inFlight = useRef(null)
+
+  const refresh = useCallback(async () => {
+    if (inFlight.current) return inFlight.current
+    const run = (async () => {
+      try {
+        const target = store.cursor
+          ? `${url}${url.includes('?') ? '&' : '?'}since=${encodeURIComponent(store.cursor)}`
+          : url
+        const response = await fetch(target)
+        if (!response.ok) {
+          if (response.status === 400 && store.cursor) {
+            store.cursor = null
+            store.rows.clear()
+          }
+          throw new Error(`Request failed with status ${response.status}`)
+        }
+        const payload = await response.json()
+        if (payload.full) {
+          store.rows.clear()
+        }
+        for (const row of payload[key] || []) {
+          store.rows.set(row.id, row)
+        }
+        for (const id of payload.deleted || []) {
+          store.rows.delete(id)
+        }
+        if (payload.summary) {
+          store.extra = { ...store.extra, summary: payload.summary }
+        }
+        store.cursor = payload.cursor || null
+        setItems(toSortedArray(store.rows, compare))
+        setExtra(store.extra)
+        setError(null)
+      } catch (err) {
+        console.error(`Error syncing ${url}:`, err)
+        setError(err)
+      } finally {
+        setLoading(false)
+        inFlight.current = null
+      }
+    })()
+    inFlight.current = run
+    return run
+  }, [url, key, compare, store])
+
+  useEffect(() => {
+    refresh()
+  }, [refresh])
+
+  return { items, extra, loading, error, refresh }
+}
+
+export default useDeltaSync
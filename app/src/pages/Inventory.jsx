@@ -2,44 +2,32 @@ import React, { useState, useEffect } from 'react'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/Card'
 import { Button } from '../components/Button'
 import { Package, AlertTriangle, CheckCircle, XCircle, Search, Filter, Plus, ShoppingCart, ArrowLeft, Download, Upload } from 'lucide-react'
+import { useDeltaSync } from '../hooks/use-delta-sync'
+
+const byColor = (a, b) => (a.color || '').localeCompare(b.color || '')
 
 const Inventory = () => {
-  const [powders, setPowders] = useState([])
+  const { items: powders, loading, refresh: fetchInventoryData } = useDeltaSync(
+    '/inventory/api/powders',
+    'powders',
+    { compare: byColor }
+  )
   const [filteredPowders, setFilteredPowders] = useState([])
-  const [loading, setLoading] = useState(true)
   const [searchTerm, setSearchTerm] = useState('')
   const [filter, setFilter] = useState('all')
   const [lowStockThreshold, setLowStockThreshold] = useState(5.0)
 
-  useEffect(() => {
-    fetchInventoryData()
-  }, [])
-
   useEffect(() => {
     filterPowders()
   }, [powders, searchTerm, filter, lowStockThreshold])
 
-  const fetchInventoryData = async () => {
-    try {
-      const response = await fetch('/inventory/api/powders')
-      if (response.ok) {
-        const data = await response.json()
-        setPowders(data)
-      }
-    } catch (error) {
-      console.error('Error fetching inventory data:', error)
-    } finally {
-      setLoading(false)
-    }
-  }
-
   const filterPowders = () => {
     let filtered = powders
 
     // Apply search filter
     if (searchTerm) {
       filtered = filtered.filter(powder =>
-        powder.powder_color.toLowerCase().includes(searchTerm.toLowerCase()) ||
+        (powder.color || '').toLowerCase().includes(searchTerm.toLowerCase()) ||
         (powder.manufacturer && powder.manufacturer.toLowerCase().includes(searchTerm.toLowerCase()))
       )
     }
@@ -266,7 +254,7 @@ const Inventory = () => {
             >
               <div className="flex items-start justify-between mb-4">
                 <div className="flex-1">
-                  <h3 className="font-semibold text-lg text-text mb-1">{powder.powder_color}</h3>
+                  <h3 className="font-semibold text-lg text-text mb-1">{powder.color}</h3>
                   {powder.manufacturer && (
                     <p className="text-sm text-muted mb-1">{powder.manufacturer}</p>
                   )}
@@ -309,7 +297,7 @@ const Inventory = () => {
                   size="sm" 
                   className="flex-1"
                   onClick={() => {
-                    const newStock = prompt(`Enter new stock level for ${powder.powder_color} (kg):`, stock)
+                    const newStock = prompt(`Enter new stock level for ${powder.color} (kg):`, stock)
                     if (newStock !== null && !isNaN(newStock)) {
                       updateStock(powder.id, parseFloat(newStock))
                     }
@@ -322,7 +310,7 @@ const Inventory = () => {
                   variant="outline" 
                   className="flex-1"
                   onClick={() => {
-                    const adjustment = prompt(`Enter adjustment amount for ${powder.powder_color} (kg):`, '')
+                    const adjustment = prompt(`Enter adjustment amount for ${powder.color} (kg):`, '')
                     if (adjustment !== null && !isNaN(adjustment)) {
                       const newStock = stock + parseFloat(adjustment)
                       updateStock(powder.id, Math.max(0, newStock))
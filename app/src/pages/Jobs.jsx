@@ -2,37 +2,13 @@ import React from 'react'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '../components/Card'
 import { Button } from '../components/Button'
 import { Plus, Search, Filter, MoreHorizontal } from 'lucide-react'
+import { useDeltaSync } from '../hooks/use-delta-sync'
+
+const newestFirst = (a, b) => b.id - a.id
 
 const Jobs = () => {
-  const jobs = [
-    {
-      id: 47,
-      company: 'Acme Railings',
-      description: 'Prep 12 balcony pickets and 3 posts. Sandblast light rust, prime TGIC, topcoat RAL 9005 matte.',
-      status: 'In Progress',
-      priority: 'Standard',
-      dueDate: '2025-10-01',
-      color: 'RAL 9005 Matte'
-    },
-    {
-      id: 48,
-      company: 'Island Fabricators',
-      description: 'Gate frame 4x8 ft, heavy mill scale. Two-coat with zinc prime + RAL 7016.',
-      status: 'Pending',
-      priority: 'Rush',
-      dueDate: '2025-09-30',
-      color: 'RAL 7016'
-    },
-    {
-      id: 49,
-      company: 'Westbay Marine',
-      description: 'Boat rail sections, 316 stainless scuff & clear. Mask mounting faces.',
-      status: 'Completed',
-      priority: 'Standard',
-      dueDate: '2025-09-28',
-      color: 'Clear Coat'
-    }
-  ]
+  const { items, loading } = useDeltaSync('/jobs/api/jobs', 'jobs', { compare: newestFirst })
+  const jobs = items.filter((job) => !job.archived)
 
   const getStatusColor = (status) => {
     switch (status) {
@@ -95,6 +71,9 @@ const Jobs = () => {
 
       {/* Jobs List */}
       <div className="space-y-4">
+        {loading && jobs.length === 0 && (
+          <p className="text-sm text-gray-600 dark:text-gray-400">Loading jobs...</p>
+        )}
         {jobs.map((job) => (
           <Card key={job.id} className="hover:shadow-lg transition-shadow">
             <CardContent className="p-6">
@@ -112,8 +91,8 @@ const Jobs = () => {
                   <h4 className="text-base font-medium text-gray-900 dark:text-gray-100 mb-1">{job.company}</h4>
                   <p className="text-sm text-gray-600 dark:text-gray-400 mb-3">{job.description}</p>
                   <div className="flex items-center gap-4 text-sm text-gray-600 dark:text-gray-400">
-                    <span>Due: {job.dueDate}</span>
-                    <span>Color: {job.color}</span>
+                    <span>Due: {job.due_by || '—'}</span>
+                    <span>Color: {job.color || '—'}</span>
                   </div>
                 </div>
                 <div className="flex items-center gap-2">
@@ -0,0 +1,190 @@
+/* Resumable chunked uploads for job attachments.
+ *
+ * Files are sent in chunks to /jobs/<id>/uploads; after a dropped connection
+ * the upload resumes from the offset the server reports, including after a
+ * page reload (upload ids are remembered in localStorage). When the browser
+ * can hash the file, content already on the server is linked without
+ * sending it again.
+ *
+ * Forms opt in with data attributes:
+ *   data-chunked-upload="<job id>"  job page: upload the selected files, then reload
+ *   data-chunked-intake             intake: create the job first, then upload its files
+ */
+
+(function () {
+  "use strict";
+
+  const HASH_LIMIT = 256 * 1024 * 1024; // hashing reads the whole file into memory
+  const MAX_RETRIES = 8;
+
+  function csrfToken(form) {
+    const input = form && form.querySelector('input[name="csrf_token"]');
+    const meta = document.querySelector('meta[name="csrf-token"]');
+    return (input && input.value) || (meta && meta.content) || "";
+  }
+
+  function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+  }
+
+  async function sha256Hex(file) {
+    if (!window.crypto || !crypto.subtle || file.size > HASH_LIMIT) return null;
+    const digest = await crypto.subtle.digest("SHA-256", await file.arrayBuffer());
+    return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+  }
+
+  async function request(method, url, token, options) {
+    const headers = Object.assign({ Accept: "application/json" }, options && options.headers);
+    if (token) headers["X-CSRFToken"] = token;
+    const res = await fetch(url, Object.assign({}, options, { method, headers }));
+    const body = res.status === 204 ? {} : await res.json().catch(() => ({}));
+    return { ok: res.ok, status: res.status, body };
+  }
+
+  async function upload(jobId, file, opts) {
+    const token = (opts && opts.csrfToken) || csrfToken();
+    const onProgress = (opts && opts.onProgress) || function () {};
+    const base = "/jobs/" + jobId + "/uploads";
+    const key = ["chunked-upload", jobId, file.name, file.size, file.lastModified].join(":");
+
+    let uploadId = localStorage.getItem(key);
+    let offset = 0;
+    let chunkSize = 8 * 1024 * 1024;
+    if (uploadId) {
+      const status = await request("GET", base + "/" + uploadId, token);
+      if (status.ok) offset = status.body.offset;
+      else uploadId = null;
+    }
+    if (!uploadId) {
+      const sha256 = await sha256Hex(file);
+      const start = await request("POST", base, token, {
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ filename: file.name, size: file.size, sha256 }),
+      });
+      if (!start.ok) throw new Error(start.body.error || "upload refused (" + start.status + ")");
+      if (start.body.photo_id) {
+        onProgress(file.size, file.size);
+        return start.body; // already stored; linked without sending
+      }
+      uploadId = start.body.upload_id;
+      chunkSize = start.body.chunk_size || chunkSize;
+      localStorage.setItem(key, uploadId);
+    }
+
+    let failures = 0;
+    while (offset < file.size) {
+      onProgress(offset, file.size);
+      let res;
+      try {
+        res = await request("PUT", base + "/" + uploadId, token, {
+          headers: { "Content-Type": "application/octet-stream", "Upload-Offset": String(offset) },
+          body: file.slice(offset, offset + chunkSize),
+        });
+      } catch (err) {
+        res = null; // network drop: back off, then ask the server where to resume
+      }
+      if (res && res.ok) {
+        offset = res.body.offset;
+        failures = 0;
+        continue;
+      }
+      if (res && res.status === 409 && typeof res.body.offset === "number") {
+        offset = res.body.offset;
+        continue;
+      }
+      if (res && res.status < 500 && res.status !== 409) {
+        throw new Error(res.body.error || "upload failed (" + res.status + ")");
+      }
+      if (++failures > MAX_RETRIES) throw new Error("upload interrupted; try again to resume");
+      await sleep(Math.min(30000, 500 * 2 ** failures));
+      const status = await request("GET", base + "/" + uploadId, token).catch(() => null);
+      if (status && status.ok) offset = status.body.offset;
+    }
+
+    onProgress(file.size, file.size);
+    const done = await request("POST", base + "/" + uploadId + "/complete", token);
+    localStorage.removeItem(key);
+    if (!done.ok) throw new Error(done.body.error || "upload failed (" + done.status + ")");
+    return done.body;
+  }
+
+  async function uploadAll(jobId, files, form) {
+    const progress = form.querySelector("[data-upload-progress]");
+    const token = csrfToken(form);
+    const total = files.reduce((sum, f) => sum + f.size, 0) || 1;
+    let finished = 0;
+    for (const file of files) {
+      await upload(jobId, file, {
+        csrfToken: token,
+        onProgress(sent) {
+          if (!progress) return;
+          const pct = Math.floor(((finished + sent) / total) * 100);
+          progress.textContent = "Uploading " + file.name + " — " + pct + "%";
+        },
+      });
+      finished += file.size;
+    }
+  }
+
+  function fileInputs(form) {
+    return Array.from(form.querySelectorAll('input[type="file"]'));
+  }
+
+  function selectedFiles(form) {
+    return fileInputs(form).flatMap((input) => Array.from(input.files || []));
+  }
+
+  function wireJobForm(form) {
+    form.addEventListener("submit", async (event) => {
+      const files = selectedFiles(form);
+      if (!files.length || !window.fetch) return;
+      event.preventDefault();
+      const button = form.querySelector('[type="submit"]');
+      if (button) button.disabled = true;
+      try {
+        await uploadAll(form.dataset.chunkedUpload, files, form);
+        window.location.reload();
+      } catch (err) {
+        alert(err.message);
+        if (button) button.disabled = false;
+      }
+    });
+  }
+
+  function wireIntakeForm(form) {
+    form.addEventListener("submit", async (event) => {
+      const files = selectedFiles(form);
+      if (!files.length || !window.fetch) return;
+      event.preventDefault();
+      const data = new FormData(form);
+      fileInputs(form).forEach((input) => data.delete(input.name));
+      const button = form.querySelector('[type="submit"]');
+      if (button) button.disabled = true;
+      try {
+        const res = await fetch(form.action || window.location.href, {
+          method: "POST",
+          headers: { Accept: "application/json" },
+          body: data,
+        });
+        const body = await res.json().catch(() => ({}));
+        if (!res.ok) throw new Error(body.error || "Submit failed (" + res.status + ")");
+        try {
+          await uploadAll(body.job_id, files, form);
+        } catch (err) {
+          alert("Job created, but an attachment failed: " + err.message);
+        }
+        window.location.href = body.redirect;
+      } catch (err) {
+        alert(err.message);
+        if (button) button.disabled = false;
+      }
+    });
+  }
+
+  window.ChunkedUpload = { upload };
+
+  document.addEventListener("DOMContentLoaded", () => {
+    document.querySelectorAll("form[data-chunked-upload]").forEach(wireJobForm);
+    document.querySelectorAll("form[data-chunked-intake]").forEach(wireIntakeForm);
+  });
+})();
@@ -0,0 +1,164 @@
+"""One JSON line per request with a timing breakdown.
+
+Each request gets an ID, taken from an incoming ``X-Request-ID`` header
+when it looks sane and generated otherwise, and echoed back in the
+response. When the request finishes a line goes to ``ACCESS_LOG`` with:
+
+- the request ID, method, path, endpoint, status and response bytes (when
+  the length is known up front; streamed files report ``null``);
+- total time, time in SQL statements and their count, and time spent
+  rendering templates;
+- the signed-in admin (``user``, ``user_id``) or customer (``account_id``).
+
+Lines are written by a background thread (see :mod:`app.utils.log_files`),
+so the request only pays for building a dict and queueing it.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import UTC, datetime
+
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    g,
+    has_request_context,
+    request,
+    session,
+    template_rendered,
+)
+from sqlalchemy import event
+
+from app.extensions import db
+from app.utils.log_files import json_lines_logger
+
+logger = logging.getLogger("chaoticnexus.access")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+class _RequestStats:
+    __slots__ = ("started", "db_seconds", "db_queries", "template_seconds", "template_started")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.db_seconds = 0.0
+        self.db_queries = 0
+        self.template_seconds = 0.0
+        self.template_started: list[float] = []
+
+
+def _stats() -> _RequestStats | None:
+    return g.get("access_stats") if has_request_context() else None
+
+
+def _begin() -> None:
+    incoming = request.headers.get(REQUEST_ID_HEADER, "")
+    g.request_id = incoming if _VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+    g.access_stats = _RequestStats()
+
+
+def _write(stats: _RequestStats, status: int, size: int | None, error: BaseException | None):
+    entry = {
+        "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+        "request_id": g.get("request_id"),
+        "trace_id": g.get("trace_id"),
+        "method": request.method,
+        "path": request.path,
+        "endpoint": request.endpoint,
+        "status": status,
+        "ms": round((time.perf_counter() - stats.started) * 1000, 2),
+        "db_ms": round(stats.db_seconds * 1000, 2),
+        "db_queries": stats.db_queries,
+        "template_ms": round(stats.template_seconds * 1000, 2),
+        "bytes": size,
+        "user": session.get("me_username"),
+        "user_id": session.get("user_id"),
+        "account_id": session.get("customer_account_id"),
+        "remote_addr": request.remote_addr,
+        "pid": os.getpid(),
+    }
+    if error is not None:
+        entry["error"] = repr(error)
+    logger.info(json.dumps(entry, default=str))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _stats() is not None:
+        conn.info.setdefault("access_query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("access_query_started")
+    stats = _stats()
+    if started and stats is not None:
+        stats.db_seconds += time.perf_counter() - started.pop()
+        stats.db_queries += 1
+
+
+def _on_error(context) -> None:
+    started = context.connection.info.get("access_query_started") if context.connection else None
+    if started:
+        started.pop()
+
+
+def _template_started(sender, template, context, **extra) -> None:
+    stats = _stats()
+    if stats is not None:
+        stats.template_started.append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra) -> None:
+    stats = _stats()
+    if stats is not None and stats.template_started:
+        elapsed = time.perf_counter() - stats.template_started.pop()
+        # An outer render's time already includes nested ones.
+        if not stats.template_started:
+            stats.template_seconds += elapsed
+
+
+def init_app(app: Flask) -> None:
+    """Install the request ID and access log hooks (off when ACCESS_LOG_ENABLED is false)."""
+    if not app.config.get("ACCESS_LOG_ENABLED", True):
+        return
+    json_lines_logger(
+        logger.name,
+        app.config["ACCESS_LOG"],
+        max_mb=app.config.get("ACCESS_LOG_MAX_MB", 50),
+        backups=app.config.get("ACCESS_LOG_BACKUPS", 10),
+    )
+    # Run before the other hooks so their time is part of the total.
+    app.before_request_funcs.setdefault(None, []).insert(0, _begin)
+
+    @app.after_request
+    def _tag_response(response: Response) -> Response:
+        response.headers[REQUEST_ID_HEADER] = g.get("request_id", "")
+        g.access_response = (response.status_code, response.content_length)
+        return response
+
+    @app.teardown_request
+    def _log_request(error: BaseException | None) -> None:
+        # Teardown also runs when a view raised and after_request was skipped.
+        stats = g.pop("access_stats", None)
+        if stats is None:
+            return
+        status, size = g.pop("access_response", (500, None))
+        _write(stats, status, size, error)
+
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(db.engine, "handle_error", _on_error)
+
+
+__all__ = ["REQUEST_ID_HEADER", "init_app"]
@@ -0,0 +1,306 @@
+"""Color parsing and CIELAB / CIEDE2000 helpers for powder matching.
+
+Powder codes often carry a RAL Classic number ("RAL 9005") or a hex value
+("#1A2B3C"). Both are converted to sRGB and then to CIELAB (D65). Distances
+use CIEDE2000; ``delta_e2000_many`` is vectorized with NumPy when available
+and falls back to a pure-Python loop otherwise.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+Lab = tuple[float, float, float]
+
+# RAL Classic shades as commonly published sRGB approximations. RAL defines
+# its colors physically, so these are starting points for matching, not
+# colorimetric references.
+RAL_CLASSIC: dict[str, str] = {
+    "1000": "#CDBA88", "1001": "#D0B084", "1002": "#D2AA6D", "1003": "#F9A800",
+    "1004": "#E49E00", "1005": "#CB8E00", "1006": "#E29000", "1007": "#E88C00",
+    "1011": "#AF804F", "1012": "#DDAF27", "1013": "#E3D9C6", "1014": "#DDC49A",
+    "1015": "#E6D2B5", "1016": "#F1DD38", "1017": "#F6A950", "1018": "#FACA30",
+    "1019": "#A48F7A", "1020": "#A08F65", "1021": "#F6B600", "1023": "#F7B500",
+    "1024": "#BA8F4C", "1026": "#FFFF00", "1027": "#A77F0E", "1028": "#FF9B00",
+    "1032": "#E2A300", "1033": "#F99A1C", "1034": "#EB9C52", "1035": "#908370",
+    "1036": "#80643F", "1037": "#F09200",
+    "2000": "#DA6E00", "2001": "#BA481B", "2002": "#BF3922", "2003": "#F67828",
+    "2004": "#E25303", "2005": "#FF4D06", "2007": "#FFB200", "2008": "#ED6B21",
+    "2009": "#DE5307", "2010": "#D05D28", "2011": "#E26E0E", "2012": "#D5654D",
+    "2013": "#923E25",
+    "3000": "#A72920", "3001": "#9B2423", "3002": "#9B2321", "3003": "#861A22",
+    "3004": "#6B1C23", "3005": "#59191F", "3007": "#3E2022", "3009": "#6D342D",
+    "3011": "#792423", "3012": "#C6846D", "3013": "#972E25", "3014": "#CB7375",
+    "3015": "#D8A0A6", "3016": "#A63D2F", "3017": "#CB555D", "3018": "#C73F4A",
+    "3020": "#BB1E10", "3022": "#CF6955", "3024": "#FF2D21", "3026": "#FF2A1B",
+    "3027": "#AB273C", "3028": "#CC2C24", "3031": "#A63437", "3032": "#701D23",
+    "3033": "#A53A2D",
+    "4001": "#816183", "4002": "#8D3C4B", "4003": "#C4618C", "4004": "#651E38",
+    "4005": "#76689A", "4006": "#903373", "4007": "#47243C", "4008": "#844C82",
+    "4009": "#9D8692", "4010": "#BC4077", "4011": "#6E6387", "4012": "#6B6B7F",
+    "5000": "#314F6F", "5001": "#0F4C64", "5002": "#00387B", "5003": "#1F3855",
+    "5004": "#191E28", "5005": "#005387", "5007": "#376B8C", "5008": "#2B3A44",
+    "5009": "#215F78", "5010": "#004F7C", "5011": "#1A2B3C", "5012": "#0089B6",
+    "5013": "#193153", "5014": "#637D96", "5015": "#007CB0", "5017": "#005B8C",
+    "5018": "#058B8C", "5019": "#005E83", "5020": "#00414B", "5021": "#007577",
+    "5022": "#222D5A", "5023": "#41698C", "5024": "#6093AC", "5025": "#20697C",
+    "5026": "#0F3052",
+    "6000": "#3C7460", "6001": "#366735", "6002": "#325928", "6003": "#50533C",
+    "6004": "#024442", "6005": "#114232", "6006": "#3C392E", "6007": "#2C3222",
+    "6008": "#37342A", "6009": "#27352A", "6010": "#4D6F39", "6011": "#6C7C59",
+    "6012": "#303D3A", "6013": "#7D765A", "6014": "#474135", "6015": "#3D3D36",
+    "6016": "#00694C", "6017": "#587F40", "6018": "#61993B", "6019": "#B9CEAC",
+    "6020": "#37422F", "6021": "#8A9977", "6022": "#3A3327", "6024": "#008351",
+    "6025": "#5E6E3B", "6026": "#005F4E", "6027": "#7EBAB5", "6028": "#315442",
+    "6029": "#006F3D", "6032": "#237F52", "6033": "#46877F", "6034": "#7AACAC",
+    "6035": "#194D25", "6036": "#04574B", "6037": "#008B29", "6038": "#00B51A",
+    "7000": "#7A888E", "7001": "#8C969D", "7002": "#817863", "7003": "#7A7669",
+    "7004": "#9B9B9B", "7005": "#6C6E6B", "7006": "#766A5E", "7008": "#745E3D",
+    "7009": "#5D6058", "7010": "#585C56", "7011": "#52595D", "7012": "#575D5E",
+    "7013": "#575044", "7015": "#4F5358", "7016": "#383E42", "7021": "#2F3234",
+    "7022": "#4C4A44", "7023": "#808076", "7024": "#45494E", "7026": "#374345",
+    "7030": "#928E85", "7031": "#5B686D", "7032": "#B5B0A1", "7033": "#7F8274",
+    "7034": "#92886F", "7035": "#C5C7C4", "7036": "#979392", "7037": "#7A7B7A",
+    "7038": "#B0B0A9", "7039": "#6B665E", "7040": "#989EA1", "7042": "#8E9291",
+    "7043": "#4F5250", "7044": "#B7B3A8", "7045": "#8D9295", "7046": "#7E868A",
+    "7047": "#C8C8C7", "7048": "#817B73",
+    "8000": "#89693E", "8001": "#9D622B", "8002": "#794D3E", "8003": "#7E4B26",
+    "8004": "#8D4931", "8007": "#70452A", "8008": "#724A25", "8011": "#5A3826",
+    "8012": "#66332B", "8014": "#4A3526", "8015": "#5E2F26", "8016": "#4C2B20",
+    "8017": "#442F29", "8019": "#3D3635", "8022": "#1A1718", "8023": "#A45729",
+    "8024": "#795038", "8025": "#755847", "8028": "#513A2A", "8029": "#7F4031",
+    "9001": "#E9E0D2", "9002": "#D7D5CB", "9003": "#ECECE7", "9004": "#2B2B2C",
+    "9005": "#0E0E10", "9006": "#A1A1A0", "9007": "#878581", "9010": "#F1ECE1",
+    "9011": "#27292B", "9016": "#F1F0EA", "9017": "#2A292A", "9018": "#C8CBC4",
+    "9022": "#858583", "9023": "#797B7A",
+}  # fmt: skip
+
+_HEX = re.compile(r"#([0-9a-f]{6}|[0-9a-f]{3})\b", re.IGNORECASE)
+_RAL = re.compile(r"\bRAL[\s\-_]*(\d{4})\b", re.IGNORECASE)
+
+# D65 reference white.
+_XN, _YN, _ZN = 0.95047, 1.0, 1.08883
+
+
+def normalize_hex(value: str) -> str | None:
+    """Return ``#RRGGBB`` for ``value`` ("#abc", "aabbcc", ...) or ``None``."""
+    text = (value or "").strip().lstrip("#")
+    if not re.fullmatch(r"[0-9a-fA-F]{3}|[0-9a-fA-F]{6}", text):
+        return None
+    if len(text) == 3:
+        text = "".join(ch * 2 for ch in text)
+    return f"#{text.upper()}"
+
+
+def ral_to_hex(code: str) -> str | None:
+    """Return the sRGB approximation for a RAL Classic number ("9005", "RAL 9005")."""
+    match = _RAL.search(code)
+    number = match.group(1) if match else code.strip()
+    return RAL_CLASSIC.get(number)
+
+
+def parse_color_code(*texts: str | None) -> tuple[str, str] | None:
+    """Find the first RAL or ``#hex`` reference in ``texts``.
+
+    Returns ``(source, hex)`` with ``source`` either ``"ral"`` or ``"hex"``.
+    Bare six-digit strings are not treated as hex; product codes are often
+    numeric.
+    """
+    for text in texts:
+        if not text:
+            continue
+        match = _RAL.search(text)
+        if match and match.group(1) in RAL_CLASSIC:
+            return "ral", RAL_CLASSIC[match.group(1)]
+        match = _HEX.search(text)
+        if match:
+            return "hex", normalize_hex(match.group(1))
+    return None
+
+
+def _srgb_to_linear(channel: float) -> float:
+    channel /= 255.0
+    if channel <= 0.04045:
+        return channel / 12.92
+    return ((channel + 0.055) / 1.055) ** 2.4
+
+
+def _lab_f(t: float) -> float:
+    return t ** (1 / 3) if t > (6 / 29) ** 3 else t / (3 * (6 / 29) ** 2) + 4 / 29
+
+
+def hex_to_lab(value: str) -> Lab:
+    """Convert an sRGB hex color to CIELAB (D65, 2° observer)."""
+    hex_value = normalize_hex(value)
+    if hex_value is None:
+        raise ValueError(f"invalid hex color: {value!r}")
+    r, g, b = (_srgb_to_linear(int(hex_value[i : i + 2], 16)) for i in (1, 3, 5))
+    x = 0.4124564 * r + 0.3575761 * g + 0.1804375 * b
+    y = 0.2126729 * r + 0.7151522 * g + 0.0721750 * b
+    z = 0.0193339 * r + 0.1191920 * g + 0.9503041 * b
+    fx, fy, fz = _lab_f(x / _XN), _lab_f(y / _YN), _lab_f(z / _ZN)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
+def rgb_to_hex(red: float, green: float, blue: float) -> str:
+    """Format 0-255 channel values as ``#RRGGBB``."""
+    return "#" + "".join(f"{min(max(round(c), 0), 255):02X}" for c in (red, green, blue))
+
+
+def srgb_to_lab_array(rgb):
+    """Vectorized sRGB (``(n, 3)`` values 0-255) to CIELAB; requires NumPy."""
+    linear = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(linear <= 0.04045, linear / 12.92, ((linear + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array(
+        [
+            [0.4124564, 0.2126729, 0.0193339],
+            [0.3575761, 0.7151522, 0.1191920],
+            [0.1804375, 0.0721750, 0.9503041],
+        ]
+    )
+    xyz /= np.array([_XN, _YN, _ZN])
+    delta = 6 / 29
+    f = np.where(xyz > delta**3, np.cbrt(xyz), xyz / (3 * delta**2) + 4 / 29)
+    return np.stack(
+        [116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1
+    )
+
+
+def delta_e2000(lab1: Lab, lab2: Lab) -> float:
+    """CIEDE2000 color difference between two Lab colors."""
+    l1, a1, b1 = lab1
+    l2, a2, b2 = lab2
+    c_bar = (math.hypot(a1, b1) + math.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - math.sqrt(c_bar**7 / (c_bar**7 + 25**7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = math.hypot(a1p, b1), math.hypot(a2p, b2)
+    h1p = math.degrees(math.atan2(b1, a1p)) % 360
+    h2p = math.degrees(math.atan2(b2, a2p)) % 360
+
+    dlp = l2 - l1
+    dcp = c2p - c1p
+    dhp = h2p - h1p
+    if c1p * c2p == 0:
+        dhp = 0.0
+    elif dhp > 180:
+        dhp -= 360
+    elif dhp < -180:
+        dhp += 360
+    dhp_big = 2 * math.sqrt(c1p * c2p) * math.sin(math.radians(dhp / 2))
+
+    lp_bar = (l1 + l2) / 2
+    cp_bar = (c1p + c2p) / 2
+    hp_sum = h1p + h2p
+    if c1p * c2p == 0:
+        hp_bar = hp_sum
+    elif abs(h1p - h2p) <= 180:
+        hp_bar = hp_sum / 2
+    elif hp_sum < 360:
+        hp_bar = (hp_sum + 360) / 2
+    else:
+        hp_bar = (hp_sum - 360) / 2
+
+    t = (
+        1
+        - 0.17 * math.cos(math.radians(hp_bar - 30))
+        + 0.24 * math.cos(math.radians(2 * hp_bar))
+        + 0.32 * math.cos(math.radians(3 * hp_bar + 6))
+        - 0.20 * math.cos(math.radians(4 * hp_bar - 63))
+    )
+    sl = 1 + 0.015 * (lp_bar - 50) ** 2 / math.sqrt(20 + (lp_bar - 50) ** 2)
+    sc = 1 + 0.045 * cp_bar
+    sh = 1 + 0.015 * cp_bar * t
+    d_theta = 30 * math.exp(-(((hp_bar - 275) / 25) ** 2))
+    rc = 2 * math.sqrt(cp_bar**7 / (cp_bar**7 + 25**7))
+    rt = -math.sin(math.radians(2 * d_theta)) * rc
+    return math.sqrt(
+        (dlp / sl) ** 2 + (dcp / sc) ** 2 + (dhp_big / sh) ** 2 + rt * (dcp / sc) * (dhp_big / sh)
+    )
+
+
+def _delta_e2000_numpy(lab: Lab, catalog):
+    l1, a1, b1 = lab
+    l2, a2, b2 = catalog[:, 0], catalog[:, 1], catalog[:, 2]
+    c_bar = (math.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_bar**7 / (c_bar**7 + 25.0**7)))
+    a1p, a2p = a1 * (1 + g), a2 * (1 + g)
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+    chroma_zero = (c1p * c2p) == 0
+
+    dlp = l2 - l1
+    dcp = c2p - c1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, np.where(dhp < -180, dhp + 360, dhp))
+    dhp = np.where(chroma_zero, 0.0, dhp)
+    dhp_big = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dhp / 2))
+
+    lp_bar = (l1 + l2) / 2
+    cp_bar = (c1p + c2p) / 2
+    hp_sum = h1p + h2p
+    hp_bar = np.where(
+        np.abs(h1p - h2p) <= 180,
+        hp_sum / 2,
+        np.where(hp_sum < 360, (hp_sum + 360) / 2, (hp_sum - 360) / 2),
+    )
+    hp_bar = np.where(chroma_zero, hp_sum, hp_bar)
+
+    t = (
+        1
+        - 0.17 * np.cos(np.radians(hp_bar - 30))
+        + 0.24 * np.cos(np.radians(2 * hp_bar))
+        + 0.32 * np.cos(np.radians(3 * hp_bar + 6))
+        - 0.20 * np.cos(np.radians(4 * hp_bar - 63))
+    )
+    sl = 1 + 0.015 * (lp_bar - 50) ** 2 / np.sqrt(20 + (lp_bar - 50) ** 2)
+    sc = 1 + 0.045 * cp_bar
+    sh = 1 + 0.015 * cp_bar * t
+    d_theta = 30 * np.exp(-(((hp_bar - 275) / 25) ** 2))
+    rc = 2 * np.sqrt(cp_bar**7 / (cp_bar**7 + 25.0**7))
+    rt = -np.sin(np.radians(2 * d_theta)) * rc
+    return np.sqrt(
+        (dlp / sl) ** 2 + (dcp / sc) ** 2 + (dhp_big / sh) ** 2 + rt * (dcp / sc) * (dhp_big / sh)
+    )
+
+
+def delta_e2000_many(lab: Lab, catalog) -> Sequence[float]:
+    """CIEDE2000 from ``lab`` to every row of ``catalog``.
+
+    ``catalog`` is an ``(n, 3)`` NumPy array when NumPy is installed, otherwise
+    a sequence of Lab tuples.
+    """
+    if np is not None and isinstance(catalog, np.ndarray):
+        if not len(catalog):
+            return np.empty(0)
+        return _delta_e2000_numpy(lab, catalog)
+    return [delta_e2000(lab, other) for other in catalog]
+
+
+def lab_array(labs: Sequence[Lab]):
+    """Pack Lab tuples in the form ``delta_e2000_many`` expects."""
+    if np is None:
+        return list(labs)
+    return np.asarray(labs, dtype=np.float64).reshape(-1, 3)
+
+
+__all__ = [
+    "Lab",
+    "RAL_CLASSIC",
+    "delta_e2000",
+    "delta_e2000_many",
+    "hex_to_lab",
+    "lab_array",
+    "normalize_hex",
+    "parse_color_code",
+    "ral_to_hex",
+    "rgb_to_hex",
+    "srgb_to_lab_array",
+]
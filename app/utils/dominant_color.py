@@ -0,0 +1,97 @@
+"""Dominant color of a powder sample photo.
+
+The photo is center-cropped (swatches sit in the middle, backgrounds at the
+edges), downsampled to a few thousand pixels and clustered with k-means in
+CIELAB, so clusters follow perceived color rather than raw RGB. The largest
+cluster wins. Requires Pillow and NumPy.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+
+from .color import Lab, np, rgb_to_hex, srgb_to_lab_array
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None  # type: ignore[assignment]
+
+
+@dataclass(frozen=True)
+class DominantColor:
+    hex: str
+    lab: Lab
+    share: float  # fraction of sampled pixels in the winning cluster
+
+
+def available() -> bool:
+    return Image is not None and np is not None
+
+
+def sample_pixels(data: bytes, *, size: int = 64, crop: float = 0.7):
+    """Decode ``data`` and return its downsampled center as an ``(n, 3)`` uint8 array."""
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("RGB", (size * 4, size * 4))  # JPEG: decode at reduced scale
+        width, height = image.size
+        margin_x, margin_y = width * (1 - crop) / 2, height * (1 - crop) / 2
+        image = image.crop((margin_x, margin_y, width - margin_x, height - margin_y))
+        image.thumbnail((size, size))
+        pixels = np.asarray(image.convert("RGBA")).reshape(-1, 4)
+    opaque = pixels[pixels[:, 3] >= 128]
+    return (opaque if len(opaque) else pixels)[:, :3]
+
+
+def kmeans(points, k: int, *, iterations: int = 25, seed: int = 0):
+    """Cluster ``points`` (``(n, d)`` floats); returns ``(centers, labels, counts)``.
+
+    Seeded k-means++ initialisation keeps results reproducible between runs.
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(points))
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.integers(len(points))]
+    nearest = ((points - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        total = nearest.sum()
+        pick = (
+            rng.choice(len(points), p=nearest / total) if total > 0 else rng.integers(len(points))
+        )
+        centers[i] = points[pick]
+        nearest = np.minimum(nearest, ((points - centers[i]) ** 2).sum(axis=1))
+
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack(
+            [
+                np.bincount(labels, weights=points[:, d], minlength=k)
+                for d in range(points.shape[1])
+            ],
+            axis=1,
+        )
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        converged = np.allclose(updated, centers, atol=0.05)
+        centers = updated
+        if converged:
+            break
+    labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    return centers, labels, np.bincount(labels, minlength=k)
+
+
+def dominant_color(data: bytes, *, k: int = 5, size: int = 64) -> DominantColor:
+    """Return the dominant color of the encoded image ``data``."""
+    rgb = sample_pixels(data, size=size)
+    centers, labels, counts = kmeans(srgb_to_lab_array(rgb), k)
+    best = int(counts.argmax())
+    members = rgb[labels == best]
+    return DominantColor(
+        hex=rgb_to_hex(*members.mean(axis=0)),
+        lab=tuple(float(value) for value in centers[best]),
+        share=float(counts[best] / counts.sum()),
+    )
+
+
+__all__ = ["DominantColor", "available", "dominant_color", "kmeans", "sample_pixels"]
@@ -0,0 +1,86 @@
+"""Web renditions of uploaded photos.
+
+Each image gets WebP renditions at fixed widths (never upscaled). Formats
+browsers cannot display (HEIC/HEIF) also get a full-size WebP. Orientation
+from EXIF is applied to the pixels and the metadata is dropped, so
+renditions carry no GPS or camera data. Requires Pillow; HEIC needs the
+optional ``pillow-heif`` plugin.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = ImageOps = None  # type: ignore[assignment]
+
+try:
+    from pillow_heif import register_heif_opener
+except ImportError:  # pragma: no cover - optional dependency
+    register_heif_opener = None
+else:
+    register_heif_opener()
+
+# Rendition name -> maximum width in pixels.
+RENDITIONS: dict[str, int] = {"thumb": 320, "medium": 1280}
+# Originals in these formats also get a full-size "full" rendition.
+NON_WEB_EXTENSIONS = frozenset({"heic", "heif"})
+RASTER_EXTENSIONS = frozenset({"png", "jpg", "jpeg", "webp", "gif", "heic", "heif"})
+WEBP_QUALITY = 80
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def is_raster(filename: str) -> bool:
+    return filename.rsplit(".", 1)[-1].lower() in RASTER_EXTENSIONS if "." in filename else False
+
+
+def _save_webp(image, path: str) -> dict:
+    # A unique temp name: two workers may build the same blob's renditions.
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        image.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return {"width": image.width, "height": image.height}
+
+
+def build_derivatives(
+    source_path: str, output_dir: str, *, extension: str | None = None
+) -> dict[str, dict]:
+    """Write WebP renditions of ``source_path`` into ``output_dir``.
+
+    ``extension`` overrides the source's own (content-addressed blobs have
+    none). Returns ``{name: {"path": absolute_path, "width": w, "height": h}}``.
+    """
+    stem, ext = os.path.splitext(os.path.basename(source_path))
+    if extension is not None:
+        ext = f".{extension.lstrip('.')}"
+    os.makedirs(output_dir, exist_ok=True)
+    renditions: dict[str, dict] = {}
+    with Image.open(source_path) as original:
+        original.draft("RGB", (max(RENDITIONS.values()),) * 2)
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        if ext.lower().lstrip(".") in NON_WEB_EXTENSIONS:
+            path = os.path.join(output_dir, f"{stem}.full.webp")
+            renditions["full"] = {"path": path, **_save_webp(image, path)}
+        for name, width in RENDITIONS.items():
+            rendition = image.copy()
+            rendition.thumbnail((width, width * 4))
+            path = os.path.join(output_dir, f"{stem}.{name}.webp")
+            renditions[name] = {"path": path, **_save_webp(rendition, path)}
+    return renditions
+
+
+__all__ = ["RENDITIONS", "available", "build_derivatives", "is_raster"]
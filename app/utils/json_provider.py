@@ -0,0 +1,129 @@
+"""App-wide JSON provider backed by orjson, with a stdlib fallback.
+
+Both code paths emit the same formats so API responses do not change shape
+depending on what is installed:
+
+* ``date``/``datetime``/``time`` as ISO 8601 strings,
+* ``Decimal`` as a JSON number,
+* dataclasses (including the slotted row projections) as objects,
+* ``UUID`` as a string.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from flask import Flask, Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+
+def _default(value: Any) -> Any:
+    """Convert values neither encoder handles natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, set | frozenset):
+        return list(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """``DefaultJSONProvider`` that encodes through orjson when available."""
+
+    def _orjson_options(self, *, indent: bool) -> int:
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _should_indent(self) -> bool:
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def dumps_bytes(self, obj: Any, *, indent: bool = False) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=self._orjson_options(indent=indent))
+        return json.dumps(
+            obj,
+            default=_default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=2 if indent else None,
+            separators=None if indent else (",", ":"),
+        ).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode()
+        kwargs.setdefault("default", _default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self.dumps_bytes(obj, indent=self._should_indent())
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def stream_json_array(items: Iterable[Any], *, chunk_size: int = 500) -> Response:
+    """Stream ``items`` as a JSON array without building the whole body.
+
+    Items are encoded in chunks so memory stays flat for large exports; the
+    response is sent with chunked transfer encoding.
+    """
+    provider = current_app.json
+    encode = (
+        provider.dumps_bytes
+        if isinstance(provider, FastJSONProvider)
+        else lambda obj: provider.dumps(obj).encode()
+    )
+
+    def generate() -> Iterator[bytes]:
+        yield b"["
+        first = True
+        buffer: list[bytes] = []
+        for item in items:
+            buffer.append(encode(item))
+            if len(buffer) >= chunk_size:
+                yield (b"" if first else b",") + b",".join(buffer)
+                first = False
+                buffer.clear()
+        if buffer:
+            yield (b"" if first else b",") + b",".join(buffer)
+        yield b"]"
+
+    return current_app.response_class(generate(), mimetype="application/json")
+
+
+def init_app(app: Flask) -> None:
+    """Install ``FastJSONProvider`` as the application's JSON provider."""
+    app.json_provider_class = FastJSONProvider
+    app.json = FastJSONProvider(app)
+
+
+__all__ = ["FastJSONProvider", "init_app", "stream_json_array"]
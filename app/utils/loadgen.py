@@ -0,0 +1,518 @@
+"""Traffic-replay load generator for sizing gunicorn workers and threads.
+
+Replays a weighted mix of shop-floor scenarios (wall screens polling the
+hitlist, the sprayer tablet posting timer events, front-desk intakes with
+photo uploads and customers refreshing the portal) against a running
+instance. Each virtual user is an asyncio task holding one keep-alive
+HTTP/1.1 connection and its own cookie jar, so no third-party HTTP client
+is required.
+
+Scenario files are JSON::
+
+    {
+      "params": {"job_id": 12, "batch_id": 3},
+      "customer": {"email": "customer@example.com", "password": "secret123"},
+      "scenarios": [
+        {"name": "wall_screen", "weight": 50, "think_ms": 2000,
+         "steps": [{"label": "hitlist.json", "method": "GET",
+                    "path": "/sprayer/hitlist.json"}]}
+      ]
+    }
+
+Step keys: ``label``, ``method``, ``path`` (``{param}`` placeholders are
+filled from ``params``), optional ``form``, ``json``, ``csrf`` (attach the
+session CSRF token), ``login`` (sign in as ``customer`` first) and
+``upload`` (``{"field": "photos", "filename": "photo.jpg", "size_kb": 3000}``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import re
+import ssl
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from urllib.parse import urlencode, urlsplit
+
+_CSRF_RE = re.compile(rb'name="csrf_token"\s+value="([^"]+)"')
+# Failures of one request (refused, reset, cut short, timed out or garbled);
+# they are counted as errors and the user carries on on a new connection.
+_REQUEST_ERRORS = (OSError, EOFError, TimeoutError, ValueError)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open.
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+DEFAULT_SCENARIOS: dict = {
+    "params": {"job_id": 1, "batch_id": 1},
+    "customer": None,
+    "scenarios": [
+        {
+            "name": "wall_screen",
+            "weight": 50,
+            "think_ms": 1000,
+            "steps": [{"label": "hitlist.json", "method": "GET", "path": "/sprayer/hitlist.json"}],
+        },
+        {
+            "name": "sprayer_tablet",
+            "weight": 20,
+            "think_ms": 500,
+            "steps": [
+                {
+                    "label": "batch.job.start",
+                    "method": "POST",
+                    "path": "/sprayer/batches/{batch_id}/job/{job_id}/start",
+                    "csrf": True,
+                },
+                {
+                    "label": "batch.job.end",
+                    "method": "POST",
+                    "path": "/sprayer/batches/{batch_id}/job/{job_id}/end",
+                    "csrf": True,
+                },
+            ],
+        },
+        {
+            "name": "front_desk_intake",
+            "weight": 5,
+            "think_ms": 5000,
+            "steps": [
+                {"label": "intake.form", "method": "GET", "path": "/intake/form"},
+                {
+                    "label": "intake.submit",
+                    "method": "POST",
+                    "path": "/intake/form",
+                    "csrf": True,
+                    "form": {
+                        "contact_name": "Load Test",
+                        "company": "Load Test Fabrication",
+                        "description": "Load generator intake",
+                        "dateIn": "2025-01-01",
+                    },
+                    "upload": {"field": "photos", "filename": "photo.jpg", "size_kb": 3000},
+                },
+            ],
+        },
+        {
+            "name": "customer_portal",
+            "weight": 25,
+            "think_ms": 3000,
+            "steps": [
+                {
+                    "label": "portal.dashboard",
+                    "method": "GET",
+                    "path": "/customer/dashboard",
+                    "login": True,
+                },
+                {"label": "portal.jobs", "method": "GET", "path": "/customer/jobs", "login": True},
+            ],
+        },
+    ],
+}
+
+
+@dataclass
+class Step:
+    label: str
+    method: str
+    path: str
+    form: dict | None = None
+    json: dict | None = None
+    csrf: bool = False
+    login: bool = False
+    upload: dict | None = None
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    steps: list[Step]
+    think_ms: float = 0.0
+
+
+@dataclass
+class LoadPlan:
+    scenarios: list[Scenario]
+    params: dict = field(default_factory=dict)
+    customer: dict | None = None
+
+
+def load_plan(path: str | None) -> LoadPlan:
+    """Read a scenario file (or the built-in mix when ``path`` is empty)."""
+    raw = DEFAULT_SCENARIOS
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            raw = json.load(handle)
+    scenarios = [
+        Scenario(
+            name=item["name"],
+            weight=float(item.get("weight", 1)),
+            think_ms=float(item.get("think_ms", 0)),
+            steps=[Step(**step) for step in item["steps"]],
+        )
+        for item in raw.get("scenarios", [])
+        if float(item.get("weight", 1)) > 0
+    ]
+    if not scenarios:
+        raise ValueError("Scenario file defines no scenarios with a positive weight")
+    return LoadPlan(
+        scenarios=scenarios, params=raw.get("params") or {}, customer=raw.get("customer")
+    )
+
+
+class EndpointStats:
+    """Counters, raw samples and a fixed-bucket histogram for one label."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.samples: list[float] = []
+        self.buckets = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        self.statuses: dict[str, int] = {}
+
+    def record(self, elapsed_ms: float, status: int | None, size: int) -> None:
+        self.requests += 1
+        self.bytes += size
+        self.samples.append(elapsed_ms)
+        key = str(status) if status is not None else "error"
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+        for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[index] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def summary(self, elapsed_s: float) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2)
+
+        labels = [f"le_{int(b)}ms" for b in HISTOGRAM_BUCKETS_MS] + ["gt_10000ms"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "throughput_rps": round(self.requests / elapsed_s, 2) if elapsed_s else 0.0,
+            "bytes": self.bytes,
+            "p50_ms": pct(50),
+            "p90_ms": pct(90),
+            "p99_ms": pct(99),
+            "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+            "statuses": self.statuses,
+            "histogram": dict(zip(labels, self.buckets, strict=True)),
+        }
+
+
+class _Connection:
+    """Minimal keep-alive HTTP/1.1 client bound to one origin."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "localhost"
+        self.secure = parts.scheme == "https"
+        self.port = parts.port or (443 if self.secure else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _connect(self) -> None:
+        ctx = ssl.create_default_context() if self.secure else None
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(
+        self, method: str, path: str, headers: dict[str, str], body: bytes
+    ) -> tuple[int, dict[str, list[str]], bytes]:
+        for attempt in range(2):
+            if self._writer is None:
+                await self._connect()
+            try:
+                return await asyncio.wait_for(
+                    self._roundtrip(method, path, headers, body), timeout=self.timeout
+                )
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Server closed an idle keep-alive connection; retry once on a fresh one.
+                await self.close()
+                if attempt:
+                    raise
+        raise ConnectionError("unreachable")  # pragma: no cover
+
+    async def _roundtrip(self, method, path, headers, body):
+        assert self._reader is not None and self._writer is not None
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed")
+        status = int(status_line.split(b" ", 2)[1])
+        response_headers: dict[str, list[str]] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers.setdefault(name.strip().lower(), []).append(value.strip())
+
+        if "chunked" in ",".join(response_headers.get("transfer-encoding", [])).lower():
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            payload = b"".join(chunks)
+        else:
+            length = int((response_headers.get("content-length") or ["0"])[0])
+            payload = await self._reader.readexactly(length) if length else b""
+
+        if "close" in ",".join(response_headers.get("connection", [])).lower():
+            await self.close()
+        return status, response_headers, payload
+
+
+class VirtualUser:
+    """One simulated client: connection, cookies, CSRF token and login state."""
+
+    def __init__(self, base_url: str, plan: LoadPlan, stats: dict[str, EndpointStats], timeout):
+        self.conn = _Connection(base_url, timeout)
+        self.plan = plan
+        self.stats = stats
+        self.cookies: dict[str, str] = {}
+        self.csrf_token: str | None = None
+        self.logged_in = False
+
+    async def send(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: bytes = b"",
+        content_type: str | None = None,
+        extra_headers: dict[str, str] | None = None,
+    ) -> tuple[int, bytes]:
+        headers = {"Accept": "*/*", "User-Agent": "chaoticnexus-loadgen"}
+        if content_type:
+            headers["Content-Type"] = content_type
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        headers.update(extra_headers or {})
+        status, response_headers, payload = await self.conn.request(method, path, headers, body)
+        for raw in response_headers.get("set-cookie", []):
+            name, _, rest = raw.partition("=")
+            self.cookies[name.strip()] = rest.split(";", 1)[0]
+        return status, payload
+
+    async def request(
+        self, label: str, method: str, path: str, **kwargs
+    ) -> tuple[int | None, bytes]:
+        """``send`` and record the outcome under ``label``; status is None on failure."""
+        started = time.perf_counter()
+        try:
+            status, payload = await self.send(method, path, **kwargs)
+        except _REQUEST_ERRORS:
+            status, payload = None, b""
+            await self.conn.close()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        self.stats.setdefault(label, EndpointStats()).record(elapsed_ms, status, len(payload))
+        return status, payload
+
+    async def ensure_csrf(self) -> bool:
+        if self.csrf_token:
+            return True
+        status, payload = await self.request("auth.login_form", "GET", "/auth/login")
+        if status is None:
+            return False
+        match = _CSRF_RE.search(payload)
+        self.csrf_token = match.group(1).decode() if match else ""
+        return True
+
+    async def ensure_login(self) -> bool:
+        if self.logged_in or not self.plan.customer:
+            return True
+        if not await self.ensure_csrf():
+            return False
+        form = {
+            "identifier": self.plan.customer.get("email", ""),
+            "password": self.plan.customer.get("password", ""),
+            "csrf_token": self.csrf_token or "",
+        }
+        status, _ = await self.request(
+            "auth.login",
+            "POST",
+            "/auth/login",
+            body=urlencode(form).encode(),
+            content_type="application/x-www-form-urlencoded",
+        )
+        if status is None:
+            return False
+        # Login rotates the session, so the CSRF token must be fetched again.
+        self.csrf_token = None
+        self.logged_in = True
+        return True
+
+    async def run_step(self, step: Step) -> None:
+        # A failed login or token fetch is already counted; skip the step.
+        if step.login and not await self.ensure_login():
+            return
+        if step.csrf and not await self.ensure_csrf():
+            return
+
+        path = step.path.format(**self.plan.params)
+        body = b""
+        content_type = None
+        headers: dict[str, str] = {}
+        if step.csrf and self.csrf_token:
+            headers["X-CSRFToken"] = self.csrf_token
+        if step.json is not None:
+            body = json.dumps(step.json).encode()
+            content_type = "application/json"
+        elif step.upload:
+            fields = dict(step.form or {})
+            if step.csrf and self.csrf_token:
+                fields["csrf_token"] = self.csrf_token
+            body, content_type = _multipart(fields, step.upload)
+        elif step.form is not None:
+            fields = dict(step.form)
+            if step.csrf and self.csrf_token:
+                fields["csrf_token"] = self.csrf_token
+            body = urlencode(fields).encode()
+            content_type = "application/x-www-form-urlencoded"
+
+        await self.request(
+            step.label,
+            step.method.upper(),
+            path,
+            body=body,
+            content_type=content_type,
+            extra_headers=headers,
+        )
+
+
+_UPLOAD_CACHE: dict[int, bytes] = {}
+
+
+def _multipart(fields: dict, upload: dict) -> tuple[bytes, str]:
+    size = int(upload.get("size_kb", 1024)) * 1024
+    if size not in _UPLOAD_CACHE:
+        _UPLOAD_CACHE[size] = os.urandom(size)
+    boundary = uuid.uuid4().hex
+    parts: list[bytes] = []
+    for name, value in fields.items():
+        disposition = f'Content-Disposition: form-data; name="{name}"'
+        parts.append(f"--{boundary}\r\n{disposition}\r\n\r\n{value}\r\n".encode())
+    parts.append(
+        (
+            f"--{boundary}\r\nContent-Disposition: form-data; "
+            f'name="{upload.get("field", "photos")}"; '
+            f'filename="{upload.get("filename", "photo.jpg")}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        + _UPLOAD_CACHE[size]
+        + b"\r\n"
+    )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def _pick(scenarios: list[Scenario], rng: random.Random) -> Scenario:
+    return rng.choices(scenarios, weights=[s.weight for s in scenarios], k=1)[0]
+
+
+async def _user_loop(user: VirtualUser, deadline: float, rng: random.Random, think: bool) -> None:
+    try:
+        while time.monotonic() < deadline:
+            scenario = _pick(user.plan.scenarios, rng)
+            for step in scenario.steps:
+                if time.monotonic() >= deadline:
+                    return
+                await user.run_step(step)
+            if think and scenario.think_ms:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * scenario.think_ms / 1000.0)
+    finally:
+        await user.conn.close()
+
+
+async def run_load(
+    base_url: str,
+    plan: LoadPlan,
+    *,
+    concurrency: int,
+    duration_s: float,
+    think: bool = True,
+    timeout_s: float = 30.0,
+    seed: int | None = None,
+) -> dict:
+    """Drive ``concurrency`` virtual users for ``duration_s`` and return a report."""
+    stats: dict[str, EndpointStats] = {}
+    rng = random.Random(seed)
+    started = time.monotonic()
+    deadline = started + duration_s
+    users = [VirtualUser(base_url, plan, stats, timeout_s) for _ in range(concurrency)]
+    await asyncio.gather(
+        *(_user_loop(user, deadline, random.Random(rng.random()), think) for user in users)
+    )
+    elapsed = time.monotonic() - started
+
+    total = EndpointStats()
+    for item in stats.values():
+        total.requests += item.requests
+        total.errors += item.errors
+        total.bytes += item.bytes
+        total.samples.extend(item.samples)
+        total.buckets = [a + b for a, b in zip(total.buckets, item.buckets, strict=True)]
+        for key, count in item.statuses.items():
+            total.statuses[key] = total.statuses.get(key, 0) + count
+
+    return {
+        "target": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "scenarios": {s.name: s.weight for s in plan.scenarios},
+        "total": total.summary(elapsed),
+        "endpoints": {label: item.summary(elapsed) for label, item in sorted(stats.items())},
+    }
+
+
+def format_report(report: dict) -> Iterable[str]:
+    """Yield a compact text table for terminal output."""
+    yield (
+        f"{report['target']}  concurrency={report['concurrency']}  "
+        f"duration={report['duration_s']}s"
+    )
+    header = f"{'endpoint':<22}{'req':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p90':>9}{'p99':>9}"
+    yield header
+    yield "-" * len(header)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for label, item in rows:
+        yield (
+            f"{label:<22}{item['requests']:>8}{item['throughput_rps']:>9.1f}"
+            f"{item['error_rate'] * 100:>7.1f}{item['p50_ms']:>9.1f}"
+            f"{item['p90_ms']:>9.1f}{item['p99_ms']:>9.1f}"
+        )
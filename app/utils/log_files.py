@@ -0,0 +1,154 @@
+"""JSON-lines log files under ``_logs/`` that never block the request path.
+
+Records are handed to a queue and written by a listener thread, so a slow
+disk only delays the writer. Every gunicorn worker appends to the same file;
+:class:`SharedRotatingFileHandler` rotates it under a file lock and reopens
+the file after another process has rotated it, so no worker keeps writing
+into a backup. Without ``fcntl`` (Windows) rotation is not locked.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from collections.abc import Iterator
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """Size-rotated file that several processes append to."""
+
+    def _rotated_elsewhere(self) -> bool:
+        if self.stream is None:
+            return False
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _reopen(self) -> None:
+        if self.stream is not None:
+            self.stream.close()
+        self.stream = self._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self._rotated_elsewhere():
+            self._reopen()
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        if fcntl is None:
+            # No cross-process lock; fine for the single-process dev server.
+            super().doRollover()
+            return
+        with open(f"{self.baseFilename}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another process may have rotated while this one waited for the lock.
+            if self._rotated_elsewhere():
+                self._reopen()
+            else:
+                super().doRollover()
+
+
+class _BackgroundHandler(QueueHandler):
+    """Queues records for a writer thread owned by the current process.
+
+    The thread is started on first use in each process, so workers forked
+    from a preloaded app get their own instead of a queue nobody drains.
+    """
+
+    def __init__(self, target: logging.Handler) -> None:
+        super().__init__(queue.SimpleQueue())
+        self._target = target
+        self._listener: QueueListener | None = None
+        self._pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            self._listener = QueueListener(self.queue, self._target)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.close)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self._start()
+        super().enqueue(record)
+
+    def close(self) -> None:
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()  # drains what is already queued
+            self._listener = None
+            self._pid = None
+        self._target.close()
+        super().close()
+
+
+def background_handler(target: logging.Handler) -> logging.Handler:
+    """Wrap ``target`` so its ``emit`` runs on a writer thread."""
+    return _BackgroundHandler(target)
+
+
+def json_lines_logger(name: str, path: str, *, max_mb: int, backups: int) -> logging.Logger:
+    """Point logger ``name`` at ``path`` through a background writer.
+
+    Messages are written as-is, one per line, so callers log ``json.dumps``
+    output. Calling this again (a second app in the same process) replaces
+    the previous handler.
+    """
+    logger = logging.getLogger(name)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    target = SharedRotatingFileHandler(
+        path,
+        maxBytes=max_mb * 1024 * 1024,
+        backupCount=backups,
+        encoding="utf-8",
+        delay=True,
+    )
+    target.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_BackgroundHandler(target))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def read_json_lines(path: str) -> Iterator[dict]:
+    """Objects from ``path`` and its rotated backups, oldest file first."""
+    backups = []
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        backups.append(f"{path}.{index}")
+        index += 1
+    for name in [*reversed(backups), path]:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash or rotation
+
+
+__all__ = [
+    "SharedRotatingFileHandler",
+    "background_handler",
+    "json_lines_logger",
+    "read_json_lines",
+]
@@ -0,0 +1,239 @@
+"""Prometheus metrics for requests, the database pool, queues and caches.
+
+Served at ``/metrics`` in the text exposition format. Under gunicorn every
+worker writes its samples to files in ``PROMETHEUS_MULTIPROC_DIR`` (set up in
+``gunicorn.conf.py``) and the scrape sums them, so one scrape sees the whole
+server whichever worker answers it. Without that variable the values are
+this process's own, which is what the development server wants.
+
+Queue depths and task outcomes are read from the database when scraped
+rather than tracked: ``flask worker`` runs outside gunicorn, so counters it
+kept in memory would never reach a scrape. Because scrapes query the
+database they must carry ``METRICS_TOKEN`` as a bearer token. Without a
+token, or without the optional ``prometheus_client``, the hooks are not
+installed and ``/metrics`` answers 404.
+"""
+
+from __future__ import annotations
+
+import os
+import secrets
+import time
+
+from flask import Flask, Response, abort, current_app, g, request
+
+from app.extensions import db
+
+try:  # pragma: no cover - optional dependency
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # pragma: no cover - optional dependency fallback
+    Counter = None  # type: ignore
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(256 * 4**power for power in range(9))  # 256 B .. 16 MiB
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+ENABLED = Counter is not None
+
+if ENABLED:
+    REQUESTS = Counter(
+        "chaoticnexus_http_requests_total",
+        "HTTP requests by endpoint, method and status.",
+        ["endpoint", "method", "status"],
+    )
+    REQUEST_SECONDS = Histogram(
+        "chaoticnexus_http_request_duration_seconds",
+        "Time from request start to response, by endpoint.",
+        ["endpoint", "method"],
+        buckets=LATENCY_BUCKETS,
+    )
+    RESPONSE_BYTES = Histogram(
+        "chaoticnexus_http_response_size_bytes",
+        "Response body size (when known up front), by endpoint.",
+        ["endpoint"],
+        buckets=SIZE_BUCKETS,
+    )
+    REQUEST_QUERIES = Histogram(
+        "chaoticnexus_http_request_db_queries",
+        "SQL statements executed while handling one request, by endpoint.",
+        ["endpoint"],
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+    IN_FLIGHT = Gauge(
+        "chaoticnexus_http_requests_in_flight",
+        "Requests being handled right now.",
+        multiprocess_mode="livesum",
+    )
+    DB_QUERIES = Counter("chaoticnexus_db_queries_total", "SQL statements executed.")
+    DB_QUERY_SECONDS = Histogram(
+        "chaoticnexus_db_query_duration_seconds",
+        "Time spent executing one SQL statement.",
+        buckets=LATENCY_BUCKETS,
+    )
+    DB_POOL_CHECKOUTS = Counter(
+        "chaoticnexus_db_pool_checkouts_total", "Connections checked out of the pool."
+    )
+    DB_POOL_CONNECTS = Counter(
+        "chaoticnexus_db_pool_connects_total", "New database connections opened by the pool."
+    )
+    DB_POOL_CHECKED_OUT = Gauge(
+        "chaoticnexus_db_pool_checked_out",
+        "Connections currently checked out, summed over live processes.",
+        multiprocess_mode="livesum",
+    )
+    CACHE_LOOKUPS = Counter(
+        "chaoticnexus_cache_lookups_total",
+        "In-process cache lookups by cache and result (hit, miss, refresh).",
+        ["cache", "result"],
+    )
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Count one lookup in ``cache``: ``hit``, ``miss`` or ``refresh``."""
+    if ENABLED:
+        CACHE_LOOKUPS.labels(cache, result).inc()
+
+
+def _endpoint() -> str:
+    return request.endpoint or "unmatched"
+
+
+def _install_request_hooks(app: Flask) -> None:
+    @app.before_request
+    def _start_timer() -> None:
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        IN_FLIGHT.inc()
+
+    @app.after_request
+    def _observe(response: Response) -> Response:
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        IN_FLIGHT.dec()
+        endpoint = _endpoint()
+        REQUESTS.labels(endpoint, request.method, str(response.status_code)).inc()
+        REQUEST_SECONDS.labels(endpoint, request.method).observe(time.perf_counter() - started)
+        REQUEST_QUERIES.labels(endpoint).observe(g.pop("metrics_queries", 0))
+        if response.content_length is not None:
+            RESPONSE_BYTES.labels(endpoint).observe(response.content_length)
+        return response
+
+    @app.teardown_request
+    def _unhandled(exc: BaseException | None) -> None:
+        # after_request is skipped when a view raises; count the 500 here.
+        if g.pop("metrics_started", None) is not None:
+            IN_FLIGHT.dec()
+            REQUESTS.labels(_endpoint(), request.method, "500").inc()
+
+
+def _install_engine_hooks(engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("metrics_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info["metrics_query_started"].pop()
+        DB_QUERIES.inc()
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started)
+        if g:
+            g.metrics_queries = g.get("metrics_queries", 0) + 1
+
+    @event.listens_for(engine, "handle_error")
+    def _query_failed(context) -> None:
+        stack = context.connection.info.get("metrics_query_started") if context.connection else None
+        if stack:
+            stack.pop()
+
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_connection, record) -> None:
+        DB_POOL_CONNECTS.inc()
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, record, proxy) -> None:
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, record) -> None:
+        DB_POOL_CHECKED_OUT.dec()
+
+
+class _QueueCollector:
+    """Reads queue depths from the database at scrape time."""
+
+    def __init__(self, app: Flask) -> None:
+        self._app = app
+
+    def collect(self):
+        from app.repositories import notification_repo, task_repo
+
+        with self._app.app_context():
+            tasks = task_repo.counts_by_status()
+            oldest = task_repo.oldest_due_age_seconds()
+            notifications = notification_repo.counts_by_status()
+        family = GaugeMetricFamily(
+            "chaoticnexus_task_queue_tasks", "Background tasks by status.", labels=["status"]
+        )
+        for status, count in sorted(tasks.items()):
+            family.add_metric([status], count)
+        yield family
+        yield GaugeMetricFamily(
+            "chaoticnexus_task_queue_lag_seconds",
+            "Age of the oldest due task still waiting for a worker.",
+            value=oldest,
+        )
+        family = GaugeMetricFamily(
+            "chaoticnexus_notification_outbox", "Outbox emails by status.", labels=["status"]
+        )
+        for status, count in sorted(notifications.items()):
+            family.add_metric([status], count)
+        yield family
+
+
+def _authorized() -> bool:
+    expected = f"Bearer {current_app.config['METRICS_TOKEN']}"
+    return secrets.compare_digest(request.headers.get("Authorization", ""), expected)
+
+
+def init_app(app: Flask) -> None:
+    """Install request and database hooks and the ``/metrics`` route."""
+    if not ENABLED or not app.config.get("METRICS_ENABLED", True):
+        return
+    if not app.config.get("METRICS_TOKEN"):
+        app.logger.info("METRICS_TOKEN is not set; /metrics is disabled")
+        return
+    _install_request_hooks(app)
+    with app.app_context():
+        _install_engine_hooks(db.engine)
+    queue_registry = CollectorRegistry()
+    queue_registry.register(_QueueCollector(app))
+
+    @app.get("/metrics")
+    def metrics() -> Response:
+        """Prometheus scrape endpoint."""
+        if not _authorized():
+            abort(401)
+        if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        body = generate_latest(registry) + generate_latest(queue_registry)
+        return Response(body, content_type=CONTENT_TYPE_LATEST)
+
+
+__all__ = ["ENABLED", "init_app", "record_cache"]
@@ -0,0 +1,215 @@
+"""On-demand sampling profiler for single requests, admins only.
+
+Add ``?__profile=1`` (or an ``X-Profile: 1`` header) to a request while
+signed in as an admin. A sampler thread then records the request thread's
+stack every ``PROFILE_SAMPLE_INTERVAL_MS`` until the response is ready.
+Time spent in SQL statements is summed separately.
+
+Results go to ``PROFILE_DIR``:
+
+- ``<id>.folded`` holds collapsed stacks (``frame;frame;frame count``).
+  flamegraph.pl, speedscope and inferno read it directly.
+- ``<id>.json`` holds the request, timings and top leaf frames, which
+  the admin profiles page lists.
+
+Requests without the flag pay for one dictionary lookup; the SQL hooks do
+nothing unless a profile is running.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import UTC, datetime
+
+from flask import Flask, Response, current_app, g, has_request_context, request, session
+from sqlalchemy import event
+
+from app.extensions import db
+
+FLAG_ARG = "__profile"
+FLAG_HEADER = "X-Profile"
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_active = 0  # profiles running in this process; SQL hooks return early at zero
+_active_lock = threading.Lock()
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = os.path.relpath(filename, _APP_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _fold(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _Sampler(threading.Thread):
+    """Counts the target thread's stacks until stopped or ``max_seconds`` pass."""
+
+    def __init__(self, thread_id: int, *, interval: float, max_seconds: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.deadline = time.monotonic() + max_seconds
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval) and time.monotonic() < self.deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.stacks[_fold(frame)] += 1
+
+    def stop(self) -> Counter[str]:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class _RequestProfile:
+    def __init__(self, config) -> None:
+        now = datetime.now(UTC)
+        # Sortable by start time, which is how listing and pruning order them.
+        self.id = f"{now:%Y%m%dT%H%M%S}{now.microsecond // 1000:03d}-{secrets.token_hex(3)}"
+        self.started = time.perf_counter()
+        self.sql_seconds = 0.0
+        self.sql_count = 0
+        self.sampler = _Sampler(
+            threading.get_ident(),
+            interval=config.get("PROFILE_SAMPLE_INTERVAL_MS", 2) / 1000,
+            max_seconds=config.get("PROFILE_MAX_SECONDS", 60),
+        )
+
+
+def _requested() -> bool:
+    return FLAG_ARG in request.args or FLAG_HEADER in request.headers
+
+
+def _start() -> None:
+    global _active
+    if not _requested() or not session.get("is_admin"):
+        return
+    profile = _RequestProfile(current_app.config)
+    g.profile = profile
+    with _active_lock:
+        _active += 1
+    profile.sampler.start()
+
+
+def _finish(response: Response | None, error: BaseException | None = None) -> str | None:
+    global _active
+    profile: _RequestProfile | None = g.pop("profile", None)
+    if profile is None:
+        return None
+    stacks = profile.sampler.stop()
+    with _active_lock:
+        _active -= 1
+    duration_ms = (time.perf_counter() - profile.started) * 1000
+    leaves: Counter[str] = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    meta = {
+        "id": profile.id,
+        "at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status": response.status_code if response is not None else 500,
+        "error": repr(error) if error else None,
+        "user": session.get("me_username"),
+        "duration_ms": round(duration_ms, 1),
+        "sql_ms": round(profile.sql_seconds * 1000, 1),
+        "sql_count": profile.sql_count,
+        "samples": sum(stacks.values()),
+        "interval_ms": profile.sampler.interval * 1000,
+        "top_frames": leaves.most_common(8),
+    }
+    directory = current_app.config["PROFILE_DIR"]
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{profile.id}.folded"), "w", encoding="utf-8") as handle:
+        for stack, count in stacks.most_common():
+            handle.write(f"{stack} {count}\n")
+    with open(os.path.join(directory, f"{profile.id}.json"), "w", encoding="utf-8") as handle:
+        json.dump(meta, handle)
+    _prune(directory, current_app.config.get("PROFILE_KEEP", 50))
+    return profile.id
+
+
+def _prune(directory: str, keep: int) -> None:
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    for name in names[: max(0, len(names) - keep)]:
+        for suffix in (".json", ".folded"):
+            path = os.path.join(directory, name[: -len(".json")] + suffix)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles(directory: str, *, limit: int = 50) -> list[dict]:
+    """Metadata of the newest profiles in ``directory``, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted((name for name in os.listdir(directory) if name.endswith(".json")), reverse=True)
+    profiles = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as handle:
+                profiles.append(json.load(handle))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _active and has_request_context() and "profile" in g:
+        conn.info["profile_query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop("profile_query_started", None)
+    if started is not None and has_request_context() and "profile" in g:
+        g.profile.sql_seconds += time.perf_counter() - started
+        g.profile.sql_count += 1
+
+
+def init_app(app: Flask) -> None:
+    """Register the request hooks and SQL timers (no-op when PROFILER_ENABLED is off)."""
+    if not app.config.get("PROFILER_ENABLED", True):
+        return
+
+    @app.before_request
+    def _maybe_profile() -> None:
+        _start()
+
+    @app.after_request
+    def _save_profile(response: Response) -> Response:
+        profile_id = _finish(response)
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(error: BaseException | None) -> None:
+        # after_request is skipped when a view raises; still save what was sampled.
+        if "profile" in g:
+            _finish(None, error)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+
+__all__ = ["init_app", "list_profiles"]
@@ -0,0 +1,194 @@
+"""Log slow SQL statements with the code that issued them.
+
+Every statement is timed from SQLAlchemy's cursor events. Those taking at
+least ``SLOW_QUERY_MS`` are written as one JSON object per line to
+``SLOW_QUERY_LOG`` (rotated by size, written off the request thread). Each
+entry has:
+
+- the SQL with literals and placeholders normalized to ``?``, plus a
+  fingerprint of it;
+- the shape of the bound parameters (types and sizes, never values);
+- the duration;
+- the innermost application frames on the stack, usually a repository
+  method and the service or view above it;
+- the Flask endpoint when inside a request.
+
+``flask slow-queries`` aggregates the file by fingerprint. The stack is only
+walked for statements over the threshold, so fast queries just pay for two
+``perf_counter`` calls.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+from app.utils.log_files import json_lines_logger, read_json_lines
+
+logger = logging.getLogger("chaoticnexus.slow_queries")
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Frames from these files are plumbing, not the code that wanted the query.
+# tracing.py is named by path: it imports this module, so it cannot be imported.
+_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(_APP_DIR, "repositories", "session.py"),
+    os.path.join(_APP_DIR, "utils", "tracing.py"),
+}
+_STACK_DEPTH = 5
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):[A-Za-z_]\w*|\$\d+")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholders and IN lists so equal queries compare equal."""
+    sql = _STRING.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _LIST.sub("(?, ...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql: str) -> str:
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:12]
+
+
+def _value_shape(value) -> str:
+    name = type(value).__name__
+    if isinstance(value, str | bytes | list | tuple | dict | set):
+        return f"{name}[{len(value)}]"
+    return name
+
+
+def parameter_shape(parameters, executemany: bool):
+    """Types and sizes of the bound values; the values themselves are never logged."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": parameter_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: _value_shape(value) for key, value in parameters.items()}
+    if isinstance(parameters, list | tuple):
+        return [_value_shape(value) for value in parameters]
+    return None
+
+
+def _call_site() -> list[str]:
+    """Innermost application frames, as ``path:line qualname``, innermost first."""
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < _STACK_DEPTH:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename not in _SKIP_FILES:
+            relative = os.path.relpath(filename, os.path.dirname(_APP_DIR))
+            frames.append(f"{relative}:{frame.f_lineno} {frame.f_code.co_qualname}")
+        frame = frame.f_back
+    return frames
+
+
+def _on_before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+def _on_after_execute(threshold_ms: float):
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed_ms = (time.perf_counter() - conn.info["slow_query_started"].pop()) * 1000
+        if elapsed_ms < threshold_ms:
+            return
+        normalized = normalize_sql(statement)
+        entry = {
+            "ts": datetime.now(UTC).isoformat(timespec="milliseconds"),
+            "ms": round(elapsed_ms, 2),
+            "fingerprint": fingerprint(normalized),
+            "sql": normalized[:4000],
+            "params": parameter_shape(parameters, executemany),
+            "stack": _call_site(),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "trace_id": g.get("trace_id") if has_request_context() else None,
+            "pid": os.getpid(),
+        }
+        logger.warning(json.dumps(entry, default=str))
+
+    return _after
+
+
+def _on_error(context) -> None:
+    stack = context.connection.info.get("slow_query_started") if context.connection else None
+    if stack:
+        stack.pop()
+
+
+def init_app(app: Flask) -> None:
+    """Time every statement on ``db.engine`` and log the slow ones."""
+    threshold_ms = app.config.get("SLOW_QUERY_MS", 0)
+    if threshold_ms <= 0:
+        return
+    json_lines_logger(
+        logger.name,
+        app.config["SLOW_QUERY_LOG"],
+        max_mb=app.config.get("SLOW_QUERY_LOG_MAX_MB", 10),
+        backups=app.config.get("SLOW_QUERY_LOG_BACKUPS", 5),
+    )
+    with app.app_context():
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", _on_before_execute)
+        event.listen(engine, "after_cursor_execute", _on_after_execute(threshold_ms))
+        event.listen(engine, "handle_error", _on_error)
+
+
+def read_entries(path: str, *, since: datetime | None = None) -> Iterator[dict]:
+    """Entries from ``path`` and its rotated backups, oldest file first."""
+    for entry in read_json_lines(path):
+        if since is None or datetime.fromisoformat(entry["ts"]) >= since:
+            yield entry
+
+
+def aggregate(entries, *, key: str = "fingerprint") -> list[dict]:
+    """Group entries by ``fingerprint``, ``caller`` or ``endpoint``, worst total first."""
+    groups: dict[str, dict] = {}
+    for entry in entries:
+        caller = entry["stack"][0] if entry.get("stack") else "?"
+        group_key = caller if key == "caller" else str(entry.get(key) or "-")
+        group = groups.setdefault(
+            group_key,
+            {
+                "key": group_key,
+                "sql": entry["sql"],
+                "durations": [],
+                "callers": {},
+                "endpoints": {},
+            },
+        )
+        group["durations"].append(entry["ms"])
+        group["callers"][caller] = group["callers"].get(caller, 0) + 1
+        endpoint = entry.get("endpoint") or "-"
+        group["endpoints"][endpoint] = group["endpoints"].get(endpoint, 0) + 1
+    results = []
+    for group in groups.values():
+        durations = sorted(group.pop("durations"))
+        group.update(
+            count=len(durations),
+            total_ms=sum(durations),
+            max_ms=durations[-1],
+            p95_ms=durations[min(len(durations) - 1, int(len(durations) * 0.95))],
+        )
+        results.append(group)
+    results.sort(key=lambda group: group["total_ms"], reverse=True)
+    return results
+
+
+__all__ = ["aggregate", "fingerprint", "init_app", "normalize_sql", "read_entries"]
@@ -0,0 +1,518 @@
+"""Lightweight request tracing with nested spans, exported as OTLP/JSON.
+
+Every request gets a trace ID, taken from an incoming W3C ``traceparent``
+header or generated, and returned in ``X-Trace-Id``. The ID also appears in
+the access log, the slow query log and the application log lines. A sampled
+request records spans:
+
+- the request itself;
+- the view function (``view jobs.detail``);
+- public methods of the ``*_service`` and ``*_repo`` singletons
+  (``job_repo.list_time_logs``);
+- template renders;
+- SQL statements.
+
+A request is sampled when an admin adds ``?__trace=1`` (or an ``X-Trace``
+header), or at random with probability ``TRACE_SAMPLE_RATE``. The sampled flag
+of an incoming ``traceparent`` is only honored with ``TRACE_TRUST_TRACEPARENT``
+(set it when a trusted proxy or collector owns that header); otherwise just its
+trace ID is kept, for log correlation. Use :func:`span` or :func:`traced` for finer detail.
+Outside a sampled request both cost one context variable lookup.
+
+Finished traces are appended to ``TRACE_FILE``, one OTLP/JSON
+``ExportTraceServiceRequest`` per line. The OpenTelemetry Collector's
+``otlpjsonfile`` receiver reads that file. When ``TRACE_OTLP_ENDPOINT`` is set
+the same body is also POSTed there (``http://collector:4318/v1/traces``).
+``flask traces`` prints the slowest traces as trees, with repeated calls
+grouped.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import time
+import urllib.request
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    current_app,
+    g,
+    has_request_context,
+    request,
+    session,
+    template_rendered,
+)
+from flask.logging import default_handler
+from sqlalchemy import event
+
+from app.extensions import db
+from app.utils.log_files import background_handler, json_lines_logger, read_json_lines
+from app.utils.slow_queries import normalize_sql
+
+exporter = logging.getLogger("chaoticnexus.traces")
+_log = logging.getLogger("chaoticnexus.tracing")
+
+FLAG_ARG = "__trace"
+FLAG_HEADER = "X-Trace"
+TRACE_ID_HEADER = "X-Trace-Id"
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+_STATUS_ERROR = 2
+_TRACEPARENT = re.compile(r"00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+_INSTRUMENTED_PACKAGES = ("app.services.", "app.repositories.")
+
+_current: ContextVar[Span | None] = ContextVar("chaoticnexus_span", default=None)
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans", "max_spans", "dropped")
+
+    def __init__(self, trace_id: str, max_spans: int) -> None:
+        self.trace_id = trace_id
+        self.spans: list[Span] = []
+        self.max_spans = max_spans
+        self.dropped = 0
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent",
+        "parent_id",
+        "name",
+        "kind",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parent: Span | None,
+        *,
+        kind: int = KIND_INTERNAL,
+        attributes: dict | None = None,
+        parent_id: str | None = None,
+    ) -> None:
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.parent_id = parent.span_id if parent is not None else parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+        self._token = _current.set(self)
+        trace.spans.append(self)
+
+    def set(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+
+def current_trace_id() -> str | None:
+    """Trace ID of the running span or, unsampled, of the current request."""
+    current = _current.get()
+    if current is not None:
+        return current.trace.trace_id
+    return g.get("trace_id") if has_request_context() else None
+
+
+def start_trace(
+    name: str,
+    *,
+    trace_id: str | None = None,
+    parent_id: str | None = None,
+    kind: int = KIND_INTERNAL,
+    max_spans: int = 2000,
+    **attributes,
+) -> Span:
+    """Open the root span of a new trace in the current context."""
+    trace = Trace(trace_id or secrets.token_hex(16), max_spans)
+    return Span(trace, name, None, kind=kind, attributes=attributes, parent_id=parent_id)
+
+
+def start_span(name: str, *, kind: int = KIND_INTERNAL, **attributes) -> Span | None:
+    """Open a child of the current span; ``None`` when nothing is being traced."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    if len(parent.trace.spans) >= parent.trace.max_spans:
+        parent.trace.dropped += 1
+        return None
+    return Span(parent.trace, name, parent, kind=kind, attributes=attributes)
+
+
+def end_span(span: Span | None, error: BaseException | None = None) -> None:
+    if span is None or span.end_ns is not None:
+        return
+    span.end_ns = time.time_ns()
+    if error is not None:
+        span.error = f"{type(error).__name__}: {error}"
+    try:
+        _current.reset(span._token)
+    except (RuntimeError, ValueError):  # already reset, or ended from another context
+        _current.set(span.parent)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span | None]:
+    """Time the ``with`` block as a child span of the current one."""
+    current = start_span(name, **attributes)
+    error = None
+    try:
+        yield current
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        end_span(current, error)
+
+
+def traced(name: str | None = None) -> Callable:
+    """Decorator: run the function inside a span named ``name`` (default: its qualname)."""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        wrapper.__traced__ = True
+        return wrapper
+
+    return decorator
+
+
+def instrument(obj, prefix: str) -> int:
+    """Trace the public methods of ``obj`` as ``prefix.method``; returns how many.
+
+    Methods are wrapped on the instance, so every caller holding the
+    singleton sees them, including calls through ``self``.
+    """
+    if not hasattr(obj, "__dict__"):
+        return 0
+    wrapped = 0
+    for name in dir(type(obj)):
+        if name.startswith("_") or name in vars(obj):
+            continue
+        if inspect.isfunction(inspect.getattr_static(obj, name)):
+            setattr(obj, name, traced(f"{prefix}.{name}")(getattr(obj, name)))
+            wrapped += 1
+    return wrapped
+
+
+def _instrument_singletons() -> None:
+    seen: set[int] = set()
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith(_INSTRUMENTED_PACKAGES):
+            continue
+        for name, value in vars(module).items():
+            if not name.endswith(("_service", "_repo")) or id(value) in seen:
+                continue
+            if inspect.isclass(value) or inspect.ismodule(value) or callable(value):
+                continue
+            seen.add(id(value))
+            instrument(value, name)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def to_otlp(root: Span, service_name: str) -> dict:
+    """The trace as an OTLP/JSON ``ExportTraceServiceRequest``."""
+    trace = root.trace
+    if trace.dropped:
+        root.set("tracing.dropped_spans", trace.dropped)
+    spans = []
+    for item in trace.spans:
+        entry = {
+            "traceId": trace.trace_id,
+            "spanId": item.span_id,
+            "name": item.name,
+            "kind": item.kind,
+            "startTimeUnixNano": str(item.start_ns),
+            # Spans left open (a render that raised) end with the request.
+            "endTimeUnixNano": str(item.end_ns or root.end_ns),
+            "attributes": _otlp_attributes(item.attributes),
+        }
+        if item.parent_id:
+            entry["parentSpanId"] = item.parent_id
+        if item.error:
+            entry["status"] = {"code": _STATUS_ERROR, "message": item.error}
+        spans.append(entry)
+    resource = {"service.name": service_name, "process.pid": os.getpid()}
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otlp_attributes(resource)},
+                "scopeSpans": [{"scope": {"name": "chaoticnexus.tracing"}, "spans": spans}],
+            }
+        ]
+    }
+
+
+def finish_trace(root: Span, error: BaseException | None = None) -> None:
+    """End the root span and export the trace."""
+    end_span(root, error)
+    service_name = current_app.config.get("TRACE_SERVICE_NAME", "chaoticnexus")
+    exporter.info(json.dumps(to_otlp(root, service_name), default=str))
+
+
+class _OtlpHttpHandler(logging.Handler):
+    """POSTs each exported trace to an OTLP/HTTP collector (on the writer thread)."""
+
+    def __init__(self, endpoint: str, timeout: float = 2.0) -> None:
+        super().__init__()
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self._last_warning = 0.0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        body = record.getMessage().encode()
+        post = urllib.request.Request(
+            self.endpoint, data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(post, timeout=self.timeout):
+                pass
+        except OSError as exc:
+            if time.monotonic() - self._last_warning > 60:
+                self._last_warning = time.monotonic()
+                _log.warning("Trace export to %s failed: %s", self.endpoint, exc)
+
+
+class TraceIdFilter(logging.Filter):
+    """Adds ``trace_id`` to log records so formats can include it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id() or "-"
+        return True
+
+
+def _parse_traceparent(header: str) -> tuple[str | None, str | None, bool]:
+    match = _TRACEPARENT.fullmatch(header.strip())
+    if match is None or set(match.group(1)) == {"0"}:
+        return None, None, False
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def _begin_request() -> None:
+    trace_id, parent_id, sampled = _parse_traceparent(request.headers.get("traceparent", ""))
+    g.trace_id = trace_id or secrets.token_hex(16)
+    config = current_app.config
+    # Any client can send traceparent; only a trusted proxy's sampled flag counts.
+    sampled = sampled and config.get("TRACE_TRUST_TRACEPARENT", False)
+    forced = (FLAG_ARG in request.args or FLAG_HEADER in request.headers) and session.get(
+        "is_admin"
+    )
+    if not (sampled or forced or random.random() < config.get("TRACE_SAMPLE_RATE", 0.0)):
+        return
+    g.trace_root = start_trace(
+        f"{request.method} {request.endpoint or 'unmatched'}",
+        trace_id=g.trace_id,
+        parent_id=parent_id,
+        kind=KIND_SERVER,
+        max_spans=config.get("TRACE_MAX_SPANS", 2000),
+        **{"http.method": request.method, "http.target": request.full_path.rstrip("?")},
+    )
+
+
+def _template_started(sender, template, context, **extra) -> None:
+    current = start_span(f"render {template.name}")
+    if current is not None:
+        g.setdefault("trace_renders", []).append(current)
+
+
+def _template_finished(sender, template, context, **extra) -> None:
+    renders = g.get("trace_renders") if has_request_context() else None
+    if renders:
+        end_span(renders.pop())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is None:
+        return
+    sql = normalize_sql(statement)
+    current = start_span(
+        f"SQL {sql.split(' ', 1)[0].upper()}", kind=KIND_CLIENT, **{"db.statement": sql[:1000]}
+    )
+    if current is not None:
+        conn.info.setdefault("trace_spans", []).append(current)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    spans = conn.info.get("trace_spans")
+    if spans and spans[-1] is _current.get():
+        end_span(spans.pop())
+
+
+def _on_error(context) -> None:
+    spans = context.connection.info.get("trace_spans") if context.connection else None
+    if spans:
+        end_span(spans.pop(), context.original_exception)
+
+
+def _install_log_filter() -> None:
+    if any(isinstance(item, TraceIdFilter) for item in default_handler.filters):
+        return
+    default_handler.addFilter(TraceIdFilter())
+    default_handler.setFormatter(
+        logging.Formatter("[%(asctime)s] %(levelname)s in %(module)s [%(trace_id)s]: %(message)s")
+    )
+
+
+def init_app(app: Flask) -> None:
+    """Install request, view, service, template and SQL spans (off when TRACING_ENABLED is false).
+
+    Call after every blueprint and route is registered, so their views are
+    wrapped.
+    """
+    if not app.config.get("TRACING_ENABLED", True):
+        return
+    json_lines_logger(
+        exporter.name,
+        app.config["TRACE_FILE"],
+        max_mb=app.config.get("TRACE_FILE_MAX_MB", 50),
+        backups=app.config.get("TRACE_FILE_BACKUPS", 5),
+    )
+    endpoint = app.config.get("TRACE_OTLP_ENDPOINT")
+    if endpoint:
+        exporter.addHandler(background_handler(_OtlpHttpHandler(endpoint)))
+    _install_log_filter()
+    _instrument_singletons()
+    for name, view in list(app.view_functions.items()):
+        if name != "static" and not getattr(view, "__traced__", False):
+            app.view_functions[name] = traced(f"view {name}")(view)
+
+    app.before_request(_begin_request)
+
+    @app.after_request
+    def _tag_response(response: Response) -> Response:
+        response.headers[TRACE_ID_HEADER] = g.get("trace_id", "")
+        root = g.get("trace_root")
+        if root is not None:
+            root.set("http.status_code", response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_request(error: BaseException | None) -> None:
+        root = g.pop("trace_root", None)
+        if root is not None:
+            finish_trace(root, error)
+
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(db.engine, "handle_error", _on_error)
+
+
+def read_traces(path: str, *, since: datetime | None = None) -> Iterator[list[dict]]:
+    """Spans of each exported trace in ``path`` (and backups), as plain dicts."""
+    since_ns = int(since.timestamp() * 1e9) if since else 0
+    for document in read_json_lines(path):
+        spans = [
+            {
+                "id": item["spanId"],
+                "parent": item.get("parentSpanId"),
+                "name": item["name"],
+                "start": int(item["startTimeUnixNano"]),
+                "ms": (int(item["endTimeUnixNano"]) - int(item["startTimeUnixNano"])) / 1e6,
+                "trace_id": item["traceId"],
+            }
+            for resource in document.get("resourceSpans", [])
+            for scope in resource.get("scopeSpans", [])
+            for item in scope.get("spans", [])
+        ]
+        if spans and spans[0]["start"] >= since_ns:
+            yield spans
+
+
+def render_tree(spans: list[dict], *, max_depth: int = 8) -> list[str]:
+    """Indented span tree; siblings with the same name are merged as ``Nx``."""
+    ids = {item["id"] for item in spans}
+    children: dict[str | None, list[dict]] = {}
+    for item in spans:
+        parent = item["parent"] if item["parent"] in ids else None
+        children.setdefault(parent, []).append(item)
+    lines: list[str] = []
+
+    def walk(level: list[dict], depth: int) -> None:
+        groups: dict[str, list[dict]] = {}
+        for item in level:
+            groups.setdefault(item["name"], []).append(item)
+        for name, group in sorted(
+            groups.items(), key=lambda entry: -sum(s["ms"] for s in entry[1])
+        ):
+            total = sum(item["ms"] for item in group)
+            count = f"{len(group)}x " if len(group) > 1 else ""
+            lines.append(f"{total:>10.1f} ms  {'  ' * depth}{count}{name}")
+            if depth + 1 < max_depth:
+                walk([child for item in group for child in children.get(item["id"], [])], depth + 1)
+
+    walk(children.get(None, []), 0)
+    return lines
+
+
+def trace_started_at(spans: list[dict]) -> datetime:
+    return datetime.fromtimestamp(spans[0]["start"] / 1e9, UTC)
+
+
+__all__ = [
+    "TraceIdFilter",
+    "current_trace_id",
+    "end_span",
+    "finish_trace",
+    "init_app",
+    "instrument",
+    "read_traces",
+    "render_tree",
+    "span",
+    "start_span",
+    "start_trace",
+    "to_otlp",
+    "trace_started_at",
+    "traced",
+]
@@ -0,0 +1,7 @@
+"""Endpoint benchmark suite for the Chaotic Nexus backend.
+
+Run with ``python -m benchmarks --help`` from the repository root. The suite
+boots ``create_app("testing")`` against ``TEST_DATABASE_URL``, seeds a
+deterministic dataset at one or more scales and drives the hot endpoints
+through the Flask test client.
+"""
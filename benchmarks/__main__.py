@@ -0,0 +1,5 @@
+"""Allow ``python -m benchmarks`` to run the suite."""
+
+from .run import main
+
+raise SystemExit(main())
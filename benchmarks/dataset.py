@@ -0,0 +1,349 @@
+"""Deterministic dataset generator used by the benchmark suite.
+
+Rows are bulk inserted through SQLAlchemy Core so that seeding even the
+largest scale takes seconds rather than minutes. The same ``seed`` always
+produces the same dataset, which keeps results comparable between runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models import (
+    Blob,
+    Customer,
+    CustomerAccount,
+    InventoryLog,
+    Job,
+    JobPhoto,
+    JobPowder,
+    Powder,
+    PowderUsage,
+    SprayBatch,
+    SprayBatchJob,
+    TimeLog,
+)
+from app.models.blob import blob_path
+from app.utils.color import hex_to_lab
+
+_MANUFACTURERS = ["Tiger Drylac", "Prismatic Powders", "Axalta", "Cardinal", "Sherwin-Williams"]
+_FAMILIES = ["Black", "White", "Grey", "Red", "Blue", "Green", "Bronze", "Silver", "Yellow"]
+_FINISHES = ["Gloss", "Satin", "Matte", "Texture", "Illusion", "Metallic"]
+_DEPARTMENTS = ["intake", "prep", "coating", "qa", "completed"]
+_STATUSES = ["Intake", "Not Started", "In Progress", "Pending Approval", "Ready for Pickup"]
+_PRIORITIES = ["Critical", "High", "Normal", "Low"]
+_WORDS = (
+    "railing gate bracket frame panel housing chassis wheel bumper fence "
+    "balcony bench table chair shelf stair post cap plate rack"
+).split()
+
+
+@dataclass(frozen=True)
+class DatasetScale:
+    """Row counts for one dataset scale (``factor`` multiplies the base sizes)."""
+
+    factor: int
+
+    @property
+    def customers(self) -> int:
+        return 20 * self.factor
+
+    @property
+    def accounts(self) -> int:
+        return 10 * self.factor
+
+    @property
+    def powders(self) -> int:
+        return 50 * self.factor
+
+    @property
+    def jobs(self) -> int:
+        return 200 * self.factor
+
+    @property
+    def batches(self) -> int:
+        return 5 * self.factor
+
+
+@dataclass(frozen=True)
+class SeededIds:
+    """Identifiers the endpoint specs need to build URLs."""
+
+    job_id: int
+    account_id: int
+    batch_id: int
+    customer_id: int
+    powder_id: int
+    powder_color: str
+    photo_id: int
+    blob_id: int
+    blob_sha256: str
+    search_term: str
+
+
+def _rendition_path(sha256: str, name: str) -> str:
+    """Where the derivative worker writes rendition ``name`` of a blob."""
+    return f"{blob_path(sha256).rsplit('/', 1)[0]}/derived/{sha256}.{name}.webp"
+
+
+def reset_schema() -> None:
+    """Drop and recreate every table from the model metadata."""
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+
+
+def seed(scale: DatasetScale, *, seed: int = 1337) -> SeededIds:
+    """Populate the bound database with a synthetic shop at ``scale``."""
+    rng = random.Random(seed)
+    now = datetime.now(UTC)
+    session = db.session
+
+    session.execute(
+        insert(Customer.__table__),
+        [
+            {
+                "company": f"Customer {i:05d} {rng.choice(_WORDS).title()} Works",
+                "contact_name": f"Contact {i}",
+                "phone": f"555-{i:04d}",
+                "email": f"office{i}@customer{i}.example",
+                "status": "Active",
+                "notes": "Synthetic benchmark customer. " * 4,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(scale.customers)
+        ],
+    )
+    customers = session.execute(select(Customer.id, Customer.company).order_by(Customer.id)).all()
+
+    session.execute(
+        insert(CustomerAccount.__table__),
+        [
+            {
+                "email": f"portal{i}@customer{i}.example",
+                "password_hash": "benchmark",
+                "first_name": "Portal",
+                "last_name": f"User {i}",
+                "customer_id": customers[i % len(customers)].id,
+                "is_active": True,
+                "email_verified": True,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(scale.accounts)
+        ],
+    )
+    account_ids = session.execute(select(CustomerAccount.id).order_by(CustomerAccount.id)).scalars()
+    account_ids = list(account_ids)
+
+    powder_hexes = [f"#{rng.randrange(0x1000000):06X}" for _ in range(scale.powders)]
+    powder_labs = [hex_to_lab(value) for value in powder_hexes]
+    session.execute(
+        insert(Powder.__table__),
+        [
+            {
+                "powder_color": f"{rng.choice(_FAMILIES)} {rng.choice(_WORDS).title()} {i:05d}",
+                "manufacturer": rng.choice(_MANUFACTURERS),
+                "product_code": f"PC-{i:05d}",
+                "additional_code": powder_hexes[i],
+                "lab_l": powder_labs[i][0],
+                "lab_a": powder_labs[i][1],
+                "lab_b": powder_labs[i][2],
+                "lab_source": "hex",
+                "finish": rng.choice(_FINISHES),
+                "color_family": rng.choice(_FAMILIES),
+                "aliases": f"alias-{i}, code {i:05d}",
+                "on_hand_kg": round(rng.uniform(0, 40), 2),
+                "in_stock": round(rng.uniform(0, 40), 2),
+                "notes": "Synthetic benchmark powder. " * 6,
+                "additional_info": "Cure 10 min @ 200C. " * 4,
+                "cure_schedule": "10 min @ 200C",
+                "sds_url": f"https://example.invalid/sds/{i}.pdf",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(scale.powders)
+        ],
+    )
+    powders = session.execute(select(Powder.id, Powder.powder_color).order_by(Powder.id)).all()
+
+    job_rows = []
+    for i in range(scale.jobs):
+        customer = customers[rng.randrange(len(customers))]
+        created = now - timedelta(days=rng.uniform(0, 365))
+        department = rng.choice(_DEPARTMENTS)
+        completed = department == "completed"
+        job_rows.append(
+            {
+                "company": customer.company,
+                "customer_id": customer.id,
+                "customer_account_id": account_ids[i % len(account_ids)] if i % 3 == 0 else None,
+                "contact_name": f"Contact {i}",
+                "description": " ".join(rng.choice(_WORDS) for _ in range(12)),
+                "notes": "Synthetic job notes. " * 8,
+                "shop_notes": "Shop floor notes. " * 4,
+                "customer_notes": "Customer notes. " * 4,
+                "work_order_json": {"lines": [{"qty": n, "item": "part"} for n in range(5)]},
+                "status": "Completed" if completed else rng.choice(_STATUSES),
+                "department": department,
+                "priority": rng.choice(_PRIORITIES),
+                "color": powders[rng.randrange(len(powders))].powder_color,
+                "date_in": created.date(),
+                "due_by": (created + timedelta(days=rng.randint(3, 21))).date(),
+                "completed_at": created + timedelta(days=2) if completed else None,
+                "archived": rng.random() < 0.1,
+                "on_screen": rng.random() < 0.05,
+                "submitted_by_customer": False,
+                "requires_approval": False,
+                "created_at": created,
+                "updated_at": created,
+            }
+        )
+    session.execute(insert(Job.__table__), job_rows)
+    job_ids = list(session.execute(select(Job.id).order_by(Job.id)).scalars())
+
+    # One stored upload per job, each with built renditions.
+    digests = {
+        job_id: hashlib.sha256(f"bench-photo-{job_id}".encode()).hexdigest() for job_id in job_ids
+    }
+    session.execute(
+        insert(Blob.__table__),
+        [
+            {
+                "sha256": sha256,
+                "size": 250_000,
+                "content_type": "image/jpeg",
+                "ref_count": 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for sha256 in digests.values()
+        ],
+    )
+    blob_ids = {
+        sha256: blob_id for sha256, blob_id in session.execute(select(Blob.sha256, Blob.id))
+    }
+
+    time_logs, usage, photos, job_powders = [], [], [], []
+    for job_id in job_ids:
+        for n in range(3):
+            start = now - timedelta(hours=rng.uniform(1, 500))
+            time_logs.append(
+                {
+                    "job_id": job_id,
+                    "department": _DEPARTMENTS[n],
+                    "start_ts": start,
+                    "end_ts": start + timedelta(minutes=30),
+                    "minutes": rng.randint(5, 120),
+                    "created_at": start,
+                    "updated_at": start,
+                }
+            )
+        powder_id = powders[rng.randrange(len(powders))].id
+        usage.append(
+            {
+                "job_id": job_id,
+                "powder_id": powder_id,
+                "amount_used": round(rng.uniform(0.2, 6), 2),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        job_powders.append(
+            {
+                "job_id": job_id,
+                "powder_id": powder_id,
+                "quantity_used": round(rng.uniform(0.2, 6), 2),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        photos.append(
+            {
+                "job_id": job_id,
+                "filename": blob_path(digests[job_id]),
+                "original_name": "photo.jpg",
+                "blob_id": blob_ids[digests[job_id]],
+                "derivatives": {
+                    name: {"path": _rendition_path(digests[job_id], name), "width": w, "height": w}
+                    for name, w in (("thumb", 320), ("medium", 1280))
+                },
+                "derivatives_status": "ready",
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    session.execute(insert(TimeLog.__table__), time_logs)
+    session.execute(insert(PowderUsage.__table__), usage)
+    session.execute(insert(JobPowder.__table__), job_powders)
+    session.execute(insert(JobPhoto.__table__), photos)
+    photo_ids = list(session.execute(select(JobPhoto.id).order_by(JobPhoto.id)).scalars())
+
+    session.execute(
+        insert(InventoryLog.__table__),
+        [
+            {
+                "powder_id": powder.id,
+                "change_type": "manual_update",
+                "old_value": 10,
+                "new_value": 9,
+                "created_by": "benchmark",
+                "created_at": now - timedelta(days=n),
+                "updated_at": now,
+            }
+            for powder in powders
+            for n in range(4)
+        ],
+    )
+
+    session.execute(
+        insert(SprayBatch.__table__),
+        [
+            {
+                "powder_id": powders[rng.randrange(len(powders))].id,
+                "role": "primary",
+                "operator": "bench",
+                "started_at": now - timedelta(hours=n + 1),
+                "ended_at": None if n % 2 == 0 else now - timedelta(hours=n),
+                "start_weight_kg": 20,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for n in range(scale.batches)
+        ],
+    )
+    batch_ids = list(session.execute(select(SprayBatch.id).order_by(SprayBatch.id)).scalars())
+    session.execute(
+        insert(SprayBatchJob.__table__),
+        [
+            {
+                "batch_id": batch_id,
+                "job_id": job_id,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for batch_id in batch_ids
+            for job_id in rng.sample(job_ids, 4)
+        ],
+    )
+    session.commit()
+
+    return SeededIds(
+        job_id=job_ids[len(job_ids) // 2],
+        account_id=account_ids[0],
+        batch_id=batch_ids[0],
+        customer_id=customers[len(customers) // 2].id,
+        powder_id=powders[len(powders) // 2].id,
+        powder_color=powders[len(powders) // 2].powder_color,
+        photo_id=photo_ids[len(photo_ids) // 2],
+        blob_id=blob_ids[digests[job_ids[len(job_ids) // 2]]],
+        blob_sha256=digests[job_ids[len(job_ids) // 2]],
+        search_term="Works",
+    )
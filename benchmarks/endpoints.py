@@ -0,0 +1,54 @@
+"""Hot endpoints exercised by the benchmark suite."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from .dataset import SeededIds
+
+
+@dataclass(frozen=True)
+class EndpointSpec:
+    """One benchmarked request, addressed by Flask endpoint name."""
+
+    name: str
+    endpoint: str
+    values: Callable[[SeededIds], dict] = field(default=lambda ids: {})
+    customer_session: bool = False
+
+
+ENDPOINTS: list[EndpointSpec] = [
+    EndpointSpec("jobs.index", "jobs.index"),
+    EndpointSpec("jobs.kanban", "jobs.kanban"),
+    EndpointSpec("jobs.detail", "jobs.detail", lambda ids: {"job_id": ids.job_id}),
+    EndpointSpec("jobs.worksheet", "jobs.worksheet", lambda ids: {"job_id": ids.job_id}),
+    EndpointSpec("inventory.api_powders", "inventory.api_powders"),
+    EndpointSpec(
+        "customers.search_json", "customers.search_json", lambda ids: {"q": ids.search_term}
+    ),
+    EndpointSpec("customer_portal.dashboard", "customer_portal.dashboard", customer_session=True),
+    EndpointSpec(
+        "sprayer.batch_detail", "sprayer.batch_detail", lambda ids: {"batch_id": ids.batch_id}
+    ),
+    EndpointSpec("sprayer.candidates_json", "sprayer.candidates_json"),
+    EndpointSpec("sprayer.hitlist_json", "sprayer.hitlist_json"),
+    EndpointSpec("jobs.export_csv", "jobs.export_csv"),
+    EndpointSpec("powders.csv", "legacy_powders_csv_top"),
+    EndpointSpec("powders.colors_full_json", "powders.colors_full_json"),
+    EndpointSpec("powders.match_json", "powders.match_json", lambda ids: {"ral": "7016"}),
+    EndpointSpec(
+        "powders.suggest_json", "powders.suggest_json", lambda ids: {"q": ids.powder_color[:3]}
+    ),
+]
+
+
+def select_endpoints(names: list[str] | None) -> list[EndpointSpec]:
+    """Return the specs matching ``names`` (all of them when empty)."""
+    if not names:
+        return list(ENDPOINTS)
+    wanted = set(names)
+    unknown = wanted - {spec.name for spec in ENDPOINTS}
+    if unknown:
+        raise ValueError(f"Unknown endpoint(s): {', '.join(sorted(unknown))}")
+    return [spec for spec in ENDPOINTS if spec.name in wanted]
@@ -0,0 +1,388 @@
+"""EXPLAIN-plan capture and plan regression checks for repository queries.
+
+Seeds the benchmark dataset, calls every read method on the repositories in
+``app/repositories`` and re-runs each SQL statement they issue under
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)``. Plans are stored per method and
+the report flags:
+
+* ``seq_scan``       sequential scans on tables above ``--large-table-rows``
+* ``sort_spill``     sorts that spilled to disk
+* ``estimate_miss``  nodes whose actual rows differ from the estimate by more
+                     than ``--estimate-factor``
+
+Every finding carries the repository method and the source line that issued
+the statement. Findings listed in the allowlist are reported but do not fail
+the run; anything new exits with status 1::
+
+    python -m benchmarks.explain --scale 25
+    python -m benchmarks.explain --scale 25 --update-allowlist
+
+Only PostgreSQL is supported, since the plans come from its planner.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+import traceback
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import event, text
+
+from app import create_app
+from app.extensions import db
+
+from .dataset import DatasetScale, SeededIds, reset_schema, seed
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(_HERE, "results", "plans")
+DEFAULT_ALLOWLIST = os.path.join(_HERE, "explain_allowlist.json")
+_REPO_DIR = os.path.join("app", "repositories")
+
+# Sample keyword arguments per read method. Methods without an entry are run
+# with no arguments when their signature allows it, otherwise reported as
+# uncovered so new query methods do not slip through silently.
+SAMPLE_ARGS: dict[str, Callable[[SeededIds], list[dict]]] = {
+    "BlobRepository.get_by_sha256": lambda ids: [{"sha256": ids.blob_sha256}],
+    "CustomerRepository.get_customer": lambda ids: [{"customer_id": ids.customer_id}],
+    "CustomerRepository.search_customers": lambda ids: [{"query": ids.search_term}],
+    "CustomerRepository.search_customer_rows": lambda ids: [{"query": ids.search_term}],
+    "CustomerRepository.list_accounts": lambda ids: [{}, {"customer_id": ids.customer_id}],
+    "CustomerRepository.list_contacts": lambda ids: [{"customer_id": ids.customer_id}],
+    "InventoryRepository.list_powders_with_inventory": lambda ids: [{}, {"search": "Black"}],
+    "InventoryRepository.get_powder": lambda ids: [{"powder_id": ids.powder_id}],
+    "InventoryRepository.list_recent_inventory_logs": lambda ids: [{"powder_id": ids.powder_id}],
+    "JobRepository.list_jobs": lambda ids: [{}, {"query": "railing"}],
+    "JobRepository.get_job": lambda ids: [{"job_id": ids.job_id}],
+    "JobRepository.get_job_detail": lambda ids: [{"job_id": ids.job_id}],
+    "JobRepository.list_time_logs": lambda ids: [{"job_id": ids.job_id}],
+    "JobRepository.list_powder_usage": lambda ids: [{"job_id": ids.job_id}],
+    "JobRepository.list_photos": lambda ids: [{"job_id": ids.job_id}],
+    "JobRepository.get_photo": lambda ids: [{"photo_id": ids.photo_id}],
+    "JobRepository.find_blob_derivatives": lambda ids: [{"blob_id": ids.blob_id}],
+    "PowderRepository.list_powders": lambda ids: [{}, {"query": "Black"}],
+    "PowderRepository.get_powder": lambda ids: [{"powder_id": ids.powder_id}],
+    "PowderRepository.find_by_color_name": lambda ids: [{"color_name": ids.powder_color}],
+    "PrintTemplateRepository.list_by_type": lambda ids: [{"template_type": "work_order"}],
+    "PrintTemplateRepository.list_all": lambda ids: [{"template_type": "work_order"}],
+    "PrintTemplateRepository.list_rows_by_type": lambda ids: [{"template_type": "work_order"}],
+    "SettingsRepository.get_setting": lambda ids: [{"name": "company_name"}],
+    "SprayerRepository.get_batch": lambda ids: [{"batch_id": ids.batch_id}],
+    "SprayerRepository.list_batch_jobs": lambda ids: [{"batch_id": ids.batch_id}],
+}
+
+_READ_PREFIXES = ("list_", "get_", "find_", "search_", "count_", "load_")
+
+
+@dataclass
+class CapturedStatement:
+    statement: str
+    parameters: object
+    call_site: str
+
+
+@dataclass
+class Finding:
+    method: str
+    call_site: str
+    kind: str
+    relation: str | None
+    detail: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.method}|{self.kind}|{self.relation or '-'}"
+
+
+@dataclass
+class MethodReport:
+    method: str
+    calls: list[dict] = field(default_factory=list)
+    findings: list[Finding] = field(default_factory=list)
+
+
+def _call_site() -> str:
+    """Return ``path:line in func`` for the innermost repository frame."""
+    for frame in reversed(traceback.extract_stack()):
+        normalized = frame.filename.replace("\\", "/")
+        if f"/{_REPO_DIR}/" in normalized and not normalized.endswith("/session.py"):
+            rel = normalized[normalized.index(_REPO_DIR) :]
+            return f"{rel}:{frame.lineno} in {frame.name}"
+    return "<unknown>"
+
+
+def discover_read_methods() -> list[tuple[str, Callable]]:
+    """Return ``(Class.method, bound method)`` for every repository read method."""
+    import app.repositories as package
+
+    found: list[tuple[str, Callable]] = []
+    for module_name in sorted(os.listdir(os.path.dirname(package.__file__))):
+        if not module_name.endswith(".py") or module_name.startswith("_"):
+            continue
+        module = importlib.import_module(f"app.repositories.{module_name[:-3]}")
+        for _, obj in inspect.getmembers(module, inspect.isclass):
+            if obj.__module__ != module.__name__ or not obj.__name__.endswith("Repository"):
+                continue
+            instance = obj()
+            for name, _ in inspect.getmembers(obj, inspect.isfunction):
+                if name.startswith(_READ_PREFIXES):
+                    found.append((f"{obj.__name__}.{name}", getattr(instance, name)))
+    return found
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []) or []:
+        yield from _walk(child)
+
+
+def analyse_plan(
+    plan: dict,
+    *,
+    method: str,
+    call_site: str,
+    table_rows: dict[str, float],
+    large_table_rows: int,
+    estimate_factor: float,
+) -> list[Finding]:
+    findings: list[Finding] = []
+    for node in _walk(plan["Plan"]):
+        relation = node.get("Relation Name")
+        node_type = node.get("Node Type", "")
+        if node_type == "Seq Scan" and table_rows.get(relation or "", 0) >= large_table_rows:
+            findings.append(
+                Finding(
+                    method,
+                    call_site,
+                    "seq_scan",
+                    relation,
+                    f"Seq Scan on {relation} (~{int(table_rows[relation])} rows)"
+                    + (f" filter: {node['Filter']}" if node.get("Filter") else ""),
+                )
+            )
+        if node_type == "Sort" and (
+            node.get("Sort Space Type") == "Disk" or "external" in node.get("Sort Method", "")
+        ):
+            findings.append(
+                Finding(
+                    method,
+                    call_site,
+                    "sort_spill",
+                    relation,
+                    f"{node.get('Sort Method')} using {node.get('Sort Space Used')}kB on disk",
+                )
+            )
+        planned = float(node.get("Plan Rows") or 0)
+        actual = float(node.get("Actual Rows") or 0)
+        if node.get("Actual Loops"):
+            worst, best = max(planned, actual), max(min(planned, actual), 1.0)
+            if worst >= 100 and worst / best > estimate_factor:
+                findings.append(
+                    Finding(
+                        method,
+                        call_site,
+                        "estimate_miss",
+                        relation,
+                        f"{node_type}: planned {int(planned)} rows, actual {int(actual)}",
+                    )
+                )
+    return findings
+
+
+def _table_rows() -> dict[str, float]:
+    rows = db.session.execute(
+        text(
+            "SELECT relname, reltuples FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"
+        )
+    ).all()
+    return {name: float(count) for name, count in rows}
+
+
+def explain_method(name: str, method: Callable, kwargs: dict) -> tuple[list[dict], list]:
+    """Run ``method(**kwargs)`` and EXPLAIN every statement it issued."""
+    captured: list[CapturedStatement] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        captured.append(CapturedStatement(statement, parameters, _call_site()))
+
+    engine = db.engine
+    db.session.remove()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        method(**kwargs)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+        db.session.remove()
+
+    plans: list[dict] = []
+    with engine.connect() as conn:
+        for item in captured:
+            result = conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + item.statement, item.parameters
+            )
+            raw = result.scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            plans.append(
+                {
+                    "method": name,
+                    "kwargs": kwargs,
+                    "call_site": item.call_site,
+                    "statement": item.statement,
+                    "plan": plan,
+                }
+            )
+        conn.rollback()
+    return plans, captured
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.explain", description=__doc__)
+    parser.add_argument("--scale", type=int, default=25)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Directory for plans/report.")
+    parser.add_argument("--allowlist", default=DEFAULT_ALLOWLIST)
+    parser.add_argument("--update-allowlist", action="store_true")
+    parser.add_argument("--large-table-rows", type=int, default=1000)
+    parser.add_argument("--estimate-factor", type=float, default=10.0)
+    parser.add_argument("--skip-seed", action="store_true", help="Reuse the existing dataset.")
+    parser.add_argument("--allow-non-test-db", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    app = create_app("testing")
+    with app.app_context():
+        if db.engine.dialect.name != "postgresql":
+            print("EXPLAIN capture requires PostgreSQL.", file=sys.stderr)
+            return 2
+        database = db.engine.url.database or ""
+        if "test" not in database and not args.allow_non_test_db and not args.skip_seed:
+            print(f"Refusing to reset database {database!r}.", file=sys.stderr)
+            return 2
+
+        if args.skip_seed:
+            ids = _existing_ids()
+        else:
+            reset_schema()
+            ids = seed(DatasetScale(args.scale))
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+        table_rows = _table_rows()
+
+        reports: list[MethodReport] = []
+        uncovered: list[str] = []
+        os.makedirs(args.output, exist_ok=True)
+        for name, method in discover_read_methods():
+            sampler = SAMPLE_ARGS.get(name)
+            if sampler is None:
+                required = [
+                    p
+                    for p in inspect.signature(method).parameters.values()
+                    if p.default is inspect.Parameter.empty
+                    and p.kind not in (p.VAR_KEYWORD, p.VAR_POSITIONAL)
+                ]
+                if required:
+                    uncovered.append(name)
+                    continue
+                arg_sets = [{}]
+            else:
+                arg_sets = sampler(ids)
+
+            report = MethodReport(method=name)
+            for index, kwargs in enumerate(arg_sets):
+                plans, _ = explain_method(name, method, kwargs)
+                for n, entry in enumerate(plans):
+                    report.findings.extend(
+                        analyse_plan(
+                            entry["plan"],
+                            method=name,
+                            call_site=entry["call_site"],
+                            table_rows=table_rows,
+                            large_table_rows=args.large_table_rows,
+                            estimate_factor=args.estimate_factor,
+                        )
+                    )
+                    report.calls.append(
+                        {
+                            "kwargs": kwargs,
+                            "call_site": entry["call_site"],
+                            "execution_ms": entry["plan"].get("Execution Time"),
+                            "plan_file": f"{name}.{index}.{n}.json",
+                        }
+                    )
+                    with open(
+                        os.path.join(args.output, f"{name}.{index}.{n}.json"), "w", encoding="utf-8"
+                    ) as handle:
+                        json.dump(entry, handle, indent=2, default=str)
+            reports.append(report)
+
+    findings = [finding for report in reports for finding in report.findings]
+    allowed = _load_allowlist(args.allowlist)
+    new = [f for f in findings if f.key not in allowed]
+
+    summary = {
+        "scale": args.scale,
+        "methods": [
+            {"method": r.method, "calls": r.calls, "findings": [asdict(f) for f in r.findings]}
+            for r in reports
+        ],
+        "uncovered_methods": uncovered,
+        "new_findings": [asdict(f) for f in new],
+    }
+    with open(os.path.join(args.output, "report.json"), "w", encoding="utf-8") as handle:
+        json.dump(summary, handle, indent=2, default=str)
+
+    for finding in findings:
+        marker = "NEW " if finding in new else "    "
+        print(f"{marker}{finding.kind:<14}{finding.method:<48}{finding.call_site}")
+        print(f"      {finding.detail}")
+    for name in uncovered:
+        print(f"UNCOVERED {name}: add sample arguments to SAMPLE_ARGS")
+    print(f"Plans and report written to {args.output}")
+
+    if args.update_allowlist:
+        with open(args.allowlist, "w", encoding="utf-8") as handle:
+            json.dump(sorted({f.key for f in findings}), handle, indent=2)
+            handle.write("\n")
+        print(f"Allowlist updated at {args.allowlist}")
+        return 0
+    return 1 if new or uncovered else 0
+
+
+def _load_allowlist(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as handle:
+        return set(json.load(handle))
+
+
+def _existing_ids() -> SeededIds:
+    """Pick representative identifiers from an already seeded database."""
+
+    def first(sql: str):
+        return db.session.execute(text(sql)).scalar()
+
+    return SeededIds(
+        job_id=first("SELECT min(id) FROM jobs"),
+        account_id=first("SELECT min(id) FROM customer_accounts"),
+        batch_id=first("SELECT min(id) FROM spray_batch"),
+        customer_id=first("SELECT min(id) FROM customers"),
+        powder_id=first("SELECT min(id) FROM powders"),
+        powder_color=first("SELECT powder_color FROM powders ORDER BY id LIMIT 1"),
+        photo_id=first("SELECT min(id) FROM job_photos"),
+        blob_id=first("SELECT min(id) FROM blobs"),
+        blob_sha256=first("SELECT sha256 FROM blobs ORDER BY id LIMIT 1"),
+        search_term="Works",
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
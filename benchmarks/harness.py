@@ -0,0 +1,118 @@
+"""Measurement primitives: latency percentiles, query counts and peak memory."""
+
+from __future__ import annotations
+
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class EndpointResult:
+    """Aggregated measurements for one endpoint at one dataset scale."""
+
+    status: int | None
+    bytes: int
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    peak_kib: float
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class QueryCounter:
+    """Count statements executed on an engine while attached."""
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self.count = 0
+
+    def _on_execute(self, *_args, **_kwargs) -> None:
+        self.count += 1
+
+    @contextmanager
+    def attached(self):
+        event.listen(self._engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self._engine, "before_cursor_execute", self._on_execute)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile (0-100) using linear interpolation."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def measure(
+    call: Callable[[], tuple[int, int]],
+    *,
+    engine: Engine,
+    iterations: int,
+    warmup: int,
+) -> EndpointResult:
+    """Time ``call`` repeatedly; ``call`` returns ``(status, body_bytes)``.
+
+    Query counts and peak memory come from dedicated passes so that neither
+    the event listener nor tracemalloc distorts the latency samples.
+    """
+    try:
+        for _ in range(warmup):
+            call()
+
+        counter = QueryCounter(engine)
+        with counter.attached():
+            status, size = call()
+
+        tracemalloc.start()
+        try:
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        samples: list[float] = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - started) * 1000.0)
+    except Exception as exc:  # noqa: BLE001 - record and keep benchmarking
+        return EndpointResult(
+            status=None,
+            bytes=0,
+            queries=0,
+            p50_ms=0.0,
+            p95_ms=0.0,
+            p99_ms=0.0,
+            mean_ms=0.0,
+            peak_kib=0.0,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    return EndpointResult(
+        status=status,
+        bytes=size,
+        queries=counter.count,
+        p50_ms=round(percentile(samples, 50), 3),
+        p95_ms=round(percentile(samples, 95), 3),
+        p99_ms=round(percentile(samples, 99), 3),
+        mean_ms=round(statistics.fmean(samples), 3),
+        peak_kib=round(peak / 1024.0, 1),
+    )
@@ -0,0 +1,128 @@
+"""add hot path indexes
+
+Revision ID: 7c4d2b9e1f30
+Revises: 3e8a7d1c5a10
+Create Date: 2026-10-19 09:00:00.000000
+
+Indexes are built ``CONCURRENTLY`` on PostgreSQL so the jobs board stays
+writable while they build. ``CREATE INDEX CONCURRENTLY`` cannot run inside a
+transaction, hence the autocommit block. A failed concurrent build leaves an
+INVALID index behind; ``IF NOT EXISTS`` would keep it, so each index is
+dropped first when it exists but is not valid.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7c4d2b9e1f30"
+down_revision = "3e8a7d1c5a10"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, unique, partial predicate)
+INDEXES: list[tuple[str, str, list[str], bool, str | None]] = [
+    ("ix_jobs_department", "jobs", ["department"], False, None),
+    ("ix_jobs_completed_at", "jobs", ["completed_at"], False, None),
+    ("ix_jobs_due_by", "jobs", ["due_by"], False, None),
+    (
+        "ix_jobs_customer_account_created",
+        "jobs",
+        ["customer_account_id", "created_at"],
+        False,
+        None,
+    ),
+    ("ix_jobs_on_screen_order", "jobs", ["screen_order_index"], False, "on_screen"),
+    (
+        "ix_jobs_active_department",
+        "jobs",
+        ["department", "id"],
+        False,
+        "NOT archived AND completed_at IS NULL",
+    ),
+    ("ix_inventory_log_powder_created", "inventory_log", ["powder_id", "created_at"], False, None),
+    ("ix_powder_usage_job_id", "powder_usage", ["job_id"], False, None),
+    ("ix_job_powders_job_id", "job_powders", ["job_id"], False, None),
+    ("ix_spray_batch_ended_at", "spray_batch", ["ended_at"], False, None),
+    (
+        "ix_customer_accounts_reset_token",
+        "customer_accounts",
+        ["reset_token"],
+        False,
+        "reset_token IS NOT NULL",
+    ),
+    ("uq_spray_batch_jobs_batch_job", "spray_batch_jobs", ["batch_id", "job_id"], True, None),
+]
+
+
+def _dedupe_spray_batch_jobs() -> None:
+    """Keep the oldest row per (batch_id, job_id) so the unique index can build."""
+    op.execute(
+        """
+        DELETE FROM spray_batch_jobs
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id,
+                       row_number() OVER (PARTITION BY batch_id, job_id ORDER BY id) AS rn
+                FROM spray_batch_jobs
+            ) ranked
+            WHERE rn > 1
+        )
+        """
+    )
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    is_postgres = conn.dialect.name == "postgresql"
+    inspector = sa.inspect(conn)
+    existing = {
+        table: {index["name"] for index in inspector.get_indexes(table)}
+        for table in {table for _, table, _, _, _ in INDEXES}
+    }
+
+    _dedupe_spray_batch_jobs()
+
+    if not is_postgres:
+        for name, table, columns, unique, _ in INDEXES:
+            if name not in existing[table]:
+                op.create_index(name, table, columns, unique=unique)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique, where in INDEXES:
+            op.execute(
+                f"""
+                DO $$ BEGIN
+                    IF EXISTS (
+                        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                        WHERE c.relname = '{name}' AND NOT i.indisvalid
+                    ) THEN
+                        EXECUTE 'DROP INDEX {name}';
+                    END IF;
+                END $$;
+                """
+            )
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        for name, table, _, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, _, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
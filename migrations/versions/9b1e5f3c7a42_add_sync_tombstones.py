@@ -0,0 +1,67 @@
+"""add sync tombstones and updated_at indexes
+
+Revision ID: 9b1e5f3c7a42
+Revises: 7c4d2b9e1f30
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b1e5f3c7a42"
+down_revision = "7c4d2b9e1f30"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+
+    if "sync_tombstones" not in inspector.get_table_names():
+        op.create_table(
+            "sync_tombstones",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("entity", sa.String(length=60), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column(
+                "deleted_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+        op.create_index(
+            "ix_sync_tombstones_entity_deleted", "sync_tombstones", ["entity", "deleted_at"]
+        )
+
+    indexes = {
+        ("jobs", "ix_jobs_updated_at"),
+        ("powders", "ix_powders_updated_at"),
+    }
+    if conn.dialect.name != "postgresql":
+        for table, name in sorted(indexes):
+            if name not in {index["name"] for index in inspector.get_indexes(table)}:
+                op.create_index(name, table, ["updated_at"])
+        return
+
+    with op.get_context().autocommit_block():
+        for table, name in sorted(indexes):
+            op.create_index(
+                name,
+                table,
+                ["updated_at"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_powders_updated_at", table_name="powders")
+    op.drop_index("ix_jobs_updated_at", table_name="jobs")
+    op.drop_index("ix_sync_tombstones_entity_deleted", table_name="sync_tombstones")
+    op.drop_table("sync_tombstones")
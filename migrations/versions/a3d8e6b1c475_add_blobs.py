@@ -0,0 +1,58 @@
+"""add content-addressed blobs for uploads
+
+Revision ID: a3d8e6b1c475
+Revises: f1a7d2c9b364
+Create Date: 2026-10-19 16:00:00.000000
+
+Existing per-job files are moved by ``flask migrate-uploads-to-blobs``.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "a3d8e6b1c475"
+down_revision = "f1a7d2c9b364"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "blobs" not in inspector.get_table_names():
+        op.create_table(
+            "blobs",
+            sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+            sa.Column("sha256", sa.String(length=64), nullable=False, unique=True),
+            sa.Column("size", sa.BigInteger(), nullable=False),
+            sa.Column("content_type", sa.String(length=120), nullable=True),
+            sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column(
+                "created_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+
+    existing = {column["name"] for column in inspector.get_columns("job_photos")}
+    if "blob_id" not in existing:
+        op.add_column(
+            "job_photos",
+            sa.Column("blob_id", sa.Integer(), sa.ForeignKey("blobs.id"), nullable=True),
+        )
+        op.create_index("ix_job_photos_blob_id", "job_photos", ["blob_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_photos_blob_id", table_name="job_photos")
+    op.drop_column("job_photos", "blob_id")
+    op.drop_table("blobs")
@@ -0,0 +1,64 @@
+"""add durable background task queue
+
+Revision ID: b6c1f4e9a203
+Revises: a3d8e6b1c475
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b6c1f4e9a203"
+down_revision = "a3d8e6b1c475"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "tasks" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="queued"),
+        sa.Column("priority", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "run_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False, server_default="5"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("locked_by", sa.String(length=120), nullable=True),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_tasks_claim",
+        "tasks",
+        [sa.text("priority DESC"), "run_at"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+    op.create_index("ix_tasks_status_finished", "tasks", ["status", "finished_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_status_finished", table_name="tasks")
+    op.drop_index("ix_tasks_claim", table_name="tasks")
+    op.drop_table("tasks")
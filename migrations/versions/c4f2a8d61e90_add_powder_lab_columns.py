@@ -0,0 +1,38 @@
+"""add CIELAB color columns to powders
+
+Revision ID: c4f2a8d61e90
+Revises: 9b1e5f3c7a42
+Create Date: 2026-10-19 12:00:00.000000
+
+Existing rows are filled by ``flask backfill-powder-lab``.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4f2a8d61e90"
+down_revision = "9b1e5f3c7a42"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("lab_l", sa.Float()),
+    ("lab_a", sa.Float()),
+    ("lab_b", sa.Float()),
+    ("lab_source", sa.String(length=20)),
+)
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("powders")}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column("powders", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(COLUMNS):
+        op.drop_column("powders", name)
@@ -0,0 +1,54 @@
+"""add scheduled job run state
+
+Revision ID: c8e2a5d7f914
+Revises: b6c1f4e9a203
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c8e2a5d7f914"
+down_revision = "b6c1f4e9a203"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "scheduled_jobs" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "scheduled_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False, unique=True),
+        sa.Column("schedule", sa.String(length=120), nullable=False),
+        sa.Column("next_run_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_duration_ms", sa.Float(), nullable=True),
+        sa.Column("last_status", sa.String(length=20), nullable=True),
+        sa.Column("last_result", sa.String(length=255), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("run_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failure_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_duration_ms", sa.Float(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduled_jobs")
@@ -0,0 +1,66 @@
+"""add notification outbox
+
+Revision ID: d4f7b2e8c615
+Revises: c8e2a5d7f914
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d4f7b2e8c615"
+down_revision = "c8e2a5d7f914"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if "notifications" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("recipient", sa.String(length=255), nullable=False),
+        sa.Column("coalesce_key", sa.String(length=120), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column(
+            "send_after",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_notifications_due",
+        "notifications",
+        ["send_after"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.create_index("ix_notifications_coalesce_key", "notifications", ["coalesce_key", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_coalesce_key", table_name="notifications")
+    op.drop_index("ix_notifications_due", table_name="notifications")
+    op.drop_table("notifications")
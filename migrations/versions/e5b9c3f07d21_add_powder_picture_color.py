@@ -0,0 +1,36 @@
+"""add dominant picture color columns to powders
+
+Revision ID: e5b9c3f07d21
+Revises: c4f2a8d61e90
+Create Date: 2026-10-19 13:00:00.000000
+
+Filled by ``flask extract-powder-colors``.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5b9c3f07d21"
+down_revision = "c4f2a8d61e90"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("picture_hex", sa.String(length=7)),
+    ("picture_sha256", sa.String(length=64)),
+)
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("powders")}
+    for name, type_ in COLUMNS:
+        if name not in existing:
+            op.add_column("powders", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(COLUMNS):
+        op.drop_column("powders", name)
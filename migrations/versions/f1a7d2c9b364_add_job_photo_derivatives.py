@@ -0,0 +1,34 @@
+"""add web rendition columns to job photos
+
+Revision ID: f1a7d2c9b364
+Revises: e5b9c3f07d21
+Create Date: 2026-10-19 14:00:00.000000
+
+Existing photos are processed by ``flask build-photo-derivatives``.
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1a7d2c9b364"
+down_revision = "e5b9c3f07d21"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("job_photos")}
+    if "derivatives" not in existing:
+        op.add_column("job_photos", sa.Column("derivatives", sa.JSON(), nullable=True))
+    if "derivatives_status" not in existing:
+        op.add_column(
+            "job_photos", sa.Column("derivatives_status", sa.String(length=20), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    op.drop_column("job_photos", "derivatives_status")
+    op.drop_column("job_photos", "derivatives")
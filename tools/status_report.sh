@@ -27,6 +27,7 @@ OUT="${2:-status_report.txt}"
   echo "## Expected URLs"
   IP=$(hostname -I | awk '{print $1}')
   echo "Health:   http://$IP:8080/healthz"
+  echo "Ready:    http://$IP:8080/readyz"
   echo "Dashboard http://$IP:8080/dashboard/"
 } > "$OUT"
 echo "Wrote $OUT"